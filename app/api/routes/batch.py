@@ -0,0 +1,125 @@
+"""Batch: apply one single-file operation to many PDFs in a single request and job."""
+import asyncio
+import json
+import os
+from typing import List, Literal
+
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from app.models.job import JobCreated, JobType
+from app.api.routes.common import new_job_paths, submit_job, value_errors_to_400
+from app.security.validators import validate_upload, validate_pdf_limits
+from app.storage.local import default_storage as storage
+
+router = APIRouter()
+
+# Upper bound on files per batch request (each file is still capped at MAX_FILE_SIZE)
+MAX_BATCH_FILES = 20
+
+
+class _NoParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+
+class _WatermarkParams(_NoParams):
+    text: str = Field(min_length=1)
+    opacity: float = Field(0.5, ge=0.1, le=1.0)
+
+
+class _PageNumberParams(_NoParams):
+    template: str = "Page {n} of {total}"
+    position: str = "bottom_center"
+
+
+class _CompressParams(_NoParams):
+    method: Literal["quality", "file_size"] = "quality"
+    compression_level: int = Field(5, ge=1, le=9)
+    desired_size: float = Field(0, ge=0)
+    desired_size_unit: Literal["KB", "MB"] = "MB"
+    grayscale: bool = False
+
+
+class _FlattenParams(_NoParams):
+    flatten_only_forms: bool = False
+
+
+class _ProtectParams(_NoParams):
+    password: str = Field(min_length=1, pattern=r"\S")
+
+
+# Operations a batch may run: job type -> (per-file output name, params model).
+# Same params as the matching single-file endpoint.
+BATCH_OPERATIONS = {
+    JobType.ADD_WATERMARK: ("watermarked.pdf", _WatermarkParams),
+    JobType.ADD_PAGE_NUMBERS: ("numbered.pdf", _PageNumberParams),
+    JobType.COMPRESS: ("compressed.pdf", _CompressParams),
+    JobType.FLATTEN: ("flattened.pdf", _FlattenParams),
+    JobType.PROTECT: ("protected.pdf", _ProtectParams),
+    JobType.REPAIR: ("repaired.pdf", _NoParams),
+    JobType.PDF_TO_PDFA: ("output.pdfa.pdf", _NoParams),
+}
+
+
+def _parse_operation(operation: str, params: str) -> tuple[JobType, dict]:
+    """Return (job type, validated params) for a batch request. Raise ValueError if invalid."""
+    try:
+        job_type = JobType(operation)
+    except ValueError:
+        job_type = None
+    if job_type not in BATCH_OPERATIONS:
+        allowed = ", ".join(jt.value for jt in BATCH_OPERATIONS)
+        raise ValueError(f"Unsupported batch operation. Use one of: {allowed}")
+    try:
+        raw = json.loads(params or "{}")
+    except json.JSONDecodeError:
+        raise ValueError("params must be a JSON object")
+    if not isinstance(raw, dict):
+        raise ValueError("params must be a JSON object")
+    try:
+        validated = BATCH_OPERATIONS[job_type][1].model_validate(raw)
+    except ValidationError as e:
+        err = e.errors()[0]
+        loc = "".join(f".{p}" for p in err["loc"])
+        raise ValueError(f"params{loc}: {err['msg']}")
+    return job_type, validated.model_dump()
+
+
+@router.post("/batch", response_model=JobCreated)
+@value_errors_to_400
+async def batch(
+    files: List[UploadFile] = File(...),
+    operation: str = Form(..., description="Job type to run on every file, e.g. add_watermark or compress"),
+    params: str = Form("{}", description='JSON object of options for the operation, e.g. {"text": "DRAFT"}'),
+):
+    """
+    Queue one job that runs operation on each uploaded PDF. The download is a ZIP of the
+    outputs; per-file outcomes are listed in the job's params.batch_results.
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="At least one PDF required")
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_FILES} files per batch")
+    job_type, operation_params = _parse_operation(operation, params)
+
+    for file in files:
+        validate_upload(file)
+
+    job_id, base_path, _, output_path = new_job_paths("batch.zip")
+    input_paths = [os.path.join(base_path, f"input_{idx}.pdf") for idx in range(len(files))]
+
+    await asyncio.gather(*(storage.save_upload(p, f, check_pdf=True) for p, f in zip(input_paths, files)))
+    await asyncio.gather(*(asyncio.to_thread(validate_pdf_limits, p) for p in input_paths))
+
+    await submit_job(
+        job_id,
+        JobType.BATCH,
+        input_paths,
+        output_path,
+        {
+            "operation": job_type.value,
+            "operation_params": operation_params,
+            "input_filenames": [f.filename for f in files],
+        },
+    )
+    return {"job_id": job_id}
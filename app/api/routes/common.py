@@ -1,18 +1,68 @@
-"""Shared helpers for PDF job routes: validation, job creation, and file size checks."""
+"""Shared helpers for PDF job routes: validation, job creation, upload inspection, and file size checks."""
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import shutil
+import tempfile
 import uuid
-from datetime import datetime
+from typing import Any, Callable, Optional
 
-from fastapi import UploadFile
+from fastapi import HTTPException, UploadFile
 
 from app.api.routes.jobs import JOB_STORE
 from app.models.job import Job, JobStatus, JobType
 from app.queue.in_memory import queue
 from app.security.validators import (
-    validate_file_size,
     validate_pdf_limits,
     validate_upload,
 )
-from app.storage.local import LocalStorage
+from app.storage.local import BASE_PATH, LocalStorage, stream_upload_to_path
+from app.utils.lru import LRUCache
+from app.utils.output_names import make_output_filename
+
+# (upload digest, job type, params) -> job_id of an earlier job run on identical input
+RESULT_CACHE = LRUCache(maxsize=1024)
+
+
+def value_errors_to_400(func):
+    """Route decorator: turn a ValueError (validation failure) raised by the endpoint into a 400."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return wrapper
+
+
+def new_job_paths(output_name: str, input_name: str = "input.pdf") -> tuple[str, str, str, str]:
+    """Return (job_id, base_path, input_path, output_path) for a fresh job directory."""
+    job_id = uuid.uuid4().hex
+    base_path = os.path.join(BASE_PATH, job_id)
+    return job_id, base_path, os.path.join(base_path, input_name), os.path.join(base_path, output_name)
+
+
+def new_job(job_id: str, job_type: JobType, input_paths: list[str], output_path: str, params: dict) -> Job:
+    """Build a pending Job created now."""
+    return Job(
+        job_id=job_id,
+        job_type=job_type,
+        status=JobStatus.PENDING,
+        input_paths=input_paths,
+        output_path=output_path,
+        params=params,
+    )
+
+
+async def submit_job(job_id: str, job_type: JobType, input_paths: list[str], output_path: str, params: dict) -> Job:
+    """Create a pending job, register it in JOB_STORE and enqueue it for the worker."""
+    job = new_job(job_id, job_type, input_paths, output_path, params)
+    JOB_STORE[job_id] = job
+    # Unbounded queue on the event loop: put_nowait never blocks and takes no lock
+    queue.put_nowait(job_id)
+    return job
 
 
 async def create_single_file_pdf_job(
@@ -25,32 +75,74 @@ async def create_single_file_pdf_job(
     validate_pdf_limits_after_save: bool = True,
 ) -> str:
     """
-    Validate PDF upload (type + size), save to job dir, optionally check page limit,
+    Validate PDF upload (type + size), stream it to the job dir, optionally check page limit,
     create job, register, enqueue, and return job_id.
+    If an identical upload was already processed with the same job type and params, the
+    earlier output is linked into the new job dir and the job is completed without queueing.
     """
     validate_upload(file)
-    data = await file.read()
-    validate_file_size(len(data))
 
-    job_id = str(uuid.uuid4())
-    base_path = f"/tmp/pdf-jobs/{job_id}"
-    input_path = f"{base_path}/input.pdf"
-    output_path = f"{base_path}/{output_filename}"
+    job_id, base_path, input_path, output_path = new_job_paths(output_filename)
 
-    storage.save(input_path, data)
+    hasher = hashlib.blake2b(digest_size=16)
+    await storage.save_upload(input_path, file, hasher=hasher, check_pdf=validate_pdf_limits_after_save)
+    cache_params = {k: v for k, v in params.items() if k != "input_filenames"}
+    cache_key = (hasher.digest(), job_type, json.dumps(cache_params, sort_keys=True, default=str))
+
+    job = new_job(job_id, job_type, [input_path], output_path, params)
+
+    prior = JOB_STORE.get(RESULT_CACHE.get(cache_key))
+    if prior is not None and prior.status == JobStatus.COMPLETED and os.path.isfile(prior.output_path):
+        # Output may have been renamed by the worker (e.g. split -> .zip); keep its basename
+        job.output_path = os.path.join(base_path, os.path.basename(prior.output_path))
+        try:
+            os.link(prior.output_path, job.output_path)
+        except OSError:
+            shutil.copyfile(prior.output_path, job.output_path)
+        # Carry over worker-set params (e.g. redaction_warning); this request's own params win
+        job.params = {**(prior.params or {}), **params}
+        job.output_filename = make_output_filename(job_type, params.get("input_filenames"), job.output_path)
+        job.status = JobStatus.COMPLETED
+        JOB_STORE[job_id] = job
+        return job_id
 
     if validate_pdf_limits_after_save:
-        validate_pdf_limits(input_path)
+        # pypdf parse is CPU-bound; keep it off the event loop
+        await asyncio.to_thread(validate_pdf_limits, input_path)
 
-    job = Job(
-        job_id=job_id,
-        job_type=job_type,
-        status=JobStatus.PENDING,
-        input_paths=[input_path],
-        output_path=output_path,
-        created_at=datetime.utcnow(),
-        params=params,
-    )
     JOB_STORE[job_id] = job
-    await queue.put(job_id)
+    RESULT_CACHE.put(cache_key, job_id)
+    queue.put_nowait(job_id)
     return job_id
+
+
+async def inspect_upload(
+    file: UploadFile,
+    parse: Callable[[str], Any],
+    cache: Optional[LRUCache] = None,
+) -> Any:
+    """
+    Validate the upload, stream it to a temp file and return parse(path), run in a thread
+    (pypdf parsing is CPU-bound). With a cache, results are keyed by the blake2b digest of the
+    upload, so re-submitting the same file skips parsing. The temp file is always removed.
+    """
+    validate_upload(file)
+
+    fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    try:
+        hasher = hashlib.blake2b(digest_size=16) if cache is not None else None
+        await stream_upload_to_path(file, tmp_path, hasher=hasher)
+        if cache is None:
+            return await asyncio.to_thread(parse, tmp_path)
+        key = hasher.digest()
+        result = cache.get(key)
+        if result is None:
+            result = await asyncio.to_thread(parse, tmp_path)
+            cache.put(key, result)
+        return result
+    finally:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
@@ -1,15 +1,15 @@
 """Compress PDF to reduce file size."""
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form
 
-from app.models.job import JobType
-from app.api.routes.common import create_single_file_pdf_job
-from app.storage.local import LocalStorage
+from app.models.job import JobCreated, JobType
+from app.api.routes.common import create_single_file_pdf_job, value_errors_to_400
+from app.storage.local import default_storage as storage
 
 router = APIRouter()
-storage = LocalStorage()
 
 
-@router.post("/compress")
+@router.post("/compress", response_model=JobCreated)
+@value_errors_to_400
 async def compress_pdf(
     file: UploadFile = File(...),
     method: str = Form("quality", description="Compression method: quality or file_size"),
@@ -22,21 +22,18 @@ async def compress_pdf(
         method = "quality"
     if desired_size_unit not in ("KB", "MB"):
         desired_size_unit = "MB"
-    try:
-        job_id = await create_single_file_pdf_job(
-            file,
-            JobType.COMPRESS,
-            "compressed.pdf",
-            {
-                "input_filenames": [file.filename],
-                "method": method,
-                "compression_level": compression_level,
-                "desired_size": desired_size,
-                "desired_size_unit": desired_size_unit,
-                "grayscale": grayscale,
-            },
-            storage,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    job_id = await create_single_file_pdf_job(
+        file,
+        JobType.COMPRESS,
+        "compressed.pdf",
+        {
+            "input_filenames": [file.filename],
+            "method": method,
+            "compression_level": compression_level,
+            "desired_size": desired_size,
+            "desired_size_unit": desired_size_unit,
+            "grayscale": grayscale,
+        },
+        storage,
+    )
     return {"job_id": job_id}
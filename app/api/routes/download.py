@@ -1,3 +1,5 @@
+import os
+from functools import lru_cache
 from urllib.parse import quote
 
 from fastapi import APIRouter, HTTPException
@@ -19,18 +21,32 @@ MEDIA_TYPES = {
     ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
 }
 
+
+@lru_cache(maxsize=1024)
+def _resolve_filename(filename: str) -> tuple[str, str]:
+    """Return (media_type, quoted filename); cached since output names repeat across jobs."""
+    _, dot, tail = filename.rpartition(".")
+    ext = "." + tail.lower() if dot else ".pdf"
+    return MEDIA_TYPES.get(ext, "application/octet-stream"), quote(filename)
+
+
 def _get_completed_job_response(job_id: str, disposition: str = "attachment"):
     try:
         validate_job_id(job_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="Job not found")
     job = JOB_STORE.get(job_id)
-    if not job or job.status != JobStatus.COMPLETED:
+    if not job:
+        # Unknown, or forgotten once its files were swept
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != JobStatus.COMPLETED:
         raise HTTPException(status_code=400, detail="File not ready")
+    if not os.path.isfile(job.output_path):
+        # Job directory already swept (see remove_stale_job_dirs)
+        raise HTTPException(status_code=410, detail="File has expired")
     filename = job.output_filename or "result.pdf"
-    ext = "." + filename.split(".")[-1].lower() if "." in filename else ".pdf"
-    media_type = MEDIA_TYPES.get(ext, "application/octet-stream")
-    content_disp = f'{disposition}; filename="{quote(filename)}"'
+    media_type, quoted = _resolve_filename(filename)
+    content_disp = f'{disposition}; filename="{quoted}"'
     return FileResponse(
         job.output_path,
         filename=filename,
@@ -1,89 +1,90 @@
 """Edit PDF: extract text spans (with font/size/position) and replace text in place."""
+import asyncio
 import json
 import os
 import shutil
-import uuid
-from datetime import datetime
+from typing import Optional
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
-
-from app.models.job import Job, JobStatus, JobType
-from app.queue.in_memory import queue
+from fastapi.responses import FileResponse
+from pydantic import (
+    BaseModel,
+    StrictFloat,
+    StrictStr,
+    TypeAdapter,
+    ValidationError,
+    conint,
+    conlist,
+)
+
+from app.models.job import JobCreated, JobStatus, JobType
+from app.api.routes.common import new_job_paths, submit_job, value_errors_to_400
 from app.api.routes.jobs import JOB_STORE
-from app.security.validators import validate_file_size, validate_pdf_limits, validate_job_id
-from app.storage.local import LocalStorage
+from app.security.validators import validate_pdf_limits, validate_job_id
+from app.storage.local import default_storage as storage
 
 router = APIRouter()
-storage = LocalStorage()
-
-
-def _validate_replacements(replacements: list) -> None:
-    """Raise ValueError if replacements format is invalid."""
-    if not replacements:
-        raise ValueError("replacements must be a non-empty list")
-    for i, r in enumerate(replacements):
-        if not isinstance(r, dict):
-            raise ValueError(f"replacements[{i}] must be an object")
-        if "old_text" not in r or "new_text" not in r:
-            raise ValueError(f"replacements[{i}] must have 'old_text' and 'new_text'")
-        if not isinstance(r.get("old_text"), str) or not isinstance(r.get("new_text"), str):
-            raise ValueError(f"replacements[{i}] old_text and new_text must be strings")
-        if "page_index" in r and r["page_index"] is not None:
-            if not isinstance(r["page_index"], int) or r["page_index"] < 0:
-                raise ValueError(f"replacements[{i}] page_index must be a non-negative integer")
-        if "bbox" in r and r["bbox"] is not None:
-            if not isinstance(r["bbox"], (list, tuple)) or len(r["bbox"]) != 4:
-                raise ValueError(f"replacements[{i}] bbox must be a list of 4 numbers")
-            if not all(isinstance(x, (int, float)) for x in r["bbox"]):
-                raise ValueError(f"replacements[{i}] bbox values must be numbers")
-
-
-def _ensure_pdf_bytes(data: bytes) -> None:
-    """Raise ValueError if data does not look like a PDF (magic bytes)."""
-    if len(data) < 8 or not data.startswith(b"%PDF"):
-        raise ValueError("File does not appear to be a PDF.")
-
-@router.post("/edit-pdf/extract")
-async def edit_pdf_extract(file: UploadFile = File(...)):
+
+
+class Replacement(BaseModel):
+    """One text replacement; page_index + bbox optionally pin it to a single span."""
+    old_text: StrictStr
+    new_text: StrictStr
+    page_index: Optional[conint(strict=True, ge=0)] = None
+    bbox: Optional[conlist(StrictFloat, min_length=4, max_length=4)] = None
+
+
+# Built once at import; pydantic-core validates the whole list in a single call
+_REPLACEMENTS_ADAPTER = TypeAdapter(conlist(Replacement, min_length=1))
+
+
+def _validate_replacements(replacements: list) -> list[dict]:
+    """Validate replacements and return them as plain dicts. Raise ValueError if format is invalid."""
+    try:
+        items = _REPLACEMENTS_ADAPTER.validate_python(replacements)
+    except ValidationError as e:
+        err = e.errors()[0]
+        loc = "".join(f"[{p}]" if isinstance(p, int) else f".{p}" for p in err["loc"])
+        raise ValueError(f"replacements{loc}: {err['msg']}")
+    return [r.model_dump() for r in items]
+
+
+async def _save_pdf_upload(file: UploadFile, base_path: str, input_path: str) -> None:
     """
-    Extract editable text spans from a PDF (digital text only).
-    Returns a job_id; when completed, download the result to get a JSON file
-    with spans: text, bbox, font_name, font_size, color, page_index.
+    Stream the upload to input_path (checking the PDF header on the first chunk), then the page limit.
+    Raises HTTPException(400) and removes the job dir if the upload is rejected.
     """
-    data = await file.read()
-    validate_file_size(len(data))
     try:
-        _ensure_pdf_bytes(data)
+        await storage.save_upload(input_path, file, check_pdf=True)
+        # Page-count parse stays off the event loop
+        await asyncio.to_thread(validate_pdf_limits, input_path)
     except ValueError as e:
+        shutil.rmtree(base_path, ignore_errors=True)
         raise HTTPException(status_code=400, detail=str(e))
 
-    job_id = str(uuid.uuid4())
-    base_path = f"/tmp/pdf-jobs/{job_id}"
-    input_path = f"{base_path}/input.pdf"
-    output_path = f"{base_path}/extract.json"
+@router.post("/edit-pdf/extract", response_model=JobCreated)
+async def edit_pdf_extract(file: UploadFile = File(...)):
+    """
+    Extract editable text spans from a PDF (digital text only).
+    Returns a job_id; when completed, download the result to get a JSON file
+    with spans: text, bbox, font_name, font_size, color, page_index.
+    """
+    job_id, base_path, input_path, output_path = new_job_paths("extract.json")
 
-    storage.save(input_path, data)
-    try:
-        validate_pdf_limits(input_path)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    await _save_pdf_upload(file, base_path, input_path)
 
-    job = Job(
-        job_id=job_id,
-        job_type=JobType.EDIT_PDF_EXTRACT,
-        status=JobStatus.PENDING,
-        input_paths=[input_path],
-        output_path=output_path,
-        created_at=datetime.utcnow(),
-        params={"input_filenames": [file.filename or "document.pdf"]},
+    await submit_job(
+        job_id,
+        JobType.EDIT_PDF_EXTRACT,
+        [input_path],
+        output_path,
+        {"input_filenames": [file.filename or "document.pdf"]},
     )
-    JOB_STORE[job_id] = job
-    await queue.put(job_id)
     return {"job_id": job_id}
 
 
-@router.post("/edit-pdf/replace")
+@router.post("/edit-pdf/replace", response_model=JobCreated)
+@value_errors_to_400
 async def edit_pdf_replace(
     file: UploadFile = File(...),
     replacements: str = Form(..., description='JSON array of {"old_text": "...", "new_text": "..."}'),
@@ -93,87 +94,48 @@ async def edit_pdf_replace(
     replacements: JSON array, e.g. [{"old_text": "Hello", "new_text": "Hi"}].
     All occurrences of each old_text are replaced. Returns job_id; result is the edited PDF.
     """
-    data = await file.read()
-    validate_file_size(len(data))
-    try:
-        _ensure_pdf_bytes(data)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
     try:
         repl_list = json.loads(replacements)
     except json.JSONDecodeError as e:
         raise HTTPException(status_code=400, detail=f"Invalid JSON for replacements: {e}")
 
-    try:
-        _validate_replacements(repl_list)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    repl_list = _validate_replacements(repl_list)
 
-    job_id = str(uuid.uuid4())
-    base_path = f"/tmp/pdf-jobs/{job_id}"
-    input_path = f"{base_path}/input.pdf"
-    output_path = f"{base_path}/output.pdf"
+    job_id, base_path, input_path, output_path = new_job_paths("output.pdf")
 
-    storage.save(input_path, data)
-    try:
-        validate_pdf_limits(input_path)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    await _save_pdf_upload(file, base_path, input_path)
 
-    job = Job(
-        job_id=job_id,
-        job_type=JobType.EDIT_PDF_REPLACE,
-        status=JobStatus.PENDING,
-        input_paths=[input_path],
-        output_path=output_path,
-        created_at=datetime.utcnow(),
-        params={
+    await submit_job(
+        job_id,
+        JobType.EDIT_PDF_REPLACE,
+        [input_path],
+        output_path,
+        {
             "input_filenames": [file.filename or "document.pdf"],
             "replacements": repl_list,
         },
     )
-    JOB_STORE[job_id] = job
-    await queue.put(job_id)
     return {"job_id": job_id}
 
 
-@router.post("/edit-pdf/prepare")
+@router.post("/edit-pdf/prepare", response_model=JobCreated)
 async def edit_pdf_prepare(file: UploadFile = File(...)):
     """
     Prepare a PDF for editing: extract text spans; if none found, run OCR automatically
     then extract. Returns job_id; when completed, use GET /edit-pdf/jobs/{job_id}/extract
     for spans and GET /download/{job_id} for the editable PDF.
     """
-    data = await file.read()
-    validate_file_size(len(data))
-    try:
-        _ensure_pdf_bytes(data)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    job_id, base_path, input_path, output_path = new_job_paths("output.pdf")
 
-    job_id = str(uuid.uuid4())
-    base_path = f"/tmp/pdf-jobs/{job_id}"
-    input_path = f"{base_path}/input.pdf"
-    output_path = f"{base_path}/output.pdf"
+    await _save_pdf_upload(file, base_path, input_path)
 
-    storage.save(input_path, data)
-    try:
-        validate_pdf_limits(input_path)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-    job = Job(
-        job_id=job_id,
-        job_type=JobType.EDIT_PDF_PREPARE,
-        status=JobStatus.PENDING,
-        input_paths=[input_path],
-        output_path=output_path,
-        created_at=datetime.utcnow(),
-        params={"input_filenames": [file.filename or "document.pdf"]},
+    await submit_job(
+        job_id,
+        JobType.EDIT_PDF_PREPARE,
+        [input_path],
+        output_path,
+        {"input_filenames": [file.filename or "document.pdf"]},
     )
-    JOB_STORE[job_id] = job
-    await queue.put(job_id)
     return {"job_id": job_id}
 
 
@@ -194,12 +156,12 @@ async def get_edit_pdf_extract(job_id: str):
     extract_path = os.path.join(os.path.dirname(job.output_path), "extract.json")
     if not os.path.isfile(extract_path):
         raise HTTPException(status_code=404, detail="Extract data not found")
-    with open(extract_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return JSONResponse(content=data)
+    # The worker already wrote JSON; send the file as-is rather than parse and re-encode it
+    return FileResponse(extract_path, media_type="application/json")
 
 
-@router.post("/edit-pdf/apply-edits")
+@router.post("/edit-pdf/apply-edits", response_model=JobCreated)
+@value_errors_to_400
 async def edit_pdf_apply_edits(
     prepare_job_id: str = Form(...),
     replacements: str = Form(..., description='JSON array of {"old_text": "...", "new_text": "..."}'),
@@ -222,30 +184,24 @@ async def edit_pdf_apply_edits(
         repl_list = json.loads(replacements)
     except json.JSONDecodeError as e:
         raise HTTPException(status_code=400, detail=f"Invalid JSON for replacements: {e}")
-    try:
-        _validate_replacements(repl_list)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    repl_list = _validate_replacements(repl_list)
 
-    new_job_id = str(uuid.uuid4())
-    base_path = f"/tmp/pdf-jobs/{new_job_id}"
-    input_path = f"{base_path}/input.pdf"
-    output_path = f"{base_path}/output.pdf"
+    new_job_id, base_path, input_path, output_path = new_job_paths("output.pdf")
     os.makedirs(base_path, exist_ok=True)
-    shutil.copy(job.output_path, input_path)
-
-    new_job = Job(
-        job_id=new_job_id,
-        job_type=JobType.EDIT_PDF_REPLACE,
-        status=JobStatus.PENDING,
-        input_paths=[input_path],
-        output_path=output_path,
-        created_at=datetime.utcnow(),
-        params={
+    # The prepared PDF is never modified after its job completes, so a hardlink is a safe O(1) "copy"
+    try:
+        os.link(job.output_path, input_path)
+    except OSError:
+        shutil.copyfile(job.output_path, input_path)
+
+    await submit_job(
+        new_job_id,
+        JobType.EDIT_PDF_REPLACE,
+        [input_path],
+        output_path,
+        {
             "input_filenames": (job.params or {}).get("input_filenames", ["document.pdf"]),
             "replacements": repl_list,
         },
     )
-    JOB_STORE[new_job_id] = new_job
-    await queue.put(new_job_id)
     return {"job_id": new_job_id}
@@ -1,40 +1,47 @@
 """Extract specific pages from a PDF into a new PDF."""
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+import re
+from itertools import chain
 
-from app.models.job import JobType
-from app.api.routes.common import create_single_file_pdf_job
+from fastapi import APIRouter, UploadFile, File, Form
+
+from app.models.job import JobCreated, JobType
+from app.api.routes.common import create_single_file_pdf_job, value_errors_to_400
 from app.security.validators import validate_page_numbers
-from app.storage.local import LocalStorage
+from app.storage.local import default_storage as storage
 
 router = APIRouter()
-storage = LocalStorage()
+
+# One "N" or "N-M" item; _PAGES_RE requires the whole string to be such items joined by commas
+_PAGE_ITEM = r"\s*(\d+)\s*(?:-\s*(\d+))?\s*"
+_PAGE_ITEM_RE = re.compile(_PAGE_ITEM)
+_PAGES_RE = re.compile(rf"{_PAGE_ITEM}(?:,{_PAGE_ITEM})*")
+
+
+def _parse_pages(pages: str) -> list[int]:
+    """Parse "1,3,5-7" into [1, 3, 5, 6, 7]. Raises ValueError on bad syntax or out-of-range pages."""
+    if not _PAGES_RE.fullmatch(pages):
+        raise ValueError("Invalid page list. Use comma-separated numbers or ranges, e.g. 1,3,5-7")
+    items = [(int(a), int(b) if b else int(a)) for a, b in _PAGE_ITEM_RE.findall(pages)]
+    # Bounds-check range endpoints before expanding, so "1-10000000000" is rejected without allocating
+    validate_page_numbers(sorted({n for item in items for n in item}), allow_empty=False)
+    page_list = list(chain.from_iterable(range(a, b + 1) for a, b in items))
+    if not page_list:
+        raise ValueError("At least one page required")
+    return page_list
 
 
-@router.post("/extract")
+@router.post("/extract", response_model=JobCreated)
+@value_errors_to_400
 async def extract_pages(
     file: UploadFile = File(...),
     pages: str = Form(..., description="Comma-separated page numbers, e.g. 1,3,5-7"),
 ):
-    try:
-        page_list = []
-        for part in pages.split(","):
-            part = part.strip()
-            if "-" in part:
-                a, b = part.split("-", 1)
-                page_list.extend(range(int(a.strip()), int(b.strip()) + 1))
-            else:
-                page_list.append(int(part))
-        validate_page_numbers(page_list, allow_empty=False)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    try:
-        job_id = await create_single_file_pdf_job(
-            file,
-            JobType.EXTRACT,
-            "extracted.pdf",
-            {"pages": page_list, "input_filenames": [file.filename]},
-            storage,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    page_list = _parse_pages(pages)
+    job_id = await create_single_file_pdf_job(
+        file,
+        JobType.EXTRACT,
+        "extracted.pdf",
+        {"pages": page_list, "input_filenames": [file.filename]},
+        storage,
+    )
     return {"job_id": job_id}
@@ -1,38 +1,40 @@
 """List form fields in PDF (sync - returns JSON)."""
-import io
-
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from pypdf import PdfReader
 from pypdf.errors import PyPdfError
 
-from app.security.validators import validate_upload, validate_file_size
+from app.api.routes.common import inspect_upload, value_errors_to_400
+from app.utils.lru import LRUCache
 
 router = APIRouter()
 
+# Results keyed by blake2b digest of the upload, so re-submitting the same file skips parsing
+_FORM_FIELDS_CACHE = LRUCache(maxsize=256)
 
-@router.post("/form-fields")
-async def form_fields(file: UploadFile = File(...)):
-    try:
-        validate_upload(file)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
 
-    data = await file.read()
-    try:
-        validate_file_size(len(data))
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+def _form_fields_from_path(path: str) -> dict:
     try:
-        reader = PdfReader(io.BytesIO(data))
-        fields = reader.get_fields()
-        if fields is None:
-            return {"fields": [], "count": 0}
-        result = []
-        for name, field in fields.items():
-            result.append({
-                "name": name,
-                "type": str(type(field).__name__) if field else None,
-            })
-        return {"fields": result, "count": len(result)}
+        # Hand pypdf the open file: given a path it would first copy the whole file into a BytesIO
+        with open(path, "rb") as f:
+            reader = PdfReader(f)
+            # Plain documents have no AcroForm; skip get_fields() and its field-tree walk
+            if "/AcroForm" not in reader.trailer["/Root"]:
+                return {"fields": [], "count": 0}
+            fields = reader.get_fields()
+            if fields is None:
+                return {"fields": [], "count": 0}
+            result = []
+            for name, field in fields.items():
+                result.append({
+                    "name": name,
+                    "type": str(type(field).__name__) if field else None,
+                })
+            return {"fields": result, "count": len(result)}
     except PyPdfError as e:
         raise HTTPException(status_code=422, detail=f"Could not read PDF: {e}")
+
+
+@router.post("/form-fields")
+@value_errors_to_400
+async def form_fields(file: UploadFile = File(...)):
+    return await inspect_upload(file, _form_fields_from_path, _FORM_FIELDS_CACHE)
@@ -1,58 +1,45 @@
 """Convert one or more images to a single PDF."""
-import uuid
-from datetime import datetime
+import asyncio
+import os
 from typing import List
 
 from fastapi import APIRouter, UploadFile, File, HTTPException
 
-from app.models.job import Job, JobStatus, JobType
-from app.queue.in_memory import queue
-from app.api.routes.jobs import JOB_STORE
-from app.security.validators import validate_upload_image, validate_file_size
-from app.storage.local import LocalStorage
+from app.models.job import JobCreated, JobType
+from app.api.routes.common import new_job_paths, submit_job, value_errors_to_400
+from app.security.validators import validate_upload_image
+from app.storage.local import default_storage as storage
 
 router = APIRouter()
-storage = LocalStorage()
 
+# Saved file extension per image content type; anything else is stored as .png
+IMAGE_EXT_BY_CONTENT_TYPE = {"image/jpeg": "jpg", "image/png": "png"}
 
-@router.post("/img-to-pdf")
+
+@router.post("/img-to-pdf", response_model=JobCreated)
+@value_errors_to_400
 async def images_to_pdf(files: List[UploadFile] = File(...)):
     if not files:
         raise HTTPException(status_code=400, detail="At least one image required")
 
     for file in files:
-        try:
-            validate_upload_image(file)
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
+        validate_upload_image(file)
 
-    job_id = str(uuid.uuid4())
-    base_path = f"/tmp/pdf-jobs/{job_id}"
+    job_id, base_path, _, output_path = new_job_paths("output.pdf")
     input_paths = []
-
     for idx, file in enumerate(files):
-        data = await file.read()
-        try:
-            validate_file_size(len(data))
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-        ext = "jpg" if file.content_type == "image/jpeg" else "png"
-        path = f"{base_path}/img_{idx}.{ext}"
-        storage.save(path, data)
-        input_paths.append(path)
-
-    output_path = f"{base_path}/output.pdf"
+        ext = IMAGE_EXT_BY_CONTENT_TYPE.get(file.content_type, "png")
+        input_paths.append(os.path.join(base_path, f"img_{idx}.{ext}"))
+
+    # Writes are independent; overlap them instead of saving one file at a time
+    await asyncio.gather(*(storage.save_upload(p, f) for p, f in zip(input_paths, files)))
 
     input_filenames = [f.filename for f in files]
-    job = Job(
-        job_id=job_id,
-        job_type=JobType.IMG_TO_PDF,
-        status=JobStatus.PENDING,
-        input_paths=input_paths,
-        output_path=output_path,
-        created_at=datetime.utcnow(),
-        params={"input_filenames": input_filenames},
+    await submit_job(
+        job_id,
+        JobType.IMG_TO_PDF,
+        input_paths,
+        output_path,
+        {"input_filenames": input_filenames},
     )
-    JOB_STORE[job_id] = job
-    await queue.put(job_id)
     return {"job_id": job_id}
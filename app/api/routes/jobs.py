@@ -1,13 +1,93 @@
-from fastapi import APIRouter, HTTPException
+import os
+import threading
+import time
+from collections import OrderedDict
 
-from app.models.job import Job
+from fastapi import APIRouter, HTTPException, Response
+
+from app.models.job import Job, JobStatus
 from app.security.validators import validate_job_id
 
 router = APIRouter()
-JOB_STORE: dict[str, Job] = {}
+
+MAX_JOBS = int(os.environ.get("PDF_MAX_JOBS", "10000"))
+JOB_TTL_SECONDS = int(os.environ.get("PDF_JOB_TTL_SECONDS", "3600"))
+
+_FINISHED = (JobStatus.COMPLETED, JobStatus.FAILED)
+
+# Poll responses: finished jobs never change, in-flight ones may change on the next poll
+_CACHE_CONTROL_FINISHED = "private, max-age=3600"
+_CACHE_CONTROL_IN_FLIGHT = "private, max-age=1"
+
+
+class JobStore:
+    """
+    Bounded in-memory job registry with the dict API used by routes and the worker.
+    Entries are kept in LRU order; once more than max_jobs are held, the least recently
+    used finished (completed/failed) jobs older than ttl_seconds are evicted.
+    Pending and processing jobs are never evicted.
+    A single lock guards the map so it is also safe to touch from worker threads;
+    every operation is O(1) (eviction aside), so the lock is held only briefly.
+    """
+
+    def __init__(self, max_jobs: int = MAX_JOBS, ttl_seconds: int = JOB_TTL_SECONDS):
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __setitem__(self, job_id: str, job: Job) -> None:
+        with self._lock:
+            self._jobs[job_id] = job
+            self._jobs.move_to_end(job_id)
+            if len(self._jobs) > self.max_jobs:
+                self._evict()
+
+    def __getitem__(self, job_id: str) -> Job:
+        return self._jobs[job_id]
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def get(self, job_id: str, default=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return default
+            self._jobs.move_to_end(job_id)
+            return job
+
+    def is_active(self, job_id: str) -> bool:
+        """True if job_id is pending or processing, i.e. its files are still needed."""
+        job = self._jobs.get(job_id)
+        return job is not None and job.status not in _FINISHED
+
+    def discard(self, job_id: str) -> None:
+        """Forget job_id (e.g. once its files are gone); no-op if it is not held."""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _evict(self) -> None:
+        """Drop expired finished jobs, oldest first. Caller holds self._lock."""
+        excess = len(self._jobs) - self.max_jobs
+        cutoff = time.time_ns() - self.ttl_seconds * 1_000_000_000
+        victims = []
+        for job_id, job in self._jobs.items():
+            if len(victims) >= excess:
+                break
+            if job.status in _FINISHED and job.created_at_ns < cutoff:
+                victims.append(job_id)
+        for job_id in victims:
+            del self._jobs[job_id]
+
+
+JOB_STORE = JobStore()
 
 
-@router.get("/jobs/{job_id}")
+@router.get("/jobs/{job_id}", response_model=Job)
 def job_status(job_id: str):
     try:
         validate_job_id(job_id)
@@ -16,4 +96,10 @@ def job_status(job_id: str):
     job = JOB_STORE.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    return job
+    cache_control = _CACHE_CONTROL_FINISHED if job.status in _FINISHED else _CACHE_CONTROL_IN_FLIGHT
+    # Pre-serialized bytes: repeat polls skip FastAPI's per-request model encoding
+    return Response(
+        content=job.json_bytes(),
+        media_type="application/json",
+        headers={"Cache-Control": cache_control},
+    )
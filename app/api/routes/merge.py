@@ -1,60 +1,34 @@
-import uuid
-from datetime import datetime
+import asyncio
+import os
 
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from typing import List
 
-from app.models.job import Job, JobStatus, JobType
-from app.queue.in_memory import queue
-from app.api.routes.jobs import JOB_STORE
-from app.security.validators import validate_upload, validate_file_size, validate_pdf_limits
-from app.storage.local import LocalStorage
+from app.models.job import JobCreated, JobType
+from app.api.routes.common import new_job_paths, submit_job, value_errors_to_400
+from app.security.validators import validate_upload, validate_pdf_limits
+from app.storage.local import default_storage as storage
 
 router = APIRouter()
-storage = LocalStorage()
 
 
-@router.post("/merge")
+@router.post("/merge", response_model=JobCreated)
+@value_errors_to_400
 async def merge_pdfs(files: List[UploadFile] = File(...)):
     if len(files) < 2:
         raise HTTPException(status_code=400, detail="At least two PDFs required")
 
-    job_id = str(uuid.uuid4())
-    base_path = f"/tmp/pdf-jobs/{job_id}"
-    input_paths = []
-
-    for idx, file in enumerate(files):
-        try:
-            validate_upload(file)
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-        data = await file.read()
-        try:
-            validate_file_size(len(data))
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-        input_path = f"{base_path}/input_{idx}.pdf"
-        storage.save(input_path, data)
-        try:
-            validate_pdf_limits(input_path)
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-        input_paths.append(input_path)
-
-    output_path = f"{base_path}/merged.pdf"
+    for file in files:
+        validate_upload(file)
+
+    job_id, base_path, _, output_path = new_job_paths("merged.pdf")
+    input_paths = [os.path.join(base_path, f"input_{idx}.pdf") for idx in range(len(files))]
+
+    # Independent per-file work: overlap the disk writes, then parse page counts in threads
+    await asyncio.gather(*(storage.save_upload(p, f, check_pdf=True) for p, f in zip(input_paths, files)))
+    await asyncio.gather(*(asyncio.to_thread(validate_pdf_limits, p) for p in input_paths))
 
     input_filenames = [f.filename for f in files]
-    job = Job(
-        job_id=job_id,
-        job_type=JobType.MERGE,
-        status=JobStatus.PENDING,
-        input_paths=input_paths,
-        output_path=output_path,
-        created_at=datetime.utcnow(),
-        params={"input_filenames": input_filenames},
-    )
-
-    JOB_STORE[job_id] = job
-    await queue.put(job_id)
+    await submit_job(job_id, JobType.MERGE, input_paths, output_path, {"input_filenames": input_filenames})
 
     return {"job_id": job_id}
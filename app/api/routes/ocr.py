@@ -1,24 +1,21 @@
 """OCR PDF - make scanned PDFs searchable."""
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File
 
-from app.models.job import JobType
-from app.api.routes.common import create_single_file_pdf_job
-from app.storage.local import LocalStorage
+from app.models.job import JobCreated, JobType
+from app.api.routes.common import create_single_file_pdf_job, value_errors_to_400
+from app.storage.local import default_storage as storage
 
 router = APIRouter()
-storage = LocalStorage()
 
 
-@router.post("/ocr")
+@router.post("/ocr", response_model=JobCreated)
+@value_errors_to_400
 async def ocr_pdf(file: UploadFile = File(...)):
-    try:
-        job_id = await create_single_file_pdf_job(
-            file,
-            JobType.OCR,
-            "ocr.pdf",
-            {"input_filenames": [file.filename]},
-            storage,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    job_id = await create_single_file_pdf_job(
+        file,
+        JobType.OCR,
+        "ocr.pdf",
+        {"input_filenames": [file.filename]},
+        storage,
+    )
     return {"job_id": job_id}
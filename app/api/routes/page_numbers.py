@@ -1,28 +1,25 @@
 """Add page numbers to PDF (e.g. 'Page 1 of N')."""
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form
 
-from app.models.job import JobType
-from app.api.routes.common import create_single_file_pdf_job
-from app.storage.local import LocalStorage
+from app.models.job import JobCreated, JobType
+from app.api.routes.common import create_single_file_pdf_job, value_errors_to_400
+from app.storage.local import default_storage as storage
 
 router = APIRouter()
-storage = LocalStorage()
 
 
-@router.post("/page-numbers")
+@router.post("/page-numbers", response_model=JobCreated)
+@value_errors_to_400
 async def add_page_numbers(
     file: UploadFile = File(...),
     template: str = Form("Page {n} of {total}", description="Use {n} for page number, {total} for total"),
     position: str = Form("bottom_center", description="bottom_center, bottom_right, top_center, etc."),
 ):
-    try:
-        job_id = await create_single_file_pdf_job(
-            file,
-            JobType.ADD_PAGE_NUMBERS,
-            "numbered.pdf",
-            {"template": template, "position": position, "input_filenames": [file.filename]},
-            storage,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    job_id = await create_single_file_pdf_job(
+        file,
+        JobType.ADD_PAGE_NUMBERS,
+        "numbered.pdf",
+        {"template": template, "position": position, "input_filenames": [file.filename]},
+        storage,
+    )
     return {"job_id": job_id}
@@ -1,29 +1,26 @@
 """Convert PDF pages to images (ZIP of JPG/PNG)."""
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 
-from app.models.job import JobType
-from app.api.routes.common import create_single_file_pdf_job
-from app.storage.local import LocalStorage
+from app.models.job import JobCreated, JobType
+from app.api.routes.common import create_single_file_pdf_job, value_errors_to_400
+from app.storage.local import default_storage as storage
 
 router = APIRouter()
-storage = LocalStorage()
 
 
-@router.post("/pdf-to-img")
+@router.post("/pdf-to-img", response_model=JobCreated)
+@value_errors_to_400
 async def pdf_to_images(
     file: UploadFile = File(...),
     format: str = Form("jpg", description="jpg or png"),
 ):
     if format not in ("jpg", "png"):
         raise HTTPException(status_code=400, detail="format must be jpg or png")
-    try:
-        job_id = await create_single_file_pdf_job(
-            file,
-            JobType.PDF_TO_IMG,
-            "images.zip",
-            {"format": format, "input_filenames": [file.filename]},
-            storage,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    job_id = await create_single_file_pdf_job(
+        file,
+        JobType.PDF_TO_IMG,
+        "images.zip",
+        {"format": format, "input_filenames": [file.filename]},
+        storage,
+    )
     return {"job_id": job_id}
@@ -1,29 +1,26 @@
 """Extract text from PDF (PDF to text)."""
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 
-from app.models.job import JobType
-from app.api.routes.common import create_single_file_pdf_job
-from app.storage.local import LocalStorage
+from app.models.job import JobCreated, JobType
+from app.api.routes.common import create_single_file_pdf_job, value_errors_to_400
+from app.storage.local import default_storage as storage
 
 router = APIRouter()
-storage = LocalStorage()
 
 
-@router.post("/pdf-to-text")
+@router.post("/pdf-to-text", response_model=JobCreated)
+@value_errors_to_400
 async def pdf_to_text(
     file: UploadFile = File(...),
     format: str = Form("text", description="text or markdown"),
 ):
     if format not in ("text", "markdown"):
         raise HTTPException(status_code=400, detail="format must be text or markdown")
-    try:
-        job_id = await create_single_file_pdf_job(
-            file,
-            JobType.PDF_TO_TEXT,
-            "output.txt",
-            {"format": format, "input_filenames": [file.filename]},
-            storage,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    job_id = await create_single_file_pdf_job(
+        file,
+        JobType.PDF_TO_TEXT,
+        "output.txt",
+        {"format": format, "input_filenames": [file.filename]},
+        storage,
+    )
     return {"job_id": job_id}
@@ -1,29 +1,26 @@
 """Protect PDF with password (encrypt)."""
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 
-from app.models.job import JobType
-from app.api.routes.common import create_single_file_pdf_job
-from app.storage.local import LocalStorage
+from app.models.job import JobCreated, JobType
+from app.api.routes.common import create_single_file_pdf_job, value_errors_to_400
+from app.storage.local import default_storage as storage
 
 router = APIRouter()
-storage = LocalStorage()
 
 
-@router.post("/protect")
+@router.post("/protect", response_model=JobCreated)
+@value_errors_to_400
 async def protect_pdf(
     file: UploadFile = File(...),
     password: str = Form(..., description="Password to lock the PDF"),
 ):
     if not password.strip():
         raise HTTPException(status_code=400, detail="Password is required")
-    try:
-        job_id = await create_single_file_pdf_job(
-            file,
-            JobType.PROTECT,
-            "protected.pdf",
-            {"password": password, "input_filenames": [file.filename]},
-            storage,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    job_id = await create_single_file_pdf_job(
+        file,
+        JobType.PROTECT,
+        "protected.pdf",
+        {"password": password, "input_filenames": [file.filename]},
+        storage,
+    )
     return {"job_id": job_id}
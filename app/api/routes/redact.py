@@ -1,15 +1,15 @@
 """Redact PDF - black out text matching search strings."""
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 
-from app.models.job import JobType
-from app.api.routes.common import create_single_file_pdf_job
-from app.storage.local import LocalStorage
+from app.models.job import JobCreated, JobType
+from app.api.routes.common import create_single_file_pdf_job, value_errors_to_400
+from app.storage.local import default_storage as storage
 
 router = APIRouter()
-storage = LocalStorage()
 
 
-@router.post("/redact")
+@router.post("/redact", response_model=JobCreated)
+@value_errors_to_400
 async def redact_pdf(
     file: UploadFile = File(...),
     search: str = Form(..., description="Comma-separated phrases to redact (case-sensitive)"),
@@ -17,14 +17,11 @@ async def redact_pdf(
     phrases = [p.strip() for p in search.split(",") if p.strip()]
     if not phrases:
         raise HTTPException(status_code=400, detail="At least one search phrase required")
-    try:
-        job_id = await create_single_file_pdf_job(
-            file,
-            JobType.REDACT,
-            "redacted.pdf",
-            {"phrases": phrases, "input_filenames": [file.filename]},
-            storage,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    job_id = await create_single_file_pdf_job(
+        file,
+        JobType.REDACT,
+        "redacted.pdf",
+        {"phrases": phrases, "input_filenames": [file.filename]},
+        storage,
+    )
     return {"job_id": job_id}
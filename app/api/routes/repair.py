@@ -1,24 +1,21 @@
 """Repair corrupted or malformed PDF."""
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File
 
-from app.models.job import JobType
-from app.api.routes.common import create_single_file_pdf_job
-from app.storage.local import LocalStorage
+from app.models.job import JobCreated, JobType
+from app.api.routes.common import create_single_file_pdf_job, value_errors_to_400
+from app.storage.local import default_storage as storage
 
 router = APIRouter()
-storage = LocalStorage()
 
 
-@router.post("/repair")
+@router.post("/repair", response_model=JobCreated)
+@value_errors_to_400
 async def repair_pdf(file: UploadFile = File(...)):
-    try:
-        job_id = await create_single_file_pdf_job(
-            file,
-            JobType.REPAIR,
-            "repaired.pdf",
-            {"input_filenames": [file.filename]},
-            storage,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    job_id = await create_single_file_pdf_job(
+        file,
+        JobType.REPAIR,
+        "repaired.pdf",
+        {"input_filenames": [file.filename]},
+        storage,
+    )
     return {"job_id": job_id}
@@ -1,19 +1,22 @@
 """Sanitize PDF - remove scripts, embedded files, metadata, links, fonts per user options."""
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 
-from app.models.job import JobType
-from app.api.routes.common import create_single_file_pdf_job
-from app.storage.local import LocalStorage
+from app.models.job import JobCreated, JobType
+from app.api.routes.common import create_single_file_pdf_job, value_errors_to_400
+from app.storage.local import default_storage as storage
 
 router = APIRouter()
-storage = LocalStorage()
+
+
+_TRUE_VALUES = frozenset({"true", "1", "yes", "on"})
 
 
 def _form_bool(value: str) -> bool:
-    return (value or "").strip().lower() in ("true", "1", "yes", "on")
+    return (value or "").strip().lower() in _TRUE_VALUES
 
 
-@router.post("/sanitize")
+@router.post("/sanitize", response_model=JobCreated)
+@value_errors_to_400
 async def sanitize_pdf(
     file: UploadFile = File(...),
     remove_javascript: str = Form("true", description="Remove JavaScript actions and scripts"),
@@ -36,14 +39,11 @@ async def sanitize_pdf(
             status_code=400,
             detail="Select at least one sanitisation option.",
         )
-    try:
-        job_id = await create_single_file_pdf_job(
-            file,
-            JobType.SANITIZE,
-            "sanitized.pdf",
-            {"input_filenames": [file.filename], **opts},
-            storage,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    job_id = await create_single_file_pdf_job(
+        file,
+        JobType.SANITIZE,
+        "sanitized.pdf",
+        {"input_filenames": [file.filename], **opts},
+        storage,
+    )
     return {"job_id": job_id}
@@ -1,32 +1,28 @@
 """Sign PDF with a certificate (digital signature)."""
-import uuid
-from datetime import datetime
+import asyncio
+import os
 from typing import Optional
 
 from fastapi import APIRouter, UploadFile, File, HTTPException
 
-from app.models.job import Job, JobStatus, JobType
-from app.queue.in_memory import queue
-from app.api.routes.jobs import JOB_STORE
-from app.security.validators import validate_upload, validate_file_size
-from app.storage.local import LocalStorage
+from app.models.job import JobCreated, JobType
+from app.api.routes.common import new_job_paths, submit_job, value_errors_to_400
+from app.security.validators import validate_upload
+from app.storage.local import default_storage as storage
 
 router = APIRouter()
-storage = LocalStorage()
 
-@router.post("/sign")
+@router.post("/sign", response_model=JobCreated)
+@value_errors_to_400
 async def sign_pdf(
     file: UploadFile = File(..., description="PDF to sign"),
     cert: UploadFile = File(..., description="Certificate file (.pem or .crt)"),
     key: Optional[UploadFile] = File(None, description="Private key (.pem). If not provided, cert may be PFX with key inside."),
 ):
-    try:
-        validate_upload(file)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    validate_upload(file)
 
     cert_fn = (cert.filename or "").lower()
-    if cert_fn and not any(cert_fn.endswith(ext) for ext in (".pem", ".crt", ".pfx")):
+    if cert_fn and not cert_fn.endswith((".pem", ".crt", ".pfx")):
         raise HTTPException(
             status_code=400,
             detail="Certificate must be a .pem, .crt, or .pfx file.",
@@ -36,43 +32,17 @@ async def sign_pdf(
         if key_fn and not key_fn.endswith(".pem"):
             raise HTTPException(status_code=400, detail="Private key must be a .pem file.")
 
-    job_id = str(uuid.uuid4())
-    base_path = f"/tmp/pdf-jobs/{job_id}"
-    input_path = f"{base_path}/input.pdf"
-    cert_path = f"{base_path}/cert.pem"
-    key_path = f"{base_path}/key.pem" if key else None
-    output_path = f"{base_path}/signed.pdf"
+    job_id, base_path, input_path, output_path = new_job_paths("signed.pdf")
+    cert_path = os.path.join(base_path, "cert.pem")
+    key_path = os.path.join(base_path, "key.pem") if key else None
 
-    pdf_data = await file.read()
-    cert_data = await cert.read()
-    try:
-        validate_file_size(len(pdf_data))
-        validate_file_size(len(cert_data))
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    storage.save(input_path, pdf_data)
-    storage.save(cert_path, cert_data)
-
-    input_paths = [input_path, cert_path]
+    uploads = [(input_path, file), (cert_path, cert)]
     if key:
-        key_data = await key.read()
-        try:
-            validate_file_size(len(key_data))
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-        storage.save(key_path, key_data)
-        input_paths.append(key_path)
+        uploads.append((key_path, key))
+    # The parts are independent; write them concurrently
+    await asyncio.gather(*(storage.save_upload(path, upload) for path, upload in uploads))
+    input_paths = [path for path, _ in uploads]
 
     input_filenames = [file.filename]
-    job = Job(
-        job_id=job_id,
-        job_type=JobType.SIGN_PDF,
-        status=JobStatus.PENDING,
-        input_paths=input_paths,
-        output_path=output_path,
-        created_at=datetime.utcnow(),
-        params={"input_filenames": input_filenames},
-    )
-    JOB_STORE[job_id] = job
-    await queue.put(job_id)
+    await submit_job(job_id, JobType.SIGN_PDF, input_paths, output_path, {"input_filenames": input_filenames})
     return {"job_id": job_id}
@@ -1,49 +1,41 @@
 """Split PDF by page ranges (e.g. 1-3, 4-6, 7)."""
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form
 
-from app.models.job import JobType
-from app.api.routes.common import create_single_file_pdf_job
+from app.models.job import JobCreated, JobType
+from app.api.routes.common import create_single_file_pdf_job, value_errors_to_400
 from app.security.validators import validate_page_numbers
-from app.storage.local import LocalStorage
+from app.storage.local import default_storage as storage
 
 router = APIRouter()
-storage = LocalStorage()
 
 
-@router.post("/split-by-range")
+@router.post("/split-by-range", response_model=JobCreated)
+@value_errors_to_400
 async def split_by_range(
     file: UploadFile = File(...),
     ranges: str = Form(..., description="Comma-separated ranges: 1-3,4-6,7"),
 ):
-    try:
-        range_list = []
-        for part in ranges.split(","):
-            part = part.strip()
-            if "-" in part:
-                a, b = part.split("-", 1)
-                a, b = int(a.strip()), int(b.strip())
-                if a > b:
-                    raise ValueError(f"Invalid range {a}-{b}: start must be ≤ end")
-                range_list.append((a, b))
-            else:
-                n = int(part)
-                range_list.append((n, n))
-        if not range_list:
-            raise ValueError("At least one range required")
-        all_pages = []
-        for a, b in range_list:
-            all_pages.extend(range(a, b + 1))
-        validate_page_numbers(all_pages, allow_empty=False)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    try:
-        job_id = await create_single_file_pdf_job(
-            file,
-            JobType.SPLIT_BY_RANGE,
-            "split_1.pdf",
-            {"ranges": range_list, "input_filenames": [file.filename]},
-            storage,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    range_list = []
+    for part in ranges.split(","):
+        part = part.strip()
+        if "-" in part:
+            a, b = part.split("-", 1)
+            a, b = int(a.strip()), int(b.strip())
+            if a > b:
+                raise ValueError(f"Invalid range {a}-{b}: start must be ≤ end")
+            range_list.append((a, b))
+        else:
+            n = int(part)
+            range_list.append((n, n))
+    if not range_list:
+        raise ValueError("At least one range required")
+    # Ranges are ordered (a <= b), so bounds-checking the endpoints covers every page in them
+    validate_page_numbers(sorted({n for r in range_list for n in r}), allow_empty=False)
+    job_id = await create_single_file_pdf_job(
+        file,
+        JobType.SPLIT_BY_RANGE,
+        "split_1.pdf",
+        {"ranges": range_list, "input_filenames": [file.filename]},
+        storage,
+    )
     return {"job_id": job_id}
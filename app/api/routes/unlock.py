@@ -1,27 +1,24 @@
 """Unlock PDF (remove password protection)."""
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form
 
-from app.models.job import JobType
-from app.api.routes.common import create_single_file_pdf_job
-from app.storage.local import LocalStorage
+from app.models.job import JobCreated, JobType
+from app.api.routes.common import create_single_file_pdf_job, value_errors_to_400
+from app.storage.local import default_storage as storage
 
 router = APIRouter()
-storage = LocalStorage()
 
 
-@router.post("/unlock")
+@router.post("/unlock", response_model=JobCreated)
+@value_errors_to_400
 async def unlock_pdf(
     file: UploadFile = File(...),
     password: str = Form(..., description="Current PDF password"),
 ):
-    try:
-        job_id = await create_single_file_pdf_job(
-            file,
-            JobType.UNLOCK,
-            "unlocked.pdf",
-            {"password": password, "input_filenames": [file.filename]},
-            storage,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    job_id = await create_single_file_pdf_job(
+        file,
+        JobType.UNLOCK,
+        "unlocked.pdf",
+        {"password": password, "input_filenames": [file.filename]},
+        storage,
+    )
     return {"job_id": job_id}
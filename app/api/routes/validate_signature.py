@@ -1,39 +1,34 @@
 """Validate digital signatures in PDF (sync - returns JSON)."""
-import io
-
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from pypdf import PdfReader
 from pypdf.errors import PyPdfError
 
-from app.security.validators import validate_upload, validate_file_size
+from app.api.routes.common import inspect_upload, value_errors_to_400
 
 router = APIRouter()
 
 
-@router.post("/validate-signature")
-async def validate_signature(file: UploadFile = File(...)):
-    try:
-        validate_upload(file)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-    data = await file.read()
+def _signature_info_from_path(path: str) -> dict:
     try:
-        validate_file_size(len(data))
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    try:
-        reader = PdfReader(io.BytesIO(data))
-        # pypdf can expose signature info from embedded signatures
-        sigs = []
-        if hasattr(reader, "get_signature_info") and reader.get_signature_info:
-            sigs = reader.get_signature_info()
-        # Fallback: report whether we could open (encrypted vs not)
-        return {
-            "valid": True,
-            "message": "Signature validation requires full certificate chain; basic PDF read succeeded.",
-            "is_encrypted": reader.is_encrypted,
-            "signatures": sigs if sigs else [],
-        }
+        # Hand pypdf the open file: given a path it would first copy the whole file into a BytesIO
+        with open(path, "rb") as f:
+            reader = PdfReader(f)
+            # pypdf can expose signature info from embedded signatures
+            sigs = []
+            if hasattr(reader, "get_signature_info") and reader.get_signature_info:
+                sigs = reader.get_signature_info()
+            # Fallback: report whether we could open (encrypted vs not)
+            return {
+                "valid": True,
+                "message": "Signature validation requires full certificate chain; basic PDF read succeeded.",
+                "is_encrypted": reader.is_encrypted,
+                "signatures": sigs if sigs else [],
+            }
     except PyPdfError as e:
         raise HTTPException(status_code=422, detail=f"Could not read PDF: {e}")
+
+
+@router.post("/validate-signature")
+@value_errors_to_400
+async def validate_signature(file: UploadFile = File(...)):
+    return await inspect_upload(file, _signature_info_from_path)
@@ -1,52 +1,17 @@
 import asyncio
+import importlib
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from fastapi import FastAPI
+import anyio.to_thread
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-
-from app.api.routes import (
-    upload,
-    jobs,
-    download,
-    health,
-    merge,
-    split,
-    split_by_range,
-    rotate,
-    delete,
-    extract,
-    reorder,
-    crop,
-    compress,
-    repair,
-    ocr,
-    watermark,
-    page_numbers,
-    stamp,
-    flatten,
-    remove_blanks,
-    extract_images,
-    edit_pdf,
-    protect,
-    unlock,
-    redact,
-    sign_pdf,
-    sanitize,
-    compare,
-    img_to_pdf,
-    pdf_to_img,
-    pdf_to_pdfa,
-    pdf_to_text,
-    html_to_pdf,
-    office_to_pdf,
-    pdf_to_office,
-    document_info,
-    form_fields,
-    validate_signature,
-)
-from app.workers.worker import worker_loop
+
+from app.api.routes.jobs import JOB_STORE
+from app.storage.local import remove_stale_job_dirs
+from app.utils.static_files import InMemoryStatic
+from app.workers.worker import WorkerPool, make_process_pool, worker_loop
 
 app = FastAPI(
     title="PDF Platform API",
@@ -62,60 +27,105 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(health.router, tags=["Health"])
-app.include_router(upload.router, tags=["Upload & Jobs"])
-app.include_router(jobs.router, tags=["Upload & Jobs"])
-app.include_router(download.router, tags=["Upload & Jobs"])
-app.include_router(merge.router, tags=["Organize"])
-app.include_router(split.router, tags=["Organize"])
-app.include_router(split_by_range.router, tags=["Organize"])
-app.include_router(delete.router, tags=["Organize"])
-app.include_router(extract.router, tags=["Organize"])
-app.include_router(reorder.router, tags=["Organize"])
-app.include_router(compress.router, tags=["Optimize"])
-app.include_router(repair.router, tags=["Optimize"])
-app.include_router(ocr.router, tags=["Optimize"])
-app.include_router(img_to_pdf.router, tags=["Convert"])
-app.include_router(pdf_to_img.router, tags=["Convert"])
-app.include_router(pdf_to_pdfa.router, tags=["Convert"])
-app.include_router(pdf_to_text.router, tags=["Convert"])
-app.include_router(html_to_pdf.router, tags=["Convert"])
-app.include_router(office_to_pdf.router, tags=["Convert"])
-app.include_router(pdf_to_office.router, tags=["Convert"])
-app.include_router(rotate.router, tags=["Edit"])
-app.include_router(crop.router, tags=["Edit"])
-app.include_router(page_numbers.router, tags=["Edit"])
-app.include_router(watermark.router, tags=["Edit"])
-app.include_router(stamp.router, tags=["Edit"])
-app.include_router(flatten.router, tags=["Edit"])
-app.include_router(remove_blanks.router, tags=["Edit"])
-app.include_router(extract_images.router, tags=["Edit"])
-app.include_router(edit_pdf.router, tags=["Edit"])
-app.include_router(protect.router, tags=["Security"])
-app.include_router(unlock.router, tags=["Security"])
-app.include_router(redact.router, tags=["Security"])
-app.include_router(sign_pdf.router, tags=["Security"])
-app.include_router(sanitize.router, tags=["Security"])
-app.include_router(compare.router, tags=["Security"])
-app.include_router(document_info.router, tags=["Analysis"])
-app.include_router(form_fields.router, tags=["Analysis"])
-app.include_router(validate_signature.router, tags=["Analysis"])
+# (module under app.api.routes, OpenAPI tag), in the order the docs list them
+ROUTERS = [
+    ("health", "Health"),
+    ("upload", "Upload & Jobs"),
+    ("jobs", "Upload & Jobs"),
+    ("download", "Upload & Jobs"),
+    ("merge", "Organize"),
+    ("split", "Organize"),
+    ("split_by_range", "Organize"),
+    ("delete", "Organize"),
+    ("extract", "Organize"),
+    ("reorder", "Organize"),
+    ("batch", "Organize"),
+    ("compress", "Optimize"),
+    ("repair", "Optimize"),
+    ("ocr", "Optimize"),
+    ("img_to_pdf", "Convert"),
+    ("pdf_to_img", "Convert"),
+    ("pdf_to_pdfa", "Convert"),
+    ("pdf_to_text", "Convert"),
+    ("html_to_pdf", "Convert"),
+    ("office_to_pdf", "Convert"),
+    ("pdf_to_office", "Convert"),
+    ("rotate", "Edit"),
+    ("crop", "Edit"),
+    ("page_numbers", "Edit"),
+    ("watermark", "Edit"),
+    ("stamp", "Edit"),
+    ("flatten", "Edit"),
+    ("remove_blanks", "Edit"),
+    ("extract_images", "Edit"),
+    ("edit_pdf", "Edit"),
+    ("protect", "Security"),
+    ("unlock", "Security"),
+    ("redact", "Security"),
+    ("sign_pdf", "Security"),
+    ("sanitize", "Security"),
+    ("compare", "Security"),
+    ("document_info", "Analysis"),
+    ("form_fields", "Analysis"),
+    ("validate_signature", "Analysis"),
+]
+
+for _name, _tag in ROUTERS:
+    app.include_router(importlib.import_module(f"app.api.routes.{_name}").router, tags=[_tag])
 
 # Frontend: serve index.html at / and static assets under /static
 STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+INDEX_PATH = STATIC_DIR / "index.html"
 
 
 @app.get("/")
-def index():
-    index_path = STATIC_DIR / "index.html"
-    if not index_path.exists():
+async def index():
+    # Read once in startup_event; the page is small and only changes on redeploy
+    index_bytes = getattr(app.state, "index_bytes", None)
+    if index_bytes is None:
         return {"message": "Frontend not found. Run from project root."}
-    return FileResponse(index_path)
+    return Response(index_bytes, media_type="text/html", headers={"Cache-Control": "public, max-age=60"})
 
 
 if STATIC_DIR.exists():
-    app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+    # Frontend assets are small: keep them in memory rather than stat/open per request
+    app.mount("/static", InMemoryStatic(str(STATIC_DIR)), name="static")
+
+# How often old job directories are swept from disk
+JOB_DIR_CLEANUP_INTERVAL_SECONDS = 300
+
+# Threads for sync endpoints and asyncio.to_thread work (upload copies, validation);
+# bounded so bursts don't each spin up a thread holding its own pypdf/pikepdf state
+PDF_THREADS = int(os.environ.get("PDF_THREADS", "8"))
+
+
+def sweep_job_dirs() -> None:
+    """Remove stale job directories (never those of queued or running jobs) and forget their jobs."""
+    # A finished job without its files would still poll as completed but fail to download
+    for job_id in remove_stale_job_dirs(keep=JOB_STORE.is_active):
+        JOB_STORE.discard(job_id)
+
+
+async def job_dir_cleanup_loop():
+    while True:
+        await asyncio.to_thread(sweep_job_dirs)
+        await asyncio.sleep(JOB_DIR_CLEANUP_INTERVAL_SECONDS)
+
 
 @app.on_event("startup")
 async def startup_event():
-    asyncio.create_task(worker_loop())
+    # Sync endpoints run on anyio's limiter, asyncio.to_thread on the loop's default executor
+    anyio.to_thread.current_default_thread_limiter().total_tokens = PDF_THREADS
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=PDF_THREADS, thread_name_prefix="pdf")
+    )
+    app.state.index_bytes = INDEX_PATH.read_bytes() if INDEX_PATH.exists() else None
+    # Shared with worker_loop, which replaces the executor if a child process dies
+    app.state.pool = WorkerPool(make_process_pool())
+    asyncio.create_task(worker_loop(app.state.pool))
+    asyncio.create_task(job_dir_cleanup_loop())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.pool.shutdown()
@@ -1,6 +1,7 @@
+import time
 from enum import Enum
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, Field, PrivateAttr, computed_field
+from datetime import datetime, timezone
 from typing import Optional, List, Dict
 
 class JobStatus(str, Enum):
@@ -49,6 +50,12 @@ class JobType(str, Enum):
     COMPARE_PDF = "compare_pdf"
     # Extract / analysis (file output)
     EXTRACT_IMAGES = "extract_images"
+    # One operation applied to many uploads (see /batch); output is a ZIP
+    BATCH = "batch"
+
+class JobCreated(BaseModel):
+    """Response body of every endpoint that queues a job."""
+    job_id: str
 
 class Job(BaseModel):
     job_id: str
@@ -56,7 +63,28 @@ class Job(BaseModel):
     status: JobStatus
     input_paths: List[str]
     output_path: str
-    created_at: datetime
+    # Wall-clock creation time in ns; a cheap int on the submit path (see created_at)
+    created_at_ns: int = Field(default_factory=time.time_ns, exclude=True)
     params: Optional[Dict] = None
     error: Optional[str] = None
-    output_filename: Optional[str] = None  # e.g. "result.zip" for split
\ No newline at end of file
+    output_filename: Optional[str] = None  # e.g. "result.zip" for split
+
+    @computed_field
+    @property
+    def created_at(self) -> datetime:
+        """Creation time (UTC), built from created_at_ns only when the job is serialized."""
+        return datetime.fromtimestamp(self.created_at_ns / 1e9, tz=timezone.utc)
+
+    # Serialized JSON for status polling; dropped whenever a field is reassigned
+    _json_cache: Optional[bytes] = PrivateAttr(default=None)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            self._json_cache = None
+
+    def json_bytes(self) -> bytes:
+        """Return the job as JSON bytes, reusing the last serialization until a field changes."""
+        if self._json_cache is None:
+            self._json_cache = self.model_dump_json().encode()
+        return self._json_cache
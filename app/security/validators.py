@@ -1,31 +1,35 @@
-import re
+import io
+import os
+import uuid
+from typing import BinaryIO, Union
 
 from pypdf import PdfReader
 
-ALLOWED_PDF_CONTENT_TYPES = (
+try:
+    import pikepdf
+except ImportError:  # pypdf alone is enough, just slower
+    pikepdf = None
+
+# Content types are membership-tested (frozenset); extensions stay tuples for str.endswith
+ALLOWED_PDF_CONTENT_TYPES = frozenset({
     "application/pdf",
     "application/octet-stream",
     "application/x-pdf",
-)
+})
 ALLOWED_PDF_EXTENSIONS = (".pdf",)
-ALLOWED_IMAGE_CONTENT_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif"}
+ALLOWED_IMAGE_CONTENT_TYPES = frozenset({"image/jpeg", "image/png", "image/webp", "image/gif"})
 ALLOWED_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif")
 MAX_FILE_SIZE = 25 * 1024 * 1024  # 25 MB
 MAX_PAGES = 200  # safe default
 MAX_PAGE_NUMBER = 50_000  # upper bound for a single page number (avoid abuse)
-
-# UUID v4 regex for validating job_id (path parameter)
-UUID_PATTERN = re.compile(
-    r"^[0-9a-f]{8}-[0-9a-f]{4}-[4][0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$",
-    re.IGNORECASE,
-)
+PDF_MAGIC = b"%PDF"
 
 
 def _check_file_type(upload_file, allowed_content_types, allowed_extensions, expected_label: str):
     """Raise ValueError if content_type or filename extension is not allowed."""
     ct = (upload_file.content_type or "").strip().lower()
     fn = (upload_file.filename or "").lower()
-    has_valid_ext = fn and any(fn.endswith(ext) for ext in allowed_extensions)
+    has_valid_ext = fn and fn.endswith(allowed_extensions)
     has_valid_ct = ct and ct in allowed_content_types
     # Accept if either content-type or extension indicates the right type (e.g. Swagger may send wrong ct)
     if has_valid_ct or has_valid_ext:
@@ -62,8 +66,16 @@ def validate_file_size(size: int, max_size: int = MAX_FILE_SIZE) -> None:
 
 
 def validate_job_id(job_id: str) -> None:
-    """Raise ValueError if job_id is not a valid UUID v4 format."""
-    if not job_id or not UUID_PATTERN.match(job_id.strip()):
+    """Raise ValueError if job_id is not a UUID v4 (32-char hex or hyphenated form)."""
+    job_id = (job_id or "").strip()
+    # uuid.UUID also takes braces / "urn:uuid:" prefixes; the length check keeps only the two plain forms
+    if len(job_id) not in (32, 36):
+        raise ValueError("Invalid job ID format.")
+    try:
+        parsed = uuid.UUID(job_id)
+    except ValueError:
+        raise ValueError("Invalid job ID format.")
+    if parsed.version != 4 or parsed.variant != uuid.RFC_4122:
         raise ValueError("Invalid job ID format.")
 
 
@@ -76,12 +88,47 @@ def validate_upload_image(file):
         "image (JPEG, PNG, WebP, GIF)",
     )
 
-def validate_pdf_limits(file_path: str):
-    reader = PdfReader(file_path)
-    if len(reader.pages) > MAX_PAGES:
+def validate_pdf_magic(head: bytes) -> None:
+    """Raise ValueError unless head (the first bytes of a file) starts with the PDF header."""
+    if not head.startswith(PDF_MAGIC):
+        raise ValueError("File does not appear to be a PDF.")
+
+
+def _check_pdf_stream(stream: BinaryIO) -> None:
+    start = stream.tell()
+    # Sniff the header first so non-PDF uploads are rejected without building a PdfReader
+    validate_pdf_magic(stream.read(len(PDF_MAGIC)))
+    stream.seek(start)
+    page_count = None
+    if pikepdf is not None:
+        # QPDF counts pages in C++, several times faster than building a PdfReader
+        try:
+            with pikepdf.open(stream) as pdf:
+                page_count = len(pdf.pages)
+        except (pikepdf.PasswordError, pikepdf.PdfError):
+            # Encrypted or damaged beyond QPDF's recovery: let pypdf (more lenient) decide
+            stream.seek(start)
+    if page_count is None:
+        page_count = len(PdfReader(stream).pages)
+    if page_count > MAX_PAGES:
         raise ValueError("PDF exceeds maximum page limit")
 
 
+def validate_pdf_limits(src: Union[str, os.PathLike, bytes, BinaryIO]):
+    """
+    Raise ValueError if src is not a PDF (magic bytes) or has more than MAX_PAGES pages.
+    src may be a path, the PDF bytes, or an open binary stream (read from its current position).
+    """
+    if isinstance(src, (bytes, bytearray)):
+        src = io.BytesIO(src)
+    if isinstance(src, (str, os.PathLike)):
+        # Hand pypdf a file object: given a path it would first copy the whole file into memory
+        with open(src, "rb") as f:
+            _check_pdf_stream(f)
+    else:
+        _check_pdf_stream(src)
+
+
 def validate_page_numbers(
     page_list: list[int],
     *,
@@ -92,6 +139,9 @@ def validate_page_numbers(
     """Raise ValueError if any page number is out of bounds or invalid."""
     if not allow_empty and not page_list:
         raise ValueError("At least one page required")
+    # Common case: min()/max() run in C, so an in-range list is checked without a Python-level loop
+    if not page_list or (min_val <= min(page_list) and max(page_list) <= max_val):
+        return
     bad = [p for p in page_list if not (min_val <= p <= max_val)]
     if bad:
         raise ValueError(
@@ -5,6 +5,10 @@ class Storage(ABC):
     def save(self, path: str, data: bytes):
         pass
 
+    def savev(self, path: str, buffers):
+        """Write a sequence of byte buffers to path. Subclasses may avoid the join."""
+        self.save(path, b"".join(buffers))
+
     @abstractmethod
     def read(self, path: str) -> bytes:
         pass
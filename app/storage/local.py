@@ -1,27 +1,158 @@
+import asyncio
+import mmap
 import os
+import shutil
+import time
+from functools import lru_cache
+from typing import Callable, Optional
 
+from app.security.validators import MAX_FILE_SIZE, validate_file_size, validate_pdf_magic
 from app.storage.base import Storage
 
 # Base directory for all job files; paths outside this are rejected (path traversal safety)
 BASE_PATH = os.path.abspath(os.environ.get("PDF_JOBS_BASE", "/tmp/pdf-jobs"))
 
+# Job directories untouched for this long are removed by remove_stale_job_dirs()
+JOB_DIR_MAX_AGE_SECONDS = int(os.environ.get("PDF_JOB_DIR_MAX_AGE_SECONDS", "3600"))
+
+# Read uploads in 1 MB chunks so memory stays flat regardless of file size
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Most buffers os.writev accepts in one call
+_IOV_MAX = os.sysconf("SC_IOV_MAX") if hasattr(os, "sysconf") else 1024
+
+
+_BASE_PREFIX = BASE_PATH + os.sep
+
 
 def _ensure_path_within_base(path: str) -> None:
     """Raise ValueError if path (after resolving . and ..) is outside BASE_PATH."""
-    resolved = os.path.normpath(os.path.abspath(path))
-    base = os.path.normpath(BASE_PATH)
-    if not (resolved == base or resolved.startswith(base + os.sep)):
+    # abspath already normalises (. / .. / duplicate separators); BASE_PATH is absolute
+    resolved = os.path.abspath(path)
+    if not (resolved == BASE_PATH or resolved.startswith(_BASE_PREFIX)):
         raise ValueError("Path is outside allowed storage directory.")
 
 
+@lru_cache(maxsize=4096)
+def _ensure_dir(dirname: str) -> None:
+    """Create dirname (and parents) once per process; repeat calls are a cache hit."""
+    os.makedirs(dirname, exist_ok=True)
+
+
+def _copy_upload(src, path: str, max_bytes: int, hasher=None, check_pdf: bool = False) -> int:
+    """Blocking chunked copy of src (a binary file object) to path; see stream_upload_to_path."""
+    total = 0
+    with open(path, "wb") as f:
+        while True:
+            chunk = src.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            if check_pdf and not total:
+                validate_pdf_magic(chunk)
+            total += len(chunk)
+            if total > max_bytes:
+                validate_file_size(total, max_bytes)
+            if hasher is not None:
+                hasher.update(chunk)
+            f.write(chunk)
+    validate_file_size(total, max_bytes)
+    return total
+
+
+async def stream_upload_to_path(
+    file, path: str, max_bytes: int = MAX_FILE_SIZE, *, hasher=None, check_pdf: bool = False,
+) -> int:
+    """
+    Stream an UploadFile to path in chunks, enforcing max_bytes as data arrives.
+    If hasher (e.g. hashlib.blake2b()) is given, each chunk is fed to it as well.
+    With check_pdf, the first chunk must start with the PDF header, so a non-PDF
+    upload is rejected before the rest of it is copied.
+    Returns the number of bytes written. On ValueError the partial file is removed.
+    """
+    dirname = os.path.dirname(path)
+    if dirname:
+        _ensure_dir(dirname)
+    try:
+        # The whole copy runs in one worker thread: one hand-off per upload instead of
+        # a thread-pool round trip for every chunk read and every chunk write
+        return await asyncio.to_thread(_copy_upload, file.file, path, max_bytes, hasher, check_pdf)
+    except ValueError:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+
+
+def remove_stale_job_dirs(
+    max_age_seconds: int = JOB_DIR_MAX_AGE_SECONDS, keep: Optional[Callable[[str], bool]] = None,
+) -> list[str]:
+    """
+    Delete job directories under BASE_PATH not modified in max_age_seconds, except those
+    whose name (the job id) keep returns True for. Returns the names of the removed directories.
+    """
+    cutoff = time.time() - max_age_seconds
+    removed = []
+    try:
+        entries = list(os.scandir(BASE_PATH))
+    except FileNotFoundError:
+        return removed
+    for entry in entries:
+        try:
+            if not entry.is_dir(follow_symlinks=False) or entry.stat().st_mtime >= cutoff:
+                continue
+        except OSError:
+            continue
+        if keep is not None and keep(entry.name):
+            continue
+        shutil.rmtree(entry.path, ignore_errors=True)
+        removed.append(entry.name)
+    return removed
+
+
 class LocalStorage(Storage):
     def save(self, path: str, data: bytes) -> None:
         _ensure_path_within_base(path)
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _ensure_dir(os.path.dirname(path))
         with open(path, "wb") as f:
             f.write(data)
 
+    async def save_upload(
+        self, path: str, file, max_bytes: int = MAX_FILE_SIZE, *, hasher=None, check_pdf: bool = False,
+    ) -> int:
+        """Stream an UploadFile to path without buffering it in memory. Returns bytes written."""
+        _ensure_path_within_base(path)
+        return await stream_upload_to_path(file, path, max_bytes, hasher=hasher, check_pdf=check_pdf)
+
+    def savev(self, path: str, buffers) -> None:
+        """Write buffers to path with os.writev, without joining them into one bytes first."""
+        _ensure_path_within_base(path)
+        _ensure_dir(os.path.dirname(path))
+        pending = [memoryview(b) for b in buffers if len(b)]
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while pending:
+                # writev takes at most IOV_MAX buffers and may write fewer bytes than asked
+                written = os.writev(fd, pending[:_IOV_MAX])
+                while pending and written >= len(pending[0]):
+                    written -= len(pending.pop(0))
+                if written:
+                    pending[0] = pending[0][written:]
+        finally:
+            os.close(fd)
+
     def read(self, path: str) -> bytes:
         _ensure_path_within_base(path)
         with open(path, "rb") as f:
             return f.read()
+
+    def open_mmap(self, path: str) -> mmap.mmap:
+        """Map path read-only instead of copying it into a bytes object; close it when done."""
+        _ensure_path_within_base(path)
+        with open(path, "rb") as f:
+            # length 0 maps the whole file; the mapping stays valid after f is closed
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+# Shared instance used by all routes
+default_storage = LocalStorage()
@@ -1,3 +1,4 @@
+from app.utils.lru import LRUCache
 from app.utils.output_names import make_output_filename
 
-__all__ = ["make_output_filename"]
+__all__ = ["LRUCache", "make_output_filename"]
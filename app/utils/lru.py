@@ -0,0 +1,32 @@
+"""Small bounded LRU mapping for caching derived results in-process."""
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    OrderedDict-backed LRU: get() refreshes recency, put() evicts the oldest entry
+    once maxsize is exceeded. Not thread-safe; use it from the event loop.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            return default
+        return self._data[key]
+
+    def put(self, key, value) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,16 +1,32 @@
 """Generate download filenames from job type and original input filenames."""
 import os
-import re
+from functools import lru_cache
 from app.models.job import JobType
 
 
+class _UnsafeCharTable(dict):
+    """str.translate table: word chars, whitespace, '-' and '.' map to themselves, anything else to '_'.
+    BMP entries are memoised on first lookup (bounded size); rarer code points are recomputed."""
+
+    def __missing__(self, cp: int):
+        ch = chr(cp)
+        repl = cp if (ch.isalnum() or ch.isspace() or ch in "_-.") else "_"
+        if cp < 0x10000:
+            self[cp] = repl
+        return repl
+
+
+_UNSAFE_CHARS = _UnsafeCharTable()
+
+
+@lru_cache(maxsize=4096)
 def _safe_basename(name: str, max_len: int = 80) -> str:
     """Get a safe filename base from an original name (no extension, no bad chars)."""
     if not name or not name.strip():
         return "document"
     base = os.path.splitext(name.strip())[0]
-    base = re.sub(r'[^\w\s\-_.]', "_", base)
-    base = re.sub(r'[\s]+', "_", base).strip("._")
+    # Same result as re.sub(r'[^\w\s\-_.]', '_') then re.sub(r'\s+', '_'), without the regex engine
+    base = "_".join(base.translate(_UNSAFE_CHARS).split()).strip("._")
     return base[:max_len] if base else "document"
 
 
@@ -48,6 +64,7 @@ JOB_SUFFIX = {
     JobType.SANITIZE: "_sanitized",
     JobType.COMPARE_PDF: "_compare",
     JobType.EXTRACT_IMAGES: "_images",
+    JobType.BATCH: "_batch",
 }
 
 # Job types that output ZIP (use .zip extension when not set by output_path)
@@ -57,6 +74,12 @@ ZIP_OUTPUT_TYPES = {
     JobType.PDF_TO_IMG,
     JobType.EXTRACT_IMAGES,
     JobType.COMPARE_PDF,
+    JobType.BATCH,
+}
+
+# (suffix, extension used when output_path has none) per job type, resolved once at import
+_JOB_NAME_PARTS = {
+    jt: (JOB_SUFFIX.get(jt, ""), ".zip" if jt in ZIP_OUTPUT_TYPES else ".pdf") for jt in JobType
 }
 
 
@@ -71,11 +94,6 @@ def make_output_filename(
     """
     names = input_filenames or []
     base = _safe_basename(names[0]) if names else "document"
-    suffix = JOB_SUFFIX.get(job_type, "")
-    ext = os.path.splitext(output_path)[1].lower()
-    if not ext and job_type in ZIP_OUTPUT_TYPES:
-        ext = ".zip"
-    if not ext:
-        ext = ".pdf"
-    name = f"{base}{suffix}{ext}"
-    return name
+    suffix, default_ext = _JOB_NAME_PARTS[job_type]
+    ext = os.path.splitext(output_path)[1].lower() or default_ext
+    return f"{base}{suffix}{ext}"
@@ -0,0 +1,63 @@
+"""Serve a small static directory from memory (read once, no per-request stat/open)."""
+import hashlib
+import mimetypes
+import os
+
+from starlette.responses import PlainTextResponse, Response
+
+# Assets change only on redeploy; clients revalidate cheaply with If-None-Match afterwards
+STATIC_CACHE_CONTROL = "public, max-age=60"
+
+
+def _load_dir(directory: str) -> dict[str, tuple[bytes, dict[str, str]]]:
+    """Map each file's path relative to directory (posix form) to its bytes and response headers."""
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            full = os.path.join(root, name)
+            with open(full, "rb") as f:
+                data = f.read()
+            rel = os.path.relpath(full, directory).replace(os.sep, "/")
+            media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            files[rel] = (data, {
+                "content-type": media_type,
+                "etag": f'"{hashlib.blake2b(data, digest_size=8).hexdigest()}"',
+                "cache-control": STATIC_CACHE_CONTROL,
+            })
+    return files
+
+
+class InMemoryStatic:
+    """
+    ASGI app for app.mount(): serves GET/HEAD for the files under directory as loaded
+    at construction, answering 304 when If-None-Match matches the file's ETag.
+    """
+
+    def __init__(self, directory: str):
+        self.files = _load_dir(directory)
+
+    async def __call__(self, scope, receive, send):
+        assert scope["type"] == "http"
+        if scope["method"] not in ("GET", "HEAD"):
+            response = PlainTextResponse("Method Not Allowed", status_code=405)
+        else:
+            entry = self.files.get(_route_path(scope).lstrip("/"))
+            if entry is None:
+                response = PlainTextResponse("Not Found", status_code=404)
+            else:
+                data, headers = entry
+                if_none_match = dict(scope["headers"]).get(b"if-none-match", b"").decode("latin-1")
+                if headers["etag"] in if_none_match:
+                    response = Response(status_code=304, headers={"etag": headers["etag"]})
+                else:
+                    response = Response(data, headers=headers)
+        await response(scope, receive, send)
+
+
+def _route_path(scope) -> str:
+    """Request path relative to the mount point (Starlette keeps the full path in scope["path"])."""
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        return path[len(root_path):]
+    return path
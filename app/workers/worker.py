@@ -1,25 +1,560 @@
 import asyncio
+import contextlib
 import io
 import json
+import math
+import mmap
 import os
+import re
 import shutil
 import subprocess
+import tempfile
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from multiprocessing import get_context
 from typing import Optional
 
 from pypdf import PdfWriter, PdfReader
 from pypdf.generic import FloatObject
 
 from app.queue.in_memory import queue
+from app.api.routes.batch import BATCH_OPERATIONS
 from app.api.routes.jobs import JOB_STORE
-from app.models.job import JobStatus, JobType
+from app.models.job import Job, JobStatus, JobType
 from app.utils.output_names import make_output_filename
 
+# Number of worker tasks pulling jobs off the queue
+WORKER_CONCURRENCY = int(os.environ.get("PDF_WORKER_CONCURRENCY", "4"))
+
+# Size of the process pool that runs the PDF work itself; 0 runs jobs in threads instead
+WORKER_PROCESSES = int(os.environ.get("PDF_WORKER_PROCESSES", str(os.cpu_count() or 1)))
+
+# Parallel tesseract processes per OCR job: the cores split across concurrently running jobs
+_OCR_THREADS = max(1, (os.cpu_count() or 1) // WORKER_CONCURRENCY)
+
+# Job fields process_job may change; copied back from the child's copy of the job
+_RESULT_FIELDS = ("output_path", "output_filename", "params")
+
+# PyMuPDF (also used by pdf2docx) is not thread-safe, so those jobs share a single slot
+_PYMUPDF_SLOT = asyncio.Semaphore(1)
+_JOB_TYPE_SEMAPHORES = {
+    JobType.EDIT_PDF_EXTRACT: _PYMUPDF_SLOT,
+    JobType.EDIT_PDF_REPLACE: _PYMUPDF_SLOT,
+    JobType.EDIT_PDF_PREPARE: _PYMUPDF_SLOT,
+    JobType.PDF_TO_OFFICE: _PYMUPDF_SLOT,
+    JobType.PDF_TO_TEXT: _PYMUPDF_SLOT,
+    JobType.REMOVE_BLANKS: _PYMUPDF_SLOT,
+    JobType.REDACT: _PYMUPDF_SLOT,
+}
+
 
 def _ensure_dir(path: str) -> None:
     os.makedirs(os.path.dirname(path), exist_ok=True)
 
 
+def _check_pages_exist(pages, n: int) -> None:
+    """Raise ValueError if any 1-based page number in pages is outside a document of n pages."""
+    # Common case: min()/max() run in C, so a valid list is checked without a Python-level loop
+    if not pages or (1 <= min(pages) and max(pages) <= n):
+        return
+    bad = [p for p in pages if p < 1 or p > n]
+    if bad:
+        raise ValueError(
+            f"Page number(s) {bad} do not exist. PDF has {n} page(s) (valid: 1–{n})."
+        )
+
+
+def _watermark_overlays(sizes: list[tuple[float, float]], text: str, opacity: float) -> tuple[bytes, list[int]]:
+    """
+    Overlay builder for _stamp_overlays: a diagonal watermark fitted to each page size.
+    The overlay depends only on the size, so there is one overlay page per distinct size.
+    """
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.pdfgen import canvas
+    base_font_size = 72
+    text_height_factor = 1.4
+    margin = 0.72
+    # Text width per point of font size: a property of the font, so measure it once
+    ratio = stringWidth(text, "Helvetica-Bold", base_font_size) / base_font_size
+    index_by_size = {}
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf)
+    for w, h in sizes:
+        if (w, h) in index_by_size:
+            continue
+        index_by_size[(w, h)] = len(index_by_size)
+        c.setPageSize((w, h))
+        c.setFillColorRGB(0.5, 0.5, 0.5, alpha=opacity)
+        if ratio > 0:
+            font_size = (margin * math.hypot(w, h)) / math.hypot(ratio, text_height_factor)
+        else:
+            font_size = base_font_size
+        c.setFont("Helvetica-Bold", font_size)
+        tw = ratio * font_size
+        c.saveState()
+        c.translate(w / 2, h / 2)
+        c.rotate(45)
+        c.drawString(-tw / 2, -font_size * 0.35, text)
+        c.restoreState()
+        c.showPage()
+    c.save()
+    return buf.getvalue(), [index_by_size[size] for size in sizes]
+
+
+def _page_number_overlays(total: int, template: str, position: str) -> tuple[bytes, list[int]]:
+    """Overlay builder for _stamp_overlays: one letter-size page per input page with its label."""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=letter)
+    w, h = letter
+    for idx in range(1, total + 1):
+        text = template.replace("{n}", str(idx)).replace("{total}", str(total))
+        c.setFillColorRGB(0.2, 0.2, 0.2)
+        c.setFont("Helvetica", 10)
+        if position == "bottom_center":
+            c.drawCentredString(w / 2, 36, text)
+        elif position == "bottom_right":
+            c.drawRightString(w - 72, 36, text)
+        elif position == "bottom_left":
+            c.drawString(72, 36, text)
+        elif position == "top_center":
+            c.drawCentredString(w / 2, h - 36, text)
+        elif position == "top_right":
+            c.drawRightString(w - 72, h - 36, text)
+        else:
+            c.drawCentredString(w / 2, 36, text)
+        c.showPage()
+    c.save()
+    return buf.getvalue(), list(range(total))
+
+
+def _image_stamp_overlays(sizes: list[tuple[float, float]], stamp_path: str, position: str) -> tuple[bytes, list[int]]:
+    """
+    Overlay builder for _stamp_overlays: the stamp image (fitted in 100x100 pt) at position,
+    one overlay page per distinct page size. ReportLab embeds the image once per document.
+    """
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.utils import ImageReader
+    img = ImageReader(stamp_path)
+    iw, ih = img.getSize()
+    scale = min(100 / iw, 100 / ih)
+    iw, ih = iw * scale, ih * scale
+    index_by_size = {}
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf)
+    for pw, ph in sizes:
+        if (pw, ph) in index_by_size:
+            continue
+        index_by_size[(pw, ph)] = len(index_by_size)
+        c.setPageSize((pw, ph))
+        # mask='auto' preserves PNG transparency so the stamp has no opaque background
+        if position == "bottom_right":
+            c.drawImage(img, pw - iw - 20, 20, width=iw, height=ih, mask="auto")
+        elif position == "bottom_left":
+            c.drawImage(img, 20, 20, width=iw, height=ih, mask="auto")
+        elif position == "top_right":
+            c.drawImage(img, pw - iw - 20, ph - ih - 20, width=iw, height=ih, mask="auto")
+        elif position == "top_left":
+            c.drawImage(img, 20, ph - ih - 20, width=iw, height=ih, mask="auto")
+        else:
+            c.drawImage(img, (pw - iw) / 2, (ph - ih) / 2, width=iw, height=ih, mask="auto")
+        c.showPage()
+    c.save()
+    return buf.getvalue(), [index_by_size[size] for size in sizes]
+
+
+def _stamp_overlays(input_path: str, output_path: str, build_overlays) -> None:
+    """
+    Draw overlays on top of the pages of input_path and write the result to output_path.
+    build_overlays(sizes) gets the (width, height) of each input page and returns
+    (overlay PDF bytes, overlay page index or None for each input page); overlays are drawn
+    in the page's own coordinate space (as pypdf's merge_page does), without scaling.
+    With pikepdf each overlay page becomes one shared Form XObject referenced from the
+    pages' content; pypdf's merge_page is the fallback.
+    """
+    try:
+        import pikepdf
+    except ImportError:
+        pikepdf = None
+    if pikepdf is not None:
+        try:
+            with pikepdf.open(input_path) as pdf:
+                sizes = [
+                    (float(box[2]) - float(box[0]), float(box[3]) - float(box[1]))
+                    for box in (page.mediabox for page in pdf.pages)
+                ]
+                overlay_bytes, overlay_for_page = build_overlays(sizes)
+                with pikepdf.open(io.BytesIO(overlay_bytes)) as overlay:
+                    forms = {}
+                    # The small wrapper streams are shared between pages, not written once per page
+                    push = pdf.make_indirect(pikepdf.Stream(pdf, b"q\n"))
+                    pop_and_draw = {}
+                    for page, k in zip(pdf.pages, overlay_for_page):
+                        if k is None:
+                            continue
+                        if k not in forms:
+                            forms[k] = pdf.copy_foreign(overlay.pages[k].as_form_xobject())
+                        # Not add_overlay: that compensates for /Rotate, and the overlays
+                        # (and the pypdf fallback) work in unrotated page space
+                        name = page.add_resource(forms[k], pikepdf.Name.XObject, prefix="Fx")
+                        if name not in pop_and_draw:
+                            pop_and_draw[name] = pdf.make_indirect(
+                                pikepdf.Stream(pdf, f"\nQ\nq {name} Do Q\n".encode())
+                            )
+                        page.contents_add(push, prepend=True)
+                        page.contents_add(pop_and_draw[name])
+                    pdf.save(output_path)
+            return
+        except (pikepdf.PasswordError, pikepdf.PdfError):
+            pass
+    with _open_pdf_reader(input_path) as reader:
+        sizes = [(float(page.mediabox.width), float(page.mediabox.height)) for page in reader.pages]
+        overlay_bytes, overlay_for_page = build_overlays(sizes)
+        overlay_pages = PdfReader(io.BytesIO(overlay_bytes)).pages
+        writer = PdfWriter()
+        for page, k in zip(reader.pages, overlay_for_page):
+            if k is not None:
+                page.merge_page(overlay_pages[k])
+            writer.add_page(page)
+        with open(output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
+            writer.write(f)
+
+
+# Per-page PDFs in split ZIPs: their content streams are already deflated, so a light
+# level gets nearly the same ratio for far less CPU
+_ZIP_COMPRESSLEVEL = 1
+
+# FontDescriptor entries holding embedded font programs (as pikepdf dictionary keys)
+_FONTFILE_KEYS = frozenset({"/FontFile", "/FontFile2", "/FontFile3"})
+
+# pypdf/ReportLab write output in many small pieces; a 1 MiB buffer (vs the 8 KiB default)
+# turns those into a handful of write syscalls
+_OUTPUT_BUFFERING = 1 << 20
+
+
+@contextlib.contextmanager
+def _open_pdf_reader(path: str):
+    """
+    Context manager yielding a PdfReader over a read-only mmap of path. Given a path, pypdf
+    first copies the whole file into a BytesIO; the map is paged in by the OS as pypdf reads
+    it. pypdf never closes a stream it was handed, so the map (and, on Windows, the lock on
+    the file) is released on leaving the block: finish writing anything built from the
+    reader's pages inside it.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        yield PdfReader(m)
+
+
+def _zip_write_pdf(zipf: zipfile.ZipFile, arcname: str, writer: PdfWriter) -> None:
+    """Add a pypdf writer's output to zipf without a temporary file (pypdf needs a seekable stream)."""
+    buf = io.BytesIO()
+    writer.write(buf)
+    zipf.writestr(arcname, buf.getvalue())
+
+
+# Page-level jobs run with pikepdf (QPDF, C++) when possible; pypdf branches are the fallback
+_PIKEPDF_PAGE_OPS = frozenset({
+    JobType.MERGE,
+    JobType.SPLIT,
+    JobType.ROTATE,
+    JobType.DELETE,
+    JobType.EXTRACT,
+    JobType.REORDER,
+    JobType.CROP,
+})
+
+
+def _pikepdf_delete_pages(input_path: str, output_path: str, indices) -> bool:
+    """
+    Save input_path to output_path without the pages at the given 0-based indices, deleting
+    them in place so everything else is copied as is. Returns False when pikepdf is
+    unavailable or QPDF can't open the file.
+    """
+    try:
+        import pikepdf
+    except ImportError:
+        return False
+    try:
+        with pikepdf.open(input_path) as pdf:
+            # From the end, so the indices still to delete keep pointing at the same pages
+            for i in sorted(indices, reverse=True):
+                del pdf.pages[i]
+            pdf.save(output_path)
+    except (pikepdf.PasswordError, pikepdf.PdfError):
+        return False
+    return True
+
+
+def _pikepdf_page_op(job: Job, params: dict) -> bool:
+    """
+    Run a job from _PIKEPDF_PAGE_OPS with pikepdf. Returns False, having written nothing,
+    when pikepdf is not installed or QPDF can't open an input, so process_job uses pypdf.
+    """
+    try:
+        import pikepdf
+    except ImportError:
+        return False
+    with contextlib.ExitStack() as stack:
+        try:
+            sources = [stack.enter_context(pikepdf.open(path)) for path in job.input_paths]
+        except (pikepdf.PasswordError, pikepdf.PdfError):
+            return False
+        src = sources[0]
+        n = len(src.pages)
+
+        if job.job_type == JobType.MERGE:
+            # pypdf's append also carries bookmarks and form fields over; leave those to it
+            if any("/Outlines" in s.Root or "/AcroForm" in s.Root for s in sources):
+                return False
+            out = stack.enter_context(pikepdf.new())
+            for s in sources:
+                out.pages.extend(s.pages)
+            # Copy streams through as they are instead of decoding and re-encoding LZW/ASCII filters
+            out.save(job.output_path, stream_decode_level=pikepdf.StreamDecodeLevel.none)
+
+        elif job.job_type == JobType.SPLIT:
+            base_dir = os.path.dirname(job.output_path)
+            zip_path = os.path.join(base_dir, "split_output.zip")
+            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=_ZIP_COMPRESSLEVEL) as zipf:
+                for i, page in enumerate(src.pages, start=1):
+                    with pikepdf.new() as single:
+                        single.pages.append(page)
+                        # QPDF writes sequentially, so each page goes straight into its ZIP entry
+                        with zipf.open(f"split_page_{i}.pdf", "w") as dst:
+                            single.save(dst)
+            job.output_path = zip_path
+
+        elif job.job_type == JobType.ROTATE:
+            pages_to_rotate = set(params["pages"])
+            _check_pages_exist(pages_to_rotate, n)
+            for p in pages_to_rotate:
+                src.pages[p - 1].rotate(params["angle"], relative=True)
+            src.save(job.output_path)
+
+        elif job.job_type == JobType.CROP:
+            left = float(params.get("left", 0))
+            bottom = float(params.get("bottom", 0))
+            right = float(params.get("right", 0))
+            top = float(params.get("top", 0))
+            for page in src.pages:
+                # Shrink mediabox by margins (crop); mediabox resolves an inherited box
+                x0, y0, x1, y1 = (float(v) for v in page.mediabox)
+                page.mediabox = pikepdf.Array([x0 + left, y0 + bottom, x1 - right, y1 - top])
+            # Only page dictionaries change; copy content streams through untouched
+            src.save(job.output_path, stream_decode_level=pikepdf.StreamDecodeLevel.none)
+
+        else:
+            # DELETE / EXTRACT / REORDER: copy the selected pages, in order, into a new document
+            if job.job_type == JobType.DELETE:
+                delete_pages = set(params["pages"])
+                _check_pages_exist(delete_pages, n)
+                keep = [i for i in range(1, n + 1) if i not in delete_pages]
+            elif job.job_type == JobType.EXTRACT:
+                keep = params["pages"]
+                _check_pages_exist(keep, n)
+            else:
+                keep = params["order"]
+                _check_pages_exist(keep, n)
+                # Entries are already checked to be in 1..n, so n distinct entries means each page once
+                if len(keep) != n or len(set(keep)) != n:
+                    raise ValueError(
+                        f"Order must list each page exactly once (1–{n}). Got {len(keep)} page(s)."
+                    )
+            out = stack.enter_context(pikepdf.new())
+            for i in keep:
+                out.pages.append(src.pages[i - 1])
+            out.save(job.output_path)
+    return True
+
+
+def _pikepdf_encrypt(input_path: str, output_path: str, password: str) -> bool:
+    """
+    Save input_path to output_path with AES-256 (R6) encryption, user and owner password both
+    password, all permissions allowed (as pypdf's encrypt does). QPDF encrypts through its
+    crypto provider (OpenSSL, with AES-NI) instead of pypdf's per-stream Python calls.
+    Returns False when pikepdf is unavailable or QPDF can't open the file.
+    """
+    try:
+        import pikepdf
+    except ImportError:
+        return False
+    try:
+        with pikepdf.open(input_path) as pdf:
+            pdf.save(output_path, encryption=pikepdf.Encryption(owner=password, user=password, R=6))
+    except (pikepdf.PasswordError, pikepdf.PdfError):
+        return False
+    return True
+
+
+def _pikepdf_decrypt(input_path: str, output_path: str, password: str) -> bool:
+    """
+    Save input_path to output_path without encryption; QPDF copies objects across as they
+    are instead of rebuilding every page as pypdf does. Returns False when pikepdf is
+    unavailable or QPDF can't open the file with password (pypdf then decides).
+    """
+    try:
+        import pikepdf
+    except ImportError:
+        return False
+    try:
+        with pikepdf.open(input_path, password=password) as pdf:
+            pdf.save(output_path)
+    except (pikepdf.PasswordError, pikepdf.PdfError):
+        return False
+    return True
+
+
+def _iter_page_images(input_path: str, dpi: int, work_dir: str, grayscale: bool = False, pages=None):
+    """
+    Yield each page of input_path rendered at dpi as a PIL image (RGB, or L with grayscale),
+    in page order; pages (sorted 0-based indices) limits rendering to those pages. PyMuPDF
+    renders in-process, one page at a time; without it pdftoppm (pdf2image) renders all pages
+    in parallel to files in a temporary folder under work_dir.
+    Raises ImportError (on first use) if neither is installed.
+    """
+    from PIL import Image
+    mode = "L" if grayscale else "RGB"
+    try:
+        import pymupdf
+    except ImportError:
+        pymupdf = None
+    if pymupdf is not None:
+        colorspace = pymupdf.csGRAY if grayscale else pymupdf.csRGB
+        with pymupdf.open(input_path) as doc:
+            for i in range(doc.page_count) if pages is None else pages:
+                pix = doc[i].get_pixmap(dpi=dpi, colorspace=colorspace, alpha=False)
+                yield Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+        return
+    from pdf2image import convert_from_path
+    page_range = {}
+    if pages is not None:
+        if not pages:
+            return
+        # pdftoppm takes one contiguous range: render from the first to the last wanted page
+        page_range = {"first_page": pages[0] + 1, "last_page": pages[-1] + 1}
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        img_paths = convert_from_path(
+            input_path,
+            dpi=dpi,
+            grayscale=grayscale,
+            output_folder=tmp,
+            paths_only=True,
+            thread_count=os.cpu_count() or 1,
+            **page_range,
+        )
+        if pages is not None:
+            wanted = {i - pages[0] for i in pages}
+            img_paths = [path for i, path in enumerate(img_paths) if i in wanted]
+        for img_path in img_paths:
+            with Image.open(img_path) as img:
+                yield img.convert(mode)
+
+
+def _pymupdf_redact(input_path: str, output_path: str, phrase_re) -> bool:
+    """
+    Black out every word matching phrase_re (a compiled pattern, or None for no matches) with
+    PyMuPDF redaction annotations and apply them, which deletes the covered text, image
+    pixels and line art from the page content. Returns False, having written nothing, when
+    PyMuPDF is not installed.
+    """
+    try:
+        import pymupdf
+    except ImportError:
+        return False
+    with pymupdf.open(input_path) as doc:
+        for page in doc:
+            hits = []
+            if phrase_re is not None:
+                # words: (x0, y0, x1, y1, text, block, line, word), in the same space as redactions
+                hits = [w[:4] for w in page.get_text("words") if phrase_re.search(w[4])]
+            for rect in hits:
+                page.add_redact_annot(rect, fill=(0, 0, 0))
+            if hits:
+                page.apply_redactions()
+        # garbage collection drops the replaced content streams, so no redacted text survives in the file
+        doc.save(output_path, garbage=4, deflate=True)
+    return True
+
+
+def _pikepdf_extract_images(input_path: str, zipf: zipfile.ZipFile) -> bool:
+    """
+    Write each page's image XObjects into zipf as page{n}_{name}.{ext}. JPEG (and JPEG 2000)
+    data is copied out of the PDF as-is; other images are decoded and saved as PNG.
+    Returns False, having written nothing, when pikepdf is unavailable or can't open the file.
+    """
+    try:
+        import pikepdf
+    except ImportError:
+        return False
+    try:
+        pdf = pikepdf.open(input_path)
+    except (pikepdf.PasswordError, pikepdf.PdfError):
+        return False
+    with pdf:
+        for page_num, page in enumerate(pdf.pages, start=1):
+            for name, raw in page.images.items():
+                try:
+                    buf = io.BytesIO()
+                    ext = pikepdf.PdfImage(raw).extract_to(stream=buf)
+                except Exception:
+                    # As with pypdf: images that can't be decoded are skipped
+                    continue
+                zipf.writestr(f"page{page_num}_{str(name).lstrip('/')}{ext}", buf.getvalue())
+    return True
+
+
+def _pypdf_extract_images(input_path: str, zipf: zipfile.ZipFile) -> None:
+    """Fallback for _pikepdf_extract_images: decode every image with pypdf/PIL and store it as PNG."""
+    with _open_pdf_reader(input_path) as reader:
+        for page_num, page in enumerate(reader.pages):
+            try:
+                for img_fo in getattr(page, "images", []):
+                    try:
+                        buf = io.BytesIO()
+                        if hasattr(img_fo, "image") and hasattr(img_fo.image, "save"):
+                            img_fo.image.save(buf, format="PNG")
+                        else:
+                            continue
+                        name = getattr(img_fo, "name", f"img_{page_num}").replace("/", "")
+                        zipf.writestr(f"page{page_num+1}_{name}.png", buf.getvalue())
+                    except Exception:
+                        pass
+            except Exception:
+                pass
+
+
+def _page_texts(input_path: str) -> list[str]:
+    """
+    Plain text of each page. PyMuPDF extracts in C, many times faster than pdfplumber
+    (pdfminer) or pypdf, which are tried in that order when it isn't installed.
+    """
+    try:
+        import pymupdf
+    except ImportError:
+        pymupdf = None
+    if pymupdf is not None:
+        with pymupdf.open(input_path, filetype="pdf") as doc:
+            # get_text ends every page with a newline; the other extractors don't
+            return [page.get_text("text").rstrip("\n") for page in doc]
+    try:
+        import pdfplumber
+        with pdfplumber.open(input_path) as pdf:
+            return [page.extract_text() or "" for page in pdf.pages]
+    except ImportError:
+        with _open_pdf_reader(input_path) as reader:
+            return [page.extract_text() or "" for page in reader.pages]
+
+
+@lru_cache(maxsize=16)
+def _which(name: str) -> Optional[str]:
+    """shutil.which, resolved once per process: it stats every PATH entry on each call."""
+    return shutil.which(name)
+
+
+@lru_cache(maxsize=1)
 def _find_tesseract_windows() -> Optional[str]:
     """Return path to tesseract.exe on Windows if installed in common locations."""
     if os.name != "nt":
@@ -34,6 +569,7 @@ def _find_tesseract_windows() -> Optional[str]:
     return None
 
 
+@lru_cache(maxsize=1)
 def _find_libreoffice_windows() -> Optional[str]:
     """Return path to soffice.exe on Windows if installed in common locations."""
     if os.name != "nt":
@@ -56,9 +592,9 @@ def _run_libreoffice_convert(
     libreoffice_cwd = None
     libreoffice_env = None
     if os.name == "nt":
-        libreoffice_cmd = shutil.which("libreoffice") or os.environ.get("LIBREOFFICE_CMD") or _find_libreoffice_windows() or libreoffice_cmd
+        libreoffice_cmd = _which("libreoffice") or os.environ.get("LIBREOFFICE_CMD") or _find_libreoffice_windows() or libreoffice_cmd
         if libreoffice_cmd == "libreoffice":
-            libreoffice_cmd = shutil.which("soffice") or libreoffice_cmd
+            libreoffice_cmd = _which("soffice") or libreoffice_cmd
         if os.path.isfile(libreoffice_cmd):
             libreoffice_cwd = os.path.dirname(libreoffice_cmd)
             lo_parent = os.path.dirname(libreoffice_cwd)
@@ -82,1020 +618,910 @@ def _run_libreoffice_convert(
         shutil.move(expected, job.output_path)
 
 
-async def worker_loop():
-    while True:
-        job_id = await queue.get()
-        job = JOB_STORE[job_id]
-
-        try:
-            job.status = JobStatus.PROCESSING
-            params = job.params or {}
-
-            # ---------- MERGE ----------
-            if job.job_type == JobType.MERGE:
-                writer = PdfWriter()
-                for path in job.input_paths:
-                    writer.append(path)
-                with open(job.output_path, "wb") as f:
-                    writer.write(f)
-
-            # ---------- SPLIT + ZIP ----------
-            elif job.job_type == JobType.SPLIT:
-                reader = PdfReader(job.input_paths[0])
-                base_dir = os.path.dirname(job.output_path)
-                zip_path = os.path.join(base_dir, "split_output.zip")
-                split_files = []
+def process_job(job: Job) -> None:
+    """
+    Run the PDF operation for job synchronously (called in a worker thread).
+    Writes the output file and sets job.output_filename; raises on failure.
+    """
+    params = job.params or {}
+
+    # ---------- MERGE / SPLIT / ROTATE / DELETE / EXTRACT / REORDER (pikepdf) ----------
+    if job.job_type in _PIKEPDF_PAGE_OPS and _pikepdf_page_op(job, params):
+        pass
+
+    # ---------- MERGE ----------
+    elif job.job_type == JobType.MERGE:
+        writer = PdfWriter()
+        for path in job.input_paths:
+            writer.append(path)
+        with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
+            writer.write(f)
+
+    # ---------- SPLIT + ZIP ----------
+    elif job.job_type == JobType.SPLIT:
+        with _open_pdf_reader(job.input_paths[0]) as reader:
+            base_dir = os.path.dirname(job.output_path)
+            zip_path = os.path.join(base_dir, "split_output.zip")
+            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=_ZIP_COMPRESSLEVEL) as zipf:
                 for i, page in enumerate(reader.pages, start=1):
                     w = PdfWriter()
                     w.add_page(page)
-                    out_path = os.path.join(base_dir, f"split_page_{i}.pdf")
-                    _ensure_dir(out_path)
-                    with open(out_path, "wb") as f:
-                        w.write(f)
-                    split_files.append(out_path)
-                with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-                    for fp in split_files:
-                        zipf.write(fp, arcname=os.path.basename(fp))
-                job.output_path = zip_path
-
-            # ---------- ROTATE ----------
-            elif job.job_type == JobType.ROTATE:
-                reader = PdfReader(job.input_paths[0])
-                writer = PdfWriter()
-                n = len(reader.pages)
-                pages_to_rotate = set(params["pages"])
-                bad = [p for p in pages_to_rotate if p < 1 or p > n]
-                if bad:
-                    raise ValueError(
-                        f"Page number(s) {bad} do not exist. PDF has {n} page(s) (valid: 1–{n})."
-                    )
-                angle = params["angle"]
-                for i, page in enumerate(reader.pages, start=1):
-                    if i in pages_to_rotate:
-                        page.rotate(angle)
-                    writer.add_page(page)
-                with open(job.output_path, "wb") as f:
-                    writer.write(f)
-
-            # ---------- DELETE ----------
-            elif job.job_type == JobType.DELETE:
-                reader = PdfReader(job.input_paths[0])
-                writer = PdfWriter()
-                n = len(reader.pages)
-                delete_pages = set(params["pages"])
-                bad = [p for p in delete_pages if p < 1 or p > n]
-                if bad:
-                    raise ValueError(
-                        f"Page number(s) {bad} do not exist. PDF has {n} page(s) (valid: 1–{n})."
-                    )
-                for i, page in enumerate(reader.pages, start=1):
-                    if i not in delete_pages:
-                        writer.add_page(page)
-                with open(job.output_path, "wb") as f:
-                    writer.write(f)
-
-            # ---------- EXTRACT ----------
-            elif job.job_type == JobType.EXTRACT:
-                reader = PdfReader(job.input_paths[0])
-                writer = PdfWriter()
-                page_list = params["pages"]
-                n = len(reader.pages)
-                bad = [p for p in page_list if p < 1 or p > n]
-                if bad:
-                    raise ValueError(
-                        f"Page number(s) {bad} do not exist. PDF has {n} page(s) (valid: 1–{n})."
-                    )
-                for i in page_list:
-                    writer.add_page(reader.pages[i - 1])
-                with open(job.output_path, "wb") as f:
-                    writer.write(f)
-
-            # ---------- REORDER ----------
-            elif job.job_type == JobType.REORDER:
-                reader = PdfReader(job.input_paths[0])
-                writer = PdfWriter()
-                order = params["order"]
-                n = len(reader.pages)
-                bad = [p for p in order if p < 1 or p > n]
-                if bad:
-                    raise ValueError(
-                        f"Page number(s) {bad} do not exist. PDF has {n} page(s) (valid: 1–{n})."
-                    )
-                if len(order) != n or set(order) != set(range(1, n + 1)):
-                    raise ValueError(
-                        f"Order must list each page exactly once (1–{n}). Got {len(order)} page(s)."
-                    )
-                for i in order:
-                    writer.add_page(reader.pages[i - 1])
-                with open(job.output_path, "wb") as f:
-                    writer.write(f)
-
-            # ---------- CROP ----------
-            elif job.job_type == JobType.CROP:
-                reader = PdfReader(job.input_paths[0])
-                writer = PdfWriter()
-                left = float(params.get("left", 0))
-                bottom = float(params.get("bottom", 0))
-                right = float(params.get("right", 0))
-                top = float(params.get("top", 0))
-                for page in reader.pages:
-                    mb = page.mediabox
-                    # Shrink mediabox by margins (crop)
-                    mb.left = FloatObject(float(mb.left) + left)
-                    mb.bottom = FloatObject(float(mb.bottom) + bottom)
-                    mb.right = FloatObject(float(mb.right) - right)
-                    mb.top = FloatObject(float(mb.top) - top)
-                    writer.add_page(page)
-                with open(job.output_path, "wb") as f:
-                    writer.write(f)
+                    _zip_write_pdf(zipf, f"split_page_{i}.pdf", w)
+            job.output_path = zip_path
+
+    # ---------- ROTATE ----------
+    elif job.job_type == JobType.ROTATE:
+        with _open_pdf_reader(job.input_paths[0]) as reader:
+            writer = PdfWriter()
+            n = len(reader.pages)
+            pages_to_rotate = set(params["pages"])
+            _check_pages_exist(pages_to_rotate, n)
+            angle = params["angle"]
+            # Rotate only the requested pages, then copy every page over in one call
+            for i in pages_to_rotate:
+                reader.pages[i - 1].rotate(angle)
+            writer.append_pages_from_reader(reader)
+            with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
+                writer.write(f)
+
+    # ---------- DELETE ----------
+    elif job.job_type == JobType.DELETE:
+        with _open_pdf_reader(job.input_paths[0]) as reader:
+            n = len(reader.pages)
+            delete_pages = set(params["pages"])
+            _check_pages_exist(delete_pages, n)
+            # Clone the document in one go and drop pages, last first so indices stay valid
+            writer = PdfWriter(clone_from=reader)
+            for i in sorted(delete_pages, reverse=True):
+                del writer.pages[i - 1]
+            with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
+                writer.write(f)
+
+    # ---------- EXTRACT ----------
+    elif job.job_type == JobType.EXTRACT:
+        with _open_pdf_reader(job.input_paths[0]) as reader:
+            writer = PdfWriter()
+            page_list = params["pages"]
+            n = len(reader.pages)
+            _check_pages_exist(page_list, n)
+            for i in page_list:
+                writer.add_page(reader.pages[i - 1])
+            with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
+                writer.write(f)
+
+    # ---------- REORDER ----------
+    elif job.job_type == JobType.REORDER:
+        with _open_pdf_reader(job.input_paths[0]) as reader:
+            writer = PdfWriter()
+            order = params["order"]
+            n = len(reader.pages)
+            _check_pages_exist(order, n)
+            # Entries are already checked to be in 1..n, so n distinct entries means each page once
+            if len(order) != n or len(set(order)) != n:
+                raise ValueError(
+                    f"Order must list each page exactly once (1–{n}). Got {len(order)} page(s)."
+                )
+            for i in order:
+                writer.add_page(reader.pages[i - 1])
+            with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
+                writer.write(f)
+
+    # ---------- CROP ----------
+    elif job.job_type == JobType.CROP:
+        with _open_pdf_reader(job.input_paths[0]) as reader:
+            writer = PdfWriter()
+            left = float(params.get("left", 0))
+            bottom = float(params.get("bottom", 0))
+            right = float(params.get("right", 0))
+            top = float(params.get("top", 0))
+            for page in reader.pages:
+                mb = page.mediabox
+                # Shrink mediabox by margins (crop)
+                mb.left = FloatObject(float(mb.left) + left)
+                mb.bottom = FloatObject(float(mb.bottom) + bottom)
+                mb.right = FloatObject(float(mb.right) - right)
+                mb.top = FloatObject(float(mb.top) - top)
+                writer.add_page(page)
+            with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
+                writer.write(f)
+
+    # ---------- COMPRESS ----------
+    elif job.job_type == JobType.COMPRESS:
+        method = params.get("method", "quality")
+        compression_level = int(params.get("compression_level", 5))
+        grayscale = params.get("grayscale") in (True, "true", "True", "1", 1)
+        desired_size = float(params.get("desired_size", 0))
+        desired_size_unit = params.get("desired_size_unit", "MB")
+
+        # 1) Default for everyone: use Ghostscript when available (real compression).
+        #    Level 1-9 → prepress, printer, ebook, screen. Windows: gswin64c/gswin32c.
+        gs_path = _which("gs") or _which("gswin64c") or _which("gswin32c")
+        if gs_path:
+            # Level 1-2=prepress, 3-4=printer, 5-6=ebook, 7-9=screen
+            if compression_level <= 2:
+                pdfsettings = "/prepress"
+            elif compression_level <= 4:
+                pdfsettings = "/printer"
+            elif compression_level <= 6:
+                pdfsettings = "/ebook"
+            else:
+                pdfsettings = "/screen"
+            gs_cmd = [
+                gs_path,
+                "-sDEVICE=pdfwrite",
+                "-dCompatibilityLevel=1.4",
+                "-dPDFSETTINGS=" + pdfsettings,
+                "-dNOPAUSE", "-dQUIET", "-dBATCH",
+                "-dNumRenderingThreads=" + str(os.cpu_count() or 1),
+                "-sOutputFile=" + job.output_path,
+                job.input_paths[0],
+            ]
+            if grayscale:
+                gs_cmd.insert(-1, "-dColorConversionStrategy=/Gray")
+                gs_cmd.insert(-1, "-dProcessColorModel=/DeviceGray")
+            # gs output is never read (failure just falls back), so don't buffer it
+            result = subprocess.run(
+                gs_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=120,
+            )
+            if result.returncode == 0 and os.path.isfile(job.output_path):
+                pass  # success
+            else:
+                gs_path = None  # fall through to fallback
+        if not gs_path:
+            # 2) Fallback when Ghostscript not installed: pikepdf or image path.
+            use_image_path = grayscale or method == "file_size" or (method == "quality" and compression_level >= 7)
+            if use_image_path:
+                try:
+                    from pdf2image import convert_from_path
+                    import img2pdf
 
-            # ---------- COMPRESS ----------
-            elif job.job_type == JobType.COMPRESS:
-                method = params.get("method", "quality")
-                compression_level = int(params.get("compression_level", 5))
-                grayscale = params.get("grayscale") in (True, "true", "True", "1", 1)
-                desired_size = float(params.get("desired_size", 0))
-                desired_size_unit = params.get("desired_size_unit", "MB")
-
-                # 1) Default for everyone: use Ghostscript when available (real compression).
-                #    Level 1-9 → prepress, printer, ebook, screen. Windows: gswin64c/gswin32c.
-                gs_path = shutil.which("gs") or shutil.which("gswin64c") or shutil.which("gswin32c")
-                if gs_path:
-                    # Level 1-2=prepress, 3-4=printer, 5-6=ebook, 7-9=screen
-                    if compression_level <= 2:
-                        pdfsettings = "/prepress"
-                    elif compression_level <= 4:
-                        pdfsettings = "/printer"
-                    elif compression_level <= 6:
-                        pdfsettings = "/ebook"
-                    else:
-                        pdfsettings = "/screen"
-                    gs_cmd = [
-                        gs_path,
-                        "-sDEVICE=pdfwrite",
-                        "-dCompatibilityLevel=1.4",
-                        "-dPDFSETTINGS=" + pdfsettings,
-                        "-dNOPAUSE", "-dQUIET", "-dBATCH",
-                        "-sOutputFile=" + job.output_path,
-                        job.input_paths[0],
-                    ]
-                    if grayscale:
-                        gs_cmd.insert(-1, "-dColorConversionStrategy=/Gray")
-                        gs_cmd.insert(-1, "-dProcessColorModel=/DeviceGray")
-                    result = subprocess.run(gs_cmd, capture_output=True, timeout=120)
-                    if result.returncode == 0 and os.path.isfile(job.output_path):
-                        pass  # success
-                    else:
-                        gs_path = None  # fall through to fallback
-                if not gs_path:
-                    # 2) Fallback when Ghostscript not installed: pikepdf or image path.
-                    use_image_path = grayscale or method == "file_size" or (method == "quality" and compression_level >= 7)
-                    if use_image_path:
-                        try:
-                            from pdf2image import convert_from_path
-                            import img2pdf
-                            from PIL import Image
-
-                            if method == "file_size" and desired_size > 0:
-                                quality = 40
-                            else:
-                                quality = min(95, 35 + compression_level * 6)
-
-                            images = convert_from_path(job.input_paths[0], dpi=150)
-                            base_dir = os.path.dirname(job.output_path)
-                            img_paths = []
-                            for i, img in enumerate(images):
-                                if grayscale:
-                                    img = img.convert("L").convert("RGB")
-                                path = os.path.join(base_dir, f"page_{i:04d}.jpg")
-                                img.save(path, "JPEG", quality=quality, optimize=True)
-                                img_paths.append(path)
-                            with open(job.output_path, "wb") as f:
-                                f.write(img2pdf.convert(img_paths))
-                            for p in img_paths:
-                                try:
-                                    os.remove(p)
-                                except OSError:
-                                    pass
-                        except ImportError:
-                            try:
-                                import pikepdf
-                                pdf = pikepdf.open(job.input_paths[0])
-                                pdf.save(job.output_path, compress_streams=True, object_stream_mode=pikepdf.ObjectStreamMode.generate)
-                                pdf.close()
-                            except ImportError:
-                                reader = PdfReader(job.input_paths[0])
-                                writer = PdfWriter(clone_from=reader)
-                                with open(job.output_path, "wb") as f:
-                                    writer.write(f)
+                    if method == "file_size" and desired_size > 0:
+                        quality = 40
                     else:
-                        # Level 1 (least compression): minimal rewrite so we don't inflate. No object streams.
-                        try:
-                            import pikepdf
-                            pdf = pikepdf.open(job.input_paths[0])
-                            if compression_level <= 1:
-                                pdf.save(job.output_path, compress_streams=False, object_stream_mode=pikepdf.ObjectStreamMode.disable)
-                            else:
-                                pdf.save(job.output_path, compress_streams=True, object_stream_mode=pikepdf.ObjectStreamMode.generate)
-                            pdf.close()
-                        except ImportError:
-                            reader = PdfReader(job.input_paths[0])
+                        quality = min(95, 35 + compression_level * 6)
+
+                    base_dir = os.path.dirname(job.output_path)
+                    with tempfile.TemporaryDirectory(dir=base_dir) as tmp:
+                        # pdftoppm encodes the JPEGs (and renders grayscale) itself, page files go
+                        # to disk as they are produced: no full-page PIL copies held in memory
+                        img_paths = convert_from_path(
+                            job.input_paths[0],
+                            dpi=150,
+                            fmt="jpeg",
+                            jpegopt={"quality": quality, "optimize": True},
+                            grayscale=grayscale,
+                            output_folder=tmp,
+                            paths_only=True,
+                            thread_count=os.cpu_count() or 1,
+                        )
+                        with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
+                            img2pdf.convert(img_paths, outputstream=f)
+                except ImportError:
+                    try:
+                        import pikepdf
+                        pdf = pikepdf.open(job.input_paths[0])
+                        pdf.save(job.output_path, compress_streams=True, object_stream_mode=pikepdf.ObjectStreamMode.generate)
+                        pdf.close()
+                    except ImportError:
+                        with _open_pdf_reader(job.input_paths[0]) as reader:
                             writer = PdfWriter(clone_from=reader)
-                            with open(job.output_path, "wb") as f:
+                            with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
                                 writer.write(f)
-
-            # ---------- REPAIR ----------
-            elif job.job_type == JobType.REPAIR:
+            else:
+                # Level 1 (least compression): minimal rewrite so we don't inflate. No object streams.
                 try:
                     import pikepdf
-                    pdf = pikepdf.open(job.input_paths[0], allow_overwriting_input=True)
-                    pdf.save(job.output_path)
+                    pdf = pikepdf.open(job.input_paths[0])
+                    if compression_level <= 1:
+                        pdf.save(job.output_path, compress_streams=False, object_stream_mode=pikepdf.ObjectStreamMode.disable)
+                    else:
+                        pdf.save(job.output_path, compress_streams=True, object_stream_mode=pikepdf.ObjectStreamMode.generate)
                     pdf.close()
-                except Exception:
-                    reader = PdfReader(job.input_paths[0])
-                    writer = PdfWriter()
-                    for page in reader.pages:
-                        writer.add_page(page)
-                    with open(job.output_path, "wb") as f:
-                        writer.write(f)
+                except ImportError:
+                    with _open_pdf_reader(job.input_paths[0]) as reader:
+                        writer = PdfWriter(clone_from=reader)
+                        with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
+                            writer.write(f)
 
-            # ---------- ADD WATERMARK ----------
-            elif job.job_type == JobType.ADD_WATERMARK:
-                from reportlab.pdfgen import canvas
-                text = params.get("text", "Watermark")
-                opacity = float(params.get("opacity", 0.5))
-                reader = PdfReader(job.input_paths[0])
+    # ---------- REPAIR ----------
+    elif job.job_type == JobType.REPAIR:
+        try:
+            import pikepdf
+            pdf = pikepdf.open(job.input_paths[0], allow_overwriting_input=True)
+            pdf.save(job.output_path)
+            pdf.close()
+        except Exception:
+            with _open_pdf_reader(job.input_paths[0]) as reader:
                 writer = PdfWriter()
-                base_font_size = 72
                 for page in reader.pages:
-                    w = float(page.mediabox.width)
-                    h = float(page.mediabox.height)
-                    diagonal = (w * w + h * h) ** 0.5
-                    buf = io.BytesIO()
-                    c = canvas.Canvas(buf, pagesize=(w, h))
-                    c.setFillColorRGB(0.5, 0.5, 0.5, alpha=opacity)
-                    c.setFont("Helvetica-Bold", base_font_size)
-                    text_width_at_base = c.stringWidth(text)
-                    if text_width_at_base > 0:
-                        ratio = text_width_at_base / base_font_size
-                        text_height_factor = 1.4
-                        margin = 0.72
-                        font_size = (margin * diagonal) / (ratio * ratio + text_height_factor * text_height_factor) ** 0.5
-                    else:
-                        font_size = base_font_size
-                    c.setFont("Helvetica-Bold", font_size)
-                    tw = c.stringWidth(text)
-                    c.saveState()
-                    c.translate(w / 2, h / 2)
-                    c.rotate(45)
-                    c.drawString(-tw / 2, -font_size * 0.35, text)
-                    c.restoreState()
-                    c.save()
-                    buf.seek(0)
-                    overlay_page = PdfReader(buf).pages[0]
-                    page.merge_page(overlay_page)
-                    writer.add_page(page)
-                with open(job.output_path, "wb") as f:
-                    writer.write(f)
-
-            # ---------- ADD PAGE NUMBERS ----------
-            elif job.job_type == JobType.ADD_PAGE_NUMBERS:
-                from reportlab.pdfgen import canvas
-                from reportlab.lib.pagesizes import letter
-                template = params.get("template", "Page {n} of {total}")
-                position = params.get("position", "bottom_center")
-                reader = PdfReader(job.input_paths[0])
-                total = len(reader.pages)
-                writer = PdfWriter()
-                for idx, page in enumerate(reader.pages, start=1):
-                    text = template.replace("{n}", str(idx)).replace("{total}", str(total))
-                    buf = io.BytesIO()
-                    c = canvas.Canvas(buf, pagesize=letter)
-                    c.setFillColorRGB(0.2, 0.2, 0.2)
-                    c.setFont("Helvetica", 10)
-                    w, h = letter
-                    if position == "bottom_center":
-                        c.drawCentredString(w / 2, 36, text)
-                    elif position == "bottom_right":
-                        c.drawRightString(w - 72, 36, text)
-                    elif position == "bottom_left":
-                        c.drawString(72, 36, text)
-                    elif position == "top_center":
-                        c.drawCentredString(w / 2, h - 36, text)
-                    elif position == "top_right":
-                        c.drawRightString(w - 72, h - 36, text)
-                    else:
-                        c.drawCentredString(w / 2, 36, text)
-                    c.save()
-                    buf.seek(0)
-                    overlay = PdfReader(buf).pages[0]
-                    page.merge_page(overlay)
                     writer.add_page(page)
-                with open(job.output_path, "wb") as f:
+                with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
                     writer.write(f)
 
-            # ---------- PROTECT (encrypt) ----------
-            elif job.job_type == JobType.PROTECT:
-                password = params.get("password", "")
-                reader = PdfReader(job.input_paths[0])
+    # ---------- ADD WATERMARK ----------
+    elif job.job_type == JobType.ADD_WATERMARK:
+        text = params.get("text", "Watermark")
+        opacity = float(params.get("opacity", 0.5))
+        _stamp_overlays(
+            job.input_paths[0], job.output_path, lambda sizes: _watermark_overlays(sizes, text, opacity),
+        )
+
+    # ---------- ADD PAGE NUMBERS ----------
+    elif job.job_type == JobType.ADD_PAGE_NUMBERS:
+        template = params.get("template", "Page {n} of {total}")
+        position = params.get("position", "bottom_center")
+        _stamp_overlays(
+            job.input_paths[0], job.output_path, lambda sizes: _page_number_overlays(len(sizes), template, position),
+        )
+
+    # ---------- PROTECT (encrypt) ----------
+    elif job.job_type == JobType.PROTECT:
+        password = params.get("password", "")
+        if not _pikepdf_encrypt(job.input_paths[0], job.output_path, password):
+            with _open_pdf_reader(job.input_paths[0]) as reader:
                 writer = PdfWriter(clone_from=reader)
                 writer.encrypt(password, algorithm="AES-256")
-                with open(job.output_path, "wb") as f:
+                with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
                     writer.write(f)
 
-            # ---------- UNLOCK (decrypt) ----------
-            elif job.job_type == JobType.UNLOCK:
-                password = params.get("password", "")
-                reader = PdfReader(job.input_paths[0])
+    # ---------- UNLOCK (decrypt) ----------
+    elif job.job_type == JobType.UNLOCK:
+        password = params.get("password", "")
+        if not _pikepdf_decrypt(job.input_paths[0], job.output_path, password):
+            with _open_pdf_reader(job.input_paths[0]) as reader:
                 if reader.is_encrypted:
                     reader.decrypt(password)
                 writer = PdfWriter()
                 for page in reader.pages:
                     writer.add_page(page)
-                with open(job.output_path, "wb") as f:
+                with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
                     writer.write(f)
 
-            # ---------- IMG TO PDF ----------
-            elif job.job_type == JobType.IMG_TO_PDF:
-                try:
-                    import img2pdf
-                    with open(job.output_path, "wb") as f:
-                        f.write(img2pdf.convert(job.input_paths))
-                except ImportError:
-                    from reportlab.pdfgen import canvas
-                    from reportlab.lib.pagesizes import letter
-                    from reportlab.lib.utils import ImageReader
-                    c = canvas.Canvas(job.output_path, pagesize=letter)
-                    for path in job.input_paths:
-                        img = ImageReader(path)
-                        iw, ih = img.getSize()
-                        c.setPageSize((iw, ih))
-                        c.drawImage(path, 0, 0, width=iw, height=ih)
-                        c.showPage()
-                    c.save()
+    # ---------- IMG TO PDF ----------
+    elif job.job_type == JobType.IMG_TO_PDF:
+        try:
+            import img2pdf
+            # Written straight to the file rather than returned as one bytes object; JPEGs are
+            # embedded as-is (no re-encode), other formats are converted by img2pdf
+            with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
+                img2pdf.convert(job.input_paths, outputstream=f)
+        except ImportError:
+            from reportlab.pdfgen import canvas
+            from reportlab.lib.pagesizes import letter
+            from reportlab.lib.utils import ImageReader
+            c = canvas.Canvas(job.output_path, pagesize=letter)
+            for path in job.input_paths:
+                img = ImageReader(path)
+                iw, ih = img.getSize()
+                c.setPageSize((iw, ih))
+                c.drawImage(path, 0, 0, width=iw, height=ih)
+                c.showPage()
+            c.save()
 
-            # ---------- PDF TO IMG ----------
-            elif job.job_type == JobType.PDF_TO_IMG:
-                try:
-                    from pdf2image import convert_from_path
-                    img_format = params.get("format", "jpg")
-                    images = convert_from_path(job.input_paths[0], dpi=150, fmt=img_format)
-                    base_dir = os.path.dirname(job.output_path)
-                    zip_path = os.path.join(base_dir, "images.zip")
-                    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-                        for i, img in enumerate(images, start=1):
-                            buf = io.BytesIO()
-                            img.save(buf, format="JPEG" if img_format == "jpg" else "PNG", quality=90)
-                            buf.seek(0)
-                            ext = "jpg" if img_format == "jpg" else "png"
-                            zipf.writestr(f"page_{i}.{ext}", buf.getvalue())
-                    job.output_path = zip_path
-                except ImportError:
-                    raise ValueError(
-                        "pdf2image is required for PDF to images. Install: pip install pdf2image. "
-                        "On Windows you may need poppler: https://github.com/oschwartz10612/poppler-windows/releases"
-                    )
+    # ---------- PDF TO IMG ----------
+    elif job.job_type == JobType.PDF_TO_IMG:
+        try:
+            from pdf2image import convert_from_path
+            ext = "jpg" if params.get("format", "jpg") == "jpg" else "png"
+            base_dir = os.path.dirname(job.output_path)
+            zip_path = os.path.join(base_dir, "images.zip")
+            with tempfile.TemporaryDirectory(dir=base_dir) as tmp:
+                # poppler writes the final JPEG/PNG files itself (no PIL decode + re-encode),
+                # split across several pdftoppm processes; paths come back in page order
+                paths = convert_from_path(
+                    job.input_paths[0],
+                    dpi=150,
+                    fmt="jpeg" if ext == "jpg" else "png",
+                    jpegopt={"quality": 90},
+                    output_folder=tmp,
+                    paths_only=True,
+                    thread_count=os.cpu_count() or 1,
+                )
+                # JPEG and PNG are already compressed; deflating them again only costs CPU
+                with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as zipf:
+                    for i, path in enumerate(paths, start=1):
+                        zipf.write(path, arcname=f"page_{i}.{ext}")
+            job.output_path = zip_path
+        except ImportError:
+            raise ValueError(
+                "pdf2image is required for PDF to images. Install: pip install pdf2image. "
+                "On Windows you may need poppler: https://github.com/oschwartz10612/poppler-windows/releases"
+            )
 
-            # ---------- OCR ----------
-            elif job.job_type == JobType.OCR:
-                try:
-                    from pdf2image import convert_from_path
-                    import pytesseract
-                    # On Windows, Tesseract is often not in PATH; try common install locations
-                    if os.name == "nt":
-                        _tesseract_cmd = (
-                            shutil.which("tesseract")
-                            or (os.environ.get("TESSERACT_CMD"))
-                            or _find_tesseract_windows()
-                        )
-                        if _tesseract_cmd:
-                            pytesseract.pytesseract.tesseract_cmd = _tesseract_cmd
-                    images = convert_from_path(job.input_paths[0], dpi=300)
-                    writer = PdfWriter()
-                    for img in images:
-                        pdf_bytes = pytesseract.image_to_pdf_or_hocr(img, extension="pdf")
-                        buf = io.BytesIO(pdf_bytes)
-                        r = PdfReader(buf)
-                        for p in r.pages:
-                            writer.add_page(p)
-                    with open(job.output_path, "wb") as f:
-                        writer.write(f)
-                except ImportError as e:
+    # ---------- OCR ----------
+    elif job.job_type == JobType.OCR:
+        try:
+            from pdf2image import convert_from_path
+            import pytesseract
+            # On Windows, Tesseract is often not in PATH; try common install locations
+            if os.name == "nt":
+                _tesseract_cmd = (
+                    _which("tesseract")
+                    or (os.environ.get("TESSERACT_CMD"))
+                    or _find_tesseract_windows()
+                )
+                if _tesseract_cmd:
+                    pytesseract.pytesseract.tesseract_cmd = _tesseract_cmd
+            cpus = os.cpu_count() or 1
+            base_dir = os.path.dirname(job.output_path)
+            with tempfile.TemporaryDirectory(dir=base_dir) as tmp:
+                # Pages go to PNG files rather than a list of full-size PIL images in memory
+                paths = convert_from_path(
+                    job.input_paths[0],
+                    dpi=300,
+                    fmt="png",
+                    output_folder=tmp,
+                    paths_only=True,
+                    thread_count=cpus,
+                )
+                # Every pytesseract call runs its own tesseract process, so threads are enough to
+                # OCR pages in parallel. Up to WORKER_CONCURRENCY jobs run at once, so each gets
+                # its share of the cores (OMP_THREAD_LIMIT=1 is set once at worker startup)
+                with ThreadPoolExecutor(max_workers=_OCR_THREADS) as ocr_threads:
+                    page_pdfs = list(ocr_threads.map(
+                        lambda path: pytesseract.image_to_pdf_or_hocr(path, extension="pdf"), paths
+                    ))
+            writer = PdfWriter()
+            for pdf_bytes in page_pdfs:
+                buf = io.BytesIO(pdf_bytes)
+                r = PdfReader(buf)
+                for p in r.pages:
+                    writer.add_page(p)
+            with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
+                writer.write(f)
+        except ImportError as e:
+            raise ValueError(
+                "OCR requires pdf2image and pytesseract, and Tesseract installed on the system. "
+                f"Install: pip install pdf2image pytesseract. Then install Tesseract. {e}"
+            )
+
+    # ---------- PDF TO PDF/A ----------
+    elif job.job_type == JobType.PDF_TO_PDFA:
+        try:
+            import pikepdf
+            pdf = pikepdf.open(job.input_paths[0])
+            # No normalize_content: rewriting every content stream is slow and not needed for PDF/A
+            pdf.save(job.output_path)
+            pdf.close()
+        except Exception:
+            with _open_pdf_reader(job.input_paths[0]) as r:
+                w = PdfWriter(clone_from=r)
+                with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
+                    w.write(f)
+
+    # ---------- HTML TO PDF ----------
+    elif job.job_type == JobType.HTML_TO_PDF:
+        try:
+            # WeasyPrint on Windows needs Pango DLLs (e.g. from MSYS2). Prefer WEASYPRINT_DLL_DIRECTORIES.
+            if os.name == "nt" and "WEASYPRINT_DLL_DIRECTORIES" not in os.environ:
+                _dll_dir = os.path.join(os.environ.get("MSYS2_PATH", "C:\\msys64"), "mingw64", "bin")
+                if os.path.isdir(_dll_dir):
+                    os.environ["WEASYPRINT_DLL_DIRECTORIES"] = _dll_dir
+            from weasyprint import HTML
+            url = (job.params or {}).get("url")
+            _ensure_dir(job.output_path)
+            if url:
+                HTML(url=url).write_pdf(job.output_path)
+            else:
+                HTML(filename=job.input_paths[0]).write_pdf(job.output_path)
+        except ImportError:
+            raise ValueError("HTML to PDF requires weasyprint. Install: pip install weasyprint")
+
+    # ---------- PDF TO TEXT ----------
+    elif job.job_type == JobType.PDF_TO_TEXT:
+        fmt = params.get("format", "text")
+        parts = _page_texts(job.input_paths[0])
+        if fmt == "markdown":
+            parts = [f"---\n## Page {i}\n\n{t}" for i, t in enumerate(parts, start=1)]
+        with open(job.output_path, "w", encoding="utf-8") as f:
+            f.write("\n\n".join(parts))
+
+    # ---------- SPLIT BY RANGE ----------
+    elif job.job_type == JobType.SPLIT_BY_RANGE:
+        with _open_pdf_reader(job.input_paths[0]) as reader:
+            base_dir = os.path.dirname(job.output_path)
+            zip_path = os.path.join(base_dir, "split_output.zip")
+            n = len(reader.pages)
+            for a, b in params["ranges"]:
+                if a < 1 or b > n or a > b:
                     raise ValueError(
-                        "OCR requires pdf2image and pytesseract, and Tesseract installed on the system. "
-                        f"Install: pip install pdf2image pytesseract. Then install Tesseract. {e}"
+                        f"Range {a}-{b} is invalid. PDF has {n} page(s) (valid: 1–{n})."
                     )
-
-            # ---------- PDF TO PDF/A ----------
-            elif job.job_type == JobType.PDF_TO_PDFA:
-                try:
-                    import pikepdf
-                    pdf = pikepdf.open(job.input_paths[0])
-                    pdf.save(job.output_path, normalize_content=True)
-                    pdf.close()
-                except Exception:
-                    r = PdfReader(job.input_paths[0])
-                    w = PdfWriter(clone_from=r)
-                    with open(job.output_path, "wb") as f:
-                        w.write(f)
-
-            # ---------- HTML TO PDF ----------
-            elif job.job_type == JobType.HTML_TO_PDF:
-                try:
-                    # WeasyPrint on Windows needs Pango DLLs (e.g. from MSYS2). Prefer WEASYPRINT_DLL_DIRECTORIES.
-                    if os.name == "nt" and "WEASYPRINT_DLL_DIRECTORIES" not in os.environ:
-                        _dll_dir = os.path.join(os.environ.get("MSYS2_PATH", "C:\\msys64"), "mingw64", "bin")
-                        if os.path.isdir(_dll_dir):
-                            os.environ["WEASYPRINT_DLL_DIRECTORIES"] = _dll_dir
-                    from weasyprint import HTML
-                    url = (job.params or {}).get("url")
-                    _ensure_dir(job.output_path)
-                    if url:
-                        HTML(url=url).write_pdf(job.output_path)
-                    else:
-                        HTML(filename=job.input_paths[0]).write_pdf(job.output_path)
-                except ImportError:
-                    raise ValueError("HTML to PDF requires weasyprint. Install: pip install weasyprint")
-
-            # ---------- PDF TO TEXT ----------
-            elif job.job_type == JobType.PDF_TO_TEXT:
-                fmt = params.get("format", "text")
-                try:
-                    import pdfplumber
-                    with pdfplumber.open(job.input_paths[0]) as pdf:
-                        parts = []
-                        for page in pdf.pages:
-                            t = page.extract_text() or ""
-                            if fmt == "markdown":
-                                parts.append(f"---\n## Page {len(parts)+1}\n\n{t}")
-                            else:
-                                parts.append(t)
-                        out = "\n\n".join(parts)
-                    with open(job.output_path, "w", encoding="utf-8") as f:
-                        f.write(out)
-                except ImportError:
-                    reader = PdfReader(job.input_paths[0])
-                    parts = []
-                    for i, page in enumerate(reader.pages):
-                        t = page.extract_text() or ""
-                        if fmt == "markdown":
-                            parts.append(f"---\n## Page {i+1}\n\n{t}")
-                        else:
-                            parts.append(t)
-                    with open(job.output_path, "w", encoding="utf-8") as f:
-                        f.write("\n\n".join(parts))
-
-            # ---------- SPLIT BY RANGE ----------
-            elif job.job_type == JobType.SPLIT_BY_RANGE:
-                reader = PdfReader(job.input_paths[0])
-                base_dir = os.path.dirname(job.output_path)
-                zip_path = os.path.join(base_dir, "split_output.zip")
-                n = len(reader.pages)
-                for a, b in params["ranges"]:
-                    if a < 1 or b > n or a > b:
-                        raise ValueError(
-                            f"Range {a}-{b} is invalid. PDF has {n} page(s) (valid: 1–{n})."
-                        )
-                split_files = []
+            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=_ZIP_COMPRESSLEVEL) as zipf:
                 for idx, (a, b) in enumerate(params["ranges"], start=1):
                     w = PdfWriter()
                     for i in range(a, b + 1):
                         w.add_page(reader.pages[i - 1])
-                    out_path = os.path.join(base_dir, f"split_{idx}.pdf")
-                    _ensure_dir(out_path)
-                    with open(out_path, "wb") as f:
-                        w.write(f)
-                    split_files.append(out_path)
-                with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-                    for fp in split_files:
-                        zipf.write(fp, arcname=os.path.basename(fp))
-                job.output_path = zip_path
-
-            # ---------- OFFICE TO PDF ----------
-            elif job.job_type == JobType.OFFICE_TO_PDF:
-                base_dir = os.path.dirname(os.path.abspath(job.output_path))
-                input_file = os.path.abspath(job.input_paths[0])
-                if not os.path.isfile(input_file):
-                    input_file = os.path.realpath(job.input_paths[0])  # canonical path
-                # LibreOffice: --headless --convert-to pdf --outdir <dir> <file>
-                libreoffice_cmd = "libreoffice"
-                libreoffice_cwd = None
-                libreoffice_env = None
-                if os.name == "nt":
-                    libreoffice_cmd = shutil.which("libreoffice") or os.environ.get("LIBREOFFICE_CMD") or _find_libreoffice_windows() or libreoffice_cmd
-                    if libreoffice_cmd == "libreoffice":
-                        libreoffice_cmd = shutil.which("soffice") or libreoffice_cmd
-                    if os.path.isfile(libreoffice_cmd):
-                        libreoffice_cwd = os.path.dirname(libreoffice_cmd)
-                        lo_parent = os.path.dirname(libreoffice_cwd)
-                        path_prepend = libreoffice_cwd + os.pathsep + lo_parent + os.pathsep + os.environ.get("PATH", "")
-                        libreoffice_env = {**os.environ, "PATH": path_prepend}
-                cmd = [
-                    libreoffice_cmd, "--headless", "--convert-to", "pdf",
-                    "--outdir", base_dir, input_file,
-                ]
-                result = subprocess.run(
-                    cmd, capture_output=True, text=True, timeout=120,
-                    cwd=libreoffice_cwd, env=libreoffice_env,
+                    _zip_write_pdf(zipf, f"split_{idx}.pdf", w)
+            job.output_path = zip_path
+
+    # ---------- OFFICE TO PDF ----------
+    elif job.job_type == JobType.OFFICE_TO_PDF:
+        base_dir = os.path.dirname(os.path.abspath(job.output_path))
+        input_file = os.path.abspath(job.input_paths[0])
+        if not os.path.isfile(input_file):
+            input_file = os.path.realpath(job.input_paths[0])  # canonical path
+        # LibreOffice: --headless --convert-to pdf --outdir <dir> <file>
+        libreoffice_cmd = "libreoffice"
+        libreoffice_cwd = None
+        libreoffice_env = None
+        if os.name == "nt":
+            libreoffice_cmd = _which("libreoffice") or os.environ.get("LIBREOFFICE_CMD") or _find_libreoffice_windows() or libreoffice_cmd
+            if libreoffice_cmd == "libreoffice":
+                libreoffice_cmd = _which("soffice") or libreoffice_cmd
+            if os.path.isfile(libreoffice_cmd):
+                libreoffice_cwd = os.path.dirname(libreoffice_cmd)
+                lo_parent = os.path.dirname(libreoffice_cwd)
+                path_prepend = libreoffice_cwd + os.pathsep + lo_parent + os.pathsep + os.environ.get("PATH", "")
+                libreoffice_env = {**os.environ, "PATH": path_prepend}
+        cmd = [
+            libreoffice_cmd, "--headless", "--convert-to", "pdf",
+            "--outdir", base_dir, input_file,
+        ]
+        result = subprocess.run(
+            cmd, capture_output=True, text=True, timeout=120,
+            cwd=libreoffice_cwd, env=libreoffice_env,
+        )
+        if result.returncode != 0:
+            raise ValueError(f"LibreOffice failed: {result.stderr or result.stdout}")
+        base_name = os.path.splitext(os.path.basename(job.input_paths[0]))[0]
+        expected = os.path.join(base_dir, f"{base_name}.pdf")
+        if os.path.isfile(expected) and expected != job.output_path:
+            shutil.move(expected, job.output_path)
+
+    # ---------- PDF TO OFFICE ----------
+    elif job.job_type == JobType.PDF_TO_OFFICE:
+        fmt = params.get("format", "docx")
+        base_dir = os.path.dirname(os.path.abspath(job.output_path))
+        input_file = os.path.abspath(job.input_paths[0])
+        if not os.path.isfile(input_file):
+            input_file = os.path.realpath(job.input_paths[0])  # canonical path
+        base_name = os.path.splitext(os.path.basename(job.input_paths[0]))[0]
+        expected = os.path.join(base_dir, f"{base_name}.{fmt}")
+
+        # For DOCX, try pdf2docx first — produces native Word OOXML so Word opens it correctly (not blank)
+        if fmt == "docx":
+            try:
+                from pdf2docx import Converter
+                cv = Converter(input_file)
+                cv.convert(job.output_path)
+                cv.close()
+                # pdf2docx wrote to job.output_path; nothing to move
+            except Exception:
+                # Fall back to LibreOffice (e.g. pdf2docx not installed or conversion failed)
+                _run_libreoffice_convert(
+                    job, input_file, base_dir, fmt, base_name, expected,
                 )
-                if result.returncode != 0:
-                    raise ValueError(f"LibreOffice failed: {result.stderr or result.stdout}")
-                base_name = os.path.splitext(os.path.basename(job.input_paths[0]))[0]
-                expected = os.path.join(base_dir, f"{base_name}.pdf")
-                if os.path.isfile(expected) and expected != job.output_path:
-                    shutil.move(expected, job.output_path)
-
-            # ---------- PDF TO OFFICE ----------
-            elif job.job_type == JobType.PDF_TO_OFFICE:
-                fmt = params.get("format", "docx")
-                base_dir = os.path.dirname(os.path.abspath(job.output_path))
-                input_file = os.path.abspath(job.input_paths[0])
-                if not os.path.isfile(input_file):
-                    input_file = os.path.realpath(job.input_paths[0])  # canonical path
-                base_name = os.path.splitext(os.path.basename(job.input_paths[0]))[0]
-                expected = os.path.join(base_dir, f"{base_name}.{fmt}")
-
-                # For DOCX, try pdf2docx first — produces native Word OOXML so Word opens it correctly (not blank)
-                if fmt == "docx":
+        else:
+            _run_libreoffice_convert(
+                job, input_file, base_dir, fmt, base_name, expected,
+            )
+
+    # ---------- FLATTEN ----------
+    elif job.job_type == JobType.FLATTEN:
+        import pikepdf
+
+        def _strip_form_keep_links_only(pdf_doc):
+            """Remove AcroForm and all non-Link annotations so form fields are not clickable."""
+            if pikepdf.Name.AcroForm in pdf_doc.Root:
+                del pdf_doc.Root[pikepdf.Name.AcroForm]
+            for page in pdf_doc.pages:
+                annots = page.get(pikepdf.Name.Annots)
+                if annots is None:
+                    continue
+                keep = []
+                for ref in list(annots):
                     try:
-                        from pdf2docx import Converter
-                        cv = Converter(input_file)
-                        cv.convert(job.output_path)
-                        cv.close()
-                        # pdf2docx wrote to job.output_path; nothing to move
+                        obj = ref.get_object() if hasattr(ref, "get_object") else ref
+                        if obj.get(pikepdf.Name.Subtype) == pikepdf.Name.Link:
+                            keep.append(ref)
                     except Exception:
-                        # Fall back to LibreOffice (e.g. pdf2docx not installed or conversion failed)
-                        _run_libreoffice_convert(
-                            job, input_file, base_dir, fmt, base_name, expected,
-                        )
-                else:
-                    _run_libreoffice_convert(
-                        job, input_file, base_dir, fmt, base_name, expected,
-                    )
+                        pass
+                page.obj[pikepdf.Name.Annots] = pikepdf.Array(keep)
 
-            # ---------- FLATTEN ----------
-            elif job.job_type == JobType.FLATTEN:
-                import pikepdf
-
-                def _strip_form_keep_links_only(pdf_doc):
-                    """Remove AcroForm and all non-Link annotations so form fields are not clickable."""
-                    if pikepdf.Name.AcroForm in pdf_doc.Root:
-                        del pdf_doc.Root[pikepdf.Name.AcroForm]
-                    for page in pdf_doc.pages:
-                        annots = page.get(pikepdf.Name.Annots)
-                        if annots is None:
-                            continue
-                        keep = []
-                        for ref in list(annots):
-                            try:
-                                obj = ref.get_object() if hasattr(ref, "get_object") else ref
-                                if obj.get(pikepdf.Name.Subtype) == pikepdf.Name.Link:
-                                    keep.append(ref)
-                            except Exception:
-                                pass
-                        page.obj[pikepdf.Name.Annots] = pikepdf.Array(keep)
-
-                flatten_only_forms = params.get("flatten_only_forms") in (True, "true", "True", 1)
+        flatten_only_forms = params.get("flatten_only_forms") in (True, "true", "True", 1)
+        try:
+            pdf = pikepdf.open(job.input_paths[0])
+            if flatten_only_forms:
+                # Flatten all (burns form widgets into content); then strip to only Link annots
+                pdf.generate_appearance_streams()
+                pdf.flatten_annotations(mode="all")
+                # Strip in memory and write once (no save / reopen / save round trip)
+                _strip_form_keep_links_only(pdf)
+                pdf.save(job.output_path)
+                pdf.close()
+            else:
+                # Full flatten: burn all annotations, remove them
+                pdf.generate_appearance_streams()
+                pdf.flatten_annotations(mode="all")
+                for page in pdf.pages:
+                    if "/Annots" in page:
+                        del page["/Annots"]
+                pdf.save(job.output_path)
+                pdf.close()
+        except Exception:
+            if flatten_only_forms:
+                # Flatten failed; still strip form so output has no clickable forms
                 try:
                     pdf = pikepdf.open(job.input_paths[0])
-                    if flatten_only_forms:
-                        # Flatten all (burns form widgets into content); then strip to only Link annots
-                        pdf.generate_appearance_streams()
-                        pdf.flatten_annotations(mode="all")
-                        pdf.save(job.output_path)
-                        pdf.close()
-                        out = pikepdf.open(job.output_path)
-                        _strip_form_keep_links_only(out)
-                        out.save(job.output_path)
-                        out.close()
-                    else:
-                        # Full flatten: burn all annotations, remove them
-                        pdf.generate_appearance_streams()
-                        pdf.flatten_annotations(mode="all")
-                        for page in pdf.pages:
-                            if "/Annots" in page:
-                                del page["/Annots"]
-                        pdf.save(job.output_path)
-                        pdf.close()
+                    _strip_form_keep_links_only(pdf)
+                    pdf.save(job.output_path)
+                    pdf.close()
                 except Exception:
-                    if flatten_only_forms:
-                        # Flatten failed; still strip form so output has no clickable forms
-                        try:
-                            pdf = pikepdf.open(job.input_paths[0])
-                            _strip_form_keep_links_only(pdf)
-                            pdf.save(job.output_path)
-                            pdf.close()
-                        except Exception:
-                            pass
-                    if not os.path.exists(job.output_path):
-                        reader = PdfReader(job.input_paths[0])
-                        writer = PdfWriter()
-                        for page in reader.pages:
-                            writer.add_page(page)
-                        with open(job.output_path, "wb") as f:
-                            writer.write(f)
-
-            # ---------- REMOVE BLANKS ----------
-            elif job.job_type == JobType.REMOVE_BLANKS:
-                reader = PdfReader(job.input_paths[0])
-                try:
-                    from pdf2image import convert_from_path
-                    images = convert_from_path(job.input_paths[0], dpi=72)
+                    pass
+            if not os.path.exists(job.output_path):
+                with _open_pdf_reader(job.input_paths[0]) as reader:
                     writer = PdfWriter()
-                    threshold = float(params.get("threshold", 0.01))
-                    for i, img in enumerate(images):
-                        if i >= len(reader.pages):
-                            break
-                        import statistics
-                        px = list(img.getdata())
-                        if len(px) == 0:
-                            writer.add_page(reader.pages[i])
-                            continue
-                        if isinstance(px[0], tuple):
-                            mean = sum(sum(p) for p in px) / (len(px) * len(px[0]))
-                        else:
-                            mean = statistics.mean(px)
-                        if mean < 255 * (1 - threshold):
-                            writer.add_page(reader.pages[i])
-                    with open(job.output_path, "wb") as f:
-                        writer.write(f)
-                except ImportError:
-                    writer = PdfWriter(clone_from=reader)
-                    with open(job.output_path, "wb") as f:
+                    for page in reader.pages:
+                        writer.add_page(page)
+                    with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
                         writer.write(f)
 
-            # ---------- ADD STAMP ----------
-            elif job.job_type == JobType.ADD_STAMP:
-                from reportlab.pdfgen import canvas
-                from reportlab.lib.utils import ImageReader
-                stamp_path = job.input_paths[1]
-                position = params.get("position", "bottom_right")
-                reader = PdfReader(job.input_paths[0])
-                writer = PdfWriter()
-                img = ImageReader(stamp_path)
-                iw, ih = img.getSize()
-                scale = min(100 / iw, 100 / ih)
-                iw, ih = iw * scale, ih * scale
-                for page in reader.pages:
-                    pw = float(page.mediabox.width)
-                    ph = float(page.mediabox.height)
-                    buf = io.BytesIO()
-                    c = canvas.Canvas(buf, pagesize=(pw, ph))
-                    # mask='auto' preserves PNG transparency so the stamp has no opaque background
-                    if position == "bottom_right":
-                        c.drawImage(stamp_path, pw - iw - 20, 20, width=iw, height=ih, mask="auto")
-                    elif position == "bottom_left":
-                        c.drawImage(stamp_path, 20, 20, width=iw, height=ih, mask="auto")
-                    elif position == "top_right":
-                        c.drawImage(stamp_path, pw - iw - 20, ph - ih - 20, width=iw, height=ih, mask="auto")
-                    elif position == "top_left":
-                        c.drawImage(stamp_path, 20, ph - ih - 20, width=iw, height=ih, mask="auto")
-                    else:
-                        c.drawImage(stamp_path, (pw - iw) / 2, (ph - ih) / 2, width=iw, height=ih, mask="auto")
-                    c.save()
-                    buf.seek(0)
-                    overlay = PdfReader(buf).pages[0]
-                    page.merge_page(overlay)
-                    writer.add_page(page)
-                with open(job.output_path, "wb") as f:
+    # ---------- REMOVE BLANKS ----------
+    elif job.job_type == JobType.REMOVE_BLANKS:
+        try:
+            threshold = float(params.get("threshold", 0.01))
+            base_dir = os.path.dirname(job.output_path)
+            from PIL import ImageStat
+            # Only overall brightness matters: a small grayscale render is enough
+            blank = set()
+            for i, img in enumerate(_iter_page_images(job.input_paths[0], 36, base_dir, grayscale=True)):
+                if img.width and img.height and ImageStat.Stat(img).mean[0] >= 255 * (1 - threshold):
+                    blank.add(i)
+        except ImportError:
+            blank = set()
+        if not _pikepdf_delete_pages(job.input_paths[0], job.output_path, blank):
+            with _open_pdf_reader(job.input_paths[0]) as reader:
+                writer = PdfWriter(clone_from=reader)
+                for i in sorted(blank, reverse=True):
+                    del writer.pages[i]
+                with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
                     writer.write(f)
 
-            # ---------- EXTRACT IMAGES ----------
-            elif job.job_type == JobType.EXTRACT_IMAGES:
-                reader = PdfReader(job.input_paths[0])
+    # ---------- ADD STAMP ----------
+    elif job.job_type == JobType.ADD_STAMP:
+        stamp_path = job.input_paths[1]
+        position = params.get("position", "bottom_right")
+        _stamp_overlays(
+            job.input_paths[0], job.output_path, lambda sizes: _image_stamp_overlays(sizes, stamp_path, position),
+        )
+
+    # ---------- EXTRACT IMAGES ----------
+    elif job.job_type == JobType.EXTRACT_IMAGES:
+        base_dir = os.path.dirname(job.output_path)
+        zip_path = os.path.join(base_dir, "images.zip")
+        # Image data is already compressed (JPEG/PNG); deflating it again costs CPU and saves nothing
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as zipf:
+            if not _pikepdf_extract_images(job.input_paths[0], zipf):
+                _pypdf_extract_images(job.input_paths[0], zipf)
+        job.output_path = zip_path
+
+    # ---------- REDACT ----------
+    # Secure redaction: with PyMuPDF, matched words are removed from the page content
+    # itself. Without it, rasterize each page to an image (poppler) so the text layer
+    # is removed and redacted content cannot be copied. If poppler is not installed
+    # either (e.g. on Windows), fall back to overlay-only redaction.
+    elif job.job_type == JobType.REDACT:
+        phrases = params.get("phrases", [])
+        # All phrases in one compiled alternation: a single C-level scan per word instead of a
+        # Python substring test per phrase
+        phrase_re = re.compile("|".join(map(re.escape, phrases))) if phrases else None
+
+        if not _pymupdf_redact(job.input_paths[0], job.output_path, phrase_re):
+            import pdfplumber
+            from reportlab.pdfgen import canvas
+
+            # Page index -> (width, height, matching words); pages without a match are copied as is
+            hits = {}
+            if phrase_re is not None:
+                with pdfplumber.open(job.input_paths[0]) as pdf:
+                    for i, page in enumerate(pdf.pages):
+                        words = [w for w in page.extract_words() if phrase_re.search(w.get("text") or "")]
+                        if words:
+                            hits[i] = (page.width, page.height, words)
+
+            use_secure_redaction = True
+
+            try:
+                from reportlab.lib.utils import ImageReader as ReportLabImageReader
+                from PIL import ImageDraw
+
+                dpi = 150
+                scale = dpi / 72.0
                 base_dir = os.path.dirname(job.output_path)
-                zip_path = os.path.join(base_dir, "images.zip")
-                with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-                    for page_num, page in enumerate(reader.pages):
-                        try:
-                            for img_fo in getattr(page, "images", []):
-                                try:
-                                    buf = io.BytesIO()
-                                    if hasattr(img_fo, "image") and hasattr(img_fo.image, "save"):
-                                        img_fo.image.save(buf, format="PNG")
-                                    else:
-                                        continue
-                                    name = getattr(img_fo, "name", f"img_{page_num}").replace("/", "")
-                                    zipf.writestr(f"page{page_num+1}_{name}.png", buf.getvalue())
-                                except Exception:
-                                    pass
-                        except Exception:
-                            pass
-                job.output_path = zip_path
-
-            # ---------- REDACT ----------
-            # Prefer secure redaction: rasterize each page to an image so the text layer
-            # is removed and redacted content cannot be copied. If poppler is not
-            # installed (e.g. on Windows), fall back to overlay-only redaction.
-            elif job.job_type == JobType.REDACT:
-                import pdfplumber
-                from reportlab.pdfgen import canvas
-
-                phrases = params.get("phrases", [])
-                reader = PdfReader(job.input_paths[0])
-                writer = PdfWriter()
-                use_secure_redaction = True
-
-                try:
-                    from pdf2image import convert_from_path
-                except ImportError:
+                hit_pages = sorted(hits)
+                # All rasterized pages go into one ReportLab document, parsed once below
+                buf = io.BytesIO()
+                c = canvas.Canvas(buf)
+                # Only pages with a match are rasterized (PyMuPDF is absent here: one parallel pdftoppm run)
+                with contextlib.closing(_iter_page_images(job.input_paths[0], dpi, base_dir, pages=hit_pages)) as page_images:
+                    for i, img in zip(hit_pages, page_images):
+                        w_pt, h_pt, words = hits[i]
+                        draw = ImageDraw.Draw(img)
+                        for word in words:
+                            x0 = int(word["x0"] * scale)
+                            top = int(word["top"] * scale)
+                            x1 = int(word["x1"] * scale)
+                            bottom = int(word["bottom"] * scale)
+                            draw.rectangle([x0, top, x1, bottom], fill=(0, 0, 0), outline=(0, 0, 0))
+                        img_buf = io.BytesIO()
+                        img.save(img_buf, format="PNG")
+                        img_buf.seek(0)
+
+                        c.setPageSize((w_pt, h_pt))
+                        c.drawImage(ReportLabImageReader(img_buf), 0, 0, width=w_pt, height=h_pt)
+                        c.showPage()
+            except Exception as e:
+                err_msg = str(e).lower()
+                if isinstance(e, ImportError) or "poppler" in err_msg or "page count" in err_msg or "pdfinfo" in err_msg:
                     use_secure_redaction = False
+                else:
+                    raise
 
-                if use_secure_redaction:
-                    try:
-                        from reportlab.lib.utils import ImageReader as ReportLabImageReader
-                        from PIL import ImageDraw
-
-                        dpi = 150
-                        scale = dpi / 72.0
-                        with pdfplumber.open(job.input_paths[0]) as pdf:
-                            for i, page in enumerate(pdf.pages):
-                                images = convert_from_path(
-                                    job.input_paths[0], dpi=dpi, first_page=i + 1, last_page=i + 1
-                                )
-                                if not images:
-                                    continue
-                                img = images[0]
-                                if img.mode != "RGB":
-                                    img = img.convert("RGB")
-
-                                words = page.extract_words()
-                                if words:
-                                    draw = ImageDraw.Draw(img)
-                                    for word in words:
-                                        if any(phrase in (word.get("text") or "") for phrase in phrases):
-                                            x0 = int(word["x0"] * scale)
-                                            top = int(word["top"] * scale)
-                                            x1 = int(word["x1"] * scale)
-                                            bottom = int(word["bottom"] * scale)
-                                            draw.rectangle([x0, top, x1, bottom], fill=(0, 0, 0), outline=(0, 0, 0))
-                                img_buf = io.BytesIO()
-                                img.save(img_buf, format="PNG")
-                                img_buf.seek(0)
-
-                                w_pt, h_pt = page.width, page.height
-                                buf = io.BytesIO()
-                                c = canvas.Canvas(buf, pagesize=(w_pt, h_pt))
-                                c.drawImage(ReportLabImageReader(img_buf), 0, 0, width=w_pt, height=h_pt)
-                                c.save()
-                                buf.seek(0)
-                                writer.add_page(PdfReader(buf).pages[0])
-
-                        with open(job.output_path, "wb") as f:
-                            writer.write(f)
-                    except Exception as e:
-                        err_msg = str(e).lower()
-                        if "poppler" in err_msg or "page count" in err_msg or "pdfinfo" in err_msg:
-                            use_secure_redaction = False
-                        else:
-                            raise
-
-                if not use_secure_redaction:
-                    # Fallback: overlay black rectangles only (text still in PDF, can be copied)
-                    if job.params is None:
-                        job.params = {}
-                    job.params["redaction_warning"] = (
-                        "Poppler is not installed. Redaction is visual only; text may still be copyable. "
-                        "For secure redaction, install poppler (e.g. in Docker it is pre-installed)."
-                    )
-                    with pdfplumber.open(job.input_paths[0]) as pdf:
-                        for i, page in enumerate(pdf.pages):
-                            p = reader.pages[i]
-                            words = page.extract_words()
-                            if not words:
-                                writer.add_page(p)
-                                continue
-                            buf = io.BytesIO()
-                            w, h = page.width, page.height
-                            c = canvas.Canvas(buf, pagesize=(w, h))
-                            c.setFillColorRGB(0, 0, 0)
-                            for word in words:
-                                if any(phrase in (word.get("text") or "") for phrase in phrases):
-                                    x0, top, x1, bottom = word["x0"], word["top"], word["x1"], word["bottom"]
-                                    c.rect(x0, h - top - (bottom - top), x1 - x0, bottom - top, fill=1, stroke=0)
-                            c.save()
-                            buf.seek(0)
-                            overlay = PdfReader(buf).pages[0]
-                            p.merge_page(overlay)
-                            writer.add_page(p)
-                    with open(job.output_path, "wb") as f:
-                        writer.write(f)
-
-            # ---------- COMPARE PDF (semantic text diff + report + red/green highlights) ----------
-            elif job.job_type == JobType.COMPARE_PDF:
-                import difflib
-
-                base_dir = os.path.dirname(job.output_path)
-                left_pdf_path = os.path.join(base_dir, "left.pdf")
-                right_pdf_path = os.path.join(base_dir, "right.pdf")
-                report_json_path = os.path.join(base_dir, "report.json")
-                report_txt_path = os.path.join(base_dir, "report.txt")
-
-                try:
-                    import pdfplumber
-                    from reportlab.pdfgen import canvas
-                except ImportError:
-                    raise ValueError("Compare PDF requires pdfplumber and reportlab. Install: pip install pdfplumber reportlab")
-
-                def extract_text_per_page(pdf_path):
-                    with pdfplumber.open(pdf_path) as pdf:
-                        return [(page.extract_text() or "").strip() for page in pdf.pages]
-
-                def extract_words_per_page(pdf_path):
-                    with pdfplumber.open(pdf_path) as pdf:
-                        return [page.extract_words() or [] for page in pdf.pages]
-
-                texts1 = extract_text_per_page(job.input_paths[0])
-                texts2 = extract_text_per_page(job.input_paths[1])
-                max_pages = max(len(texts1), len(texts2))
-
-                changes = []
-                for i in range(max_pages):
-                    page_num = i + 1
-                    t1 = texts1[i] if i < len(texts1) else ""
-                    t2 = texts2[i] if i < len(texts2) else ""
-                    lines1 = t1.splitlines() if t1 else []
-                    lines2 = t2.splitlines() if t2 else []
-                    matcher = difflib.SequenceMatcher(None, lines1, lines2)
-                    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-                        if tag == "replace":
-                            old_blob = "\n".join(lines1[i1:i2])
-                            new_blob = "\n".join(lines2[j1:j2])
-                            if old_blob.strip():
-                                changes.append({"page": page_num, "type": "remove", "text": old_blob})
-                            if new_blob.strip():
-                                changes.append({"page": page_num, "type": "add", "text": new_blob})
-                        elif tag == "delete":
-                            blob = "\n".join(lines1[i1:i2])
-                            if blob.strip():
-                                changes.append({"page": page_num, "type": "remove", "text": blob})
-                        elif tag == "insert":
-                            blob = "\n".join(lines2[j1:j2])
-                            if blob.strip():
-                                changes.append({"page": page_num, "type": "add", "text": blob})
-
-                report = {
-                    "changes": changes,
-                    "summary": {"total": len(changes), "by_page": {}},
-                }
-                for c in changes:
-                    p = str(c["page"])
-                    report["summary"]["by_page"][p] = report["summary"]["by_page"].get(p, 0) + 1
-
-                with open(report_json_path, "w", encoding="utf-8") as f:
-                    json.dump(report, f, indent=2, ensure_ascii=False)
-
-                with open(report_txt_path, "w", encoding="utf-8") as f:
-                    f.write("Compare PDF — Change report\n")
-                    f.write(f"Total changes: {len(changes)}\n\n")
-                    for c in changes:
-                        label = "Removed" if c["type"] == "remove" else "Added"
-                        f.write(f"Page {c['page']} — {label}:\n{c['text']}\n\n")
-
-                words1 = extract_words_per_page(job.input_paths[0])
-                words2 = extract_words_per_page(job.input_paths[1])
-
-                def merge_highlight_into_pdf(input_path, output_path, page_highlights):
-                    """page_highlights[i] = list of (x0, top, x1, bottom, fill_rgb) for page i. We use fill_rgb for red or green."""
-                    reader = PdfReader(input_path)
+            if use_secure_redaction:
+                with _open_pdf_reader(job.input_paths[0]) as reader:
+                    redacted = {}
+                    if hit_pages:
+                        c.save()
+                        redacted = dict(zip(hit_pages, PdfReader(buf).pages))
                     writer = PdfWriter()
                     for i, page in enumerate(reader.pages):
-                        if i >= len(page_highlights) or not page_highlights[i]:
-                            writer.add_page(page)
-                            continue
-                        red_rects = page_highlights[i].get("red", [])
-                        green_rects = page_highlights[i].get("green", [])
-                        if not red_rects and not green_rects:
-                            writer.add_page(page)
-                            continue
-                        w = float(page.mediabox.width)
-                        h = float(page.mediabox.height)
-                        buf = io.BytesIO()
-                        c = canvas.Canvas(buf, pagesize=(w, h))
-                        if red_rects:
-                            c.setFillColorRGB(1, 0, 0, alpha=0.35)
-                            for (x0, top, x1, bottom) in red_rects:
-                                y = h - bottom
-                                c.rect(x0, y, max(0.5, x1 - x0), max(0.5, bottom - top), fill=1, stroke=0)
-                        if green_rects:
-                            c.setFillColorRGB(0, 0.7, 0, alpha=0.35)
-                            for (x0, top, x1, bottom) in green_rects:
-                                y = h - bottom
-                                c.rect(x0, y, max(0.5, x1 - x0), max(0.5, bottom - top), fill=1, stroke=0)
-                        c.save()
-                        buf.seek(0)
-                        overlay = PdfReader(buf).pages[0]
-                        page.merge_page(overlay)
-                        writer.add_page(page)
-                    with open(output_path, "wb") as f:
+                        writer.add_page(redacted.get(i, page))
+                    with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
                         writer.write(f)
-
-                left_highlights = [{"red": [], "green": []} for _ in range(max_pages)]
-                right_highlights = [{"red": [], "green": []} for _ in range(max_pages)]
-
-                with pdfplumber.open(job.input_paths[0]) as pdf1, pdfplumber.open(job.input_paths[1]) as pdf2:
-                    for i in range(max_pages):
-                        page1 = pdf1.pages[i] if i < len(pdf1.pages) else None
-                        page2 = pdf2.pages[i] if i < len(pdf2.pages) else None
-                        words_left = (page1.extract_words() or []) if page1 else []
-                        words_right = (page2.extract_words() or []) if page2 else []
-                        texts_left = [w.get("text", "") for w in words_left]
-                        texts_right = [w.get("text", "") for w in words_right]
-                        matcher = difflib.SequenceMatcher(None, texts_left, texts_right)
-                        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-                            if tag in ("delete", "replace") and i1 < i2:
-                                for k in range(i1, i2):
-                                    w = words_left[k]
-                                    r = (float(w["x0"]), float(w["top"]), float(w["x1"]), float(w["bottom"]))
-                                    left_highlights[i]["red"].append(r)
-                            if tag in ("insert", "replace") and j1 < j2:
-                                for k in range(j1, j2):
-                                    w = words_right[k]
-                                    r = (float(w["x0"]), float(w["top"]), float(w["x1"]), float(w["bottom"]))
-                                    right_highlights[i]["green"].append(r)
-
-                merge_highlight_into_pdf(job.input_paths[0], left_pdf_path, left_highlights)
-                merge_highlight_into_pdf(job.input_paths[1], right_pdf_path, right_highlights)
-
-                zip_path = os.path.join(base_dir, "compare_result.zip")
-                with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-                    zipf.write(report_json_path, "report.json")
-                    zipf.write(report_txt_path, "report.txt")
-                    zipf.write(left_pdf_path, "left.pdf")
-                    zipf.write(right_pdf_path, "right.pdf")
-
-                job.output_path = zip_path
+            else:
+                # Fallback: overlay black rectangles only (text still in PDF, can be copied)
                 if job.params is None:
                     job.params = {}
-                job.params["left_pdf"] = left_pdf_path
-                job.params["right_pdf"] = right_pdf_path
-                job.params["report_path"] = report_json_path
+                job.params["redaction_warning"] = (
+                    "Poppler is not installed. Redaction is visual only; text may still be copyable. "
+                    "For secure redaction, install poppler (e.g. in Docker it is pre-installed)."
+                )
 
-            # ---------- SIGN PDF ----------
-            elif job.job_type == JobType.SIGN_PDF:
-                try:
-                    from endesive.pdf import cms
-                    from cryptography.hazmat.primitives.serialization import load_pem_private_key
-                    from cryptography.hazmat.backends import default_backend
-                    from cryptography.x509 import load_pem_x509_certificate
-                except ImportError:
-                    raise ValueError(
-                        "Sign PDF requires endesive and cryptography. Install: pip install endesive cryptography. "
-                        "You need a PEM certificate and private key (or a PFX with key inside)."
-                    )
-                cert_path = job.input_paths[1]
-                key_path = job.input_paths[2] if len(job.input_paths) > 2 else None
-                with open(job.input_paths[0], "rb") as f:
-                    data = f.read()
-
-                key = None
-                cert = None
-                othercerts = []
-
-                if key_path:
-                    with open(cert_path, "rb") as fc:
-                        cert = load_pem_x509_certificate(fc.read(), default_backend())
-                    with open(key_path, "rb") as fk:
-                        key = load_pem_private_key(fk.read(), password=None, backend=default_backend())
-                else:
-                    cert_data = open(cert_path, "rb").read()
-                    try:
-                        from cryptography.hazmat.primitives.serialization import pkcs12
-                        p12 = pkcs12.load_key_and_certificates(
-                            cert_data, None, default_backend()
-                        )
-                        key, cert, othercerts = p12[0], p12[1], (p12[2] or [])
-                    except Exception:
-                        cert = load_pem_x509_certificate(cert_data, default_backend())
-                        raise ValueError(
-                            "Private key is required. Provide a separate .pem key file, or use a PFX (.pfx) certificate that contains the key."
-                        )
+                def build_overlays(sizes):
+                    buf = io.BytesIO()
+                    c = canvas.Canvas(buf)
+                    overlay_for_page = []
+                    for i in range(len(sizes)):
+                        if i not in hits:
+                            overlay_for_page.append(None)
+                            continue
+                        overlay_for_page.append(c.getPageNumber() - 1)
+                        w, h, words = hits[i]
+                        c.setPageSize((w, h))
+                        c.setFillColorRGB(0, 0, 0)
+                        for word in words:
+                            x0, top, x1, bottom = word["x0"], word["top"], word["x1"], word["bottom"]
+                            c.rect(x0, h - top - (bottom - top), x1 - x0, bottom - top, fill=1, stroke=0)
+                        c.showPage()
+                    c.save()
+                    return buf.getvalue(), overlay_for_page
 
-                import datetime
-                date_str = datetime.datetime.utcnow().strftime("D:%Y%m%d%H%M%S+00'00'")
-                udct = {
-                    "sigflags": 3,
-                    "sigflagsft": 132,
-                    "sigpage": 0,
-                    "signature": "Digitally signed",
-                    "contact": "",
-                    "location": "",
-                    "signingdate": date_str,
-                    "reason": "Signed with PDF Editor",
-                }
-                # endesive returns the incremental signature block; it must be appended to the original PDF
-                signature_block = cms.sign(data, udct, key, cert, othercerts, "sha256")
-                with open(job.output_path, "wb") as f:
-                    f.write(data)
-                    f.write(signature_block)
-
-            # ---------- SANITIZE ----------
-            elif job.job_type == JobType.SANITIZE:
-                try:
-                    import pikepdf
-                    from pikepdf import Name
+                _stamp_overlays(job.input_paths[0], job.output_path, build_overlays)
 
-                    pdf = pikepdf.open(job.input_paths[0])
+    # ---------- COMPARE PDF (semantic text diff + report + red/green highlights) ----------
+    elif job.job_type == JobType.COMPARE_PDF:
+        import difflib
+
+        base_dir = os.path.dirname(job.output_path)
+        left_pdf_path = os.path.join(base_dir, "left.pdf")
+        right_pdf_path = os.path.join(base_dir, "right.pdf")
+        report_json_path = os.path.join(base_dir, "report.json")
+        report_txt_path = os.path.join(base_dir, "report.txt")
+
+        try:
+            import orjson
+            import pdfplumber
+            from reportlab.pdfgen import canvas
+        except ImportError:
+            raise ValueError("Compare PDF requires orjson, pdfplumber and reportlab. Install: pip install orjson pdfplumber reportlab")
+
+        def extract_text_and_words_per_page(pdf_path):
+            """One pdfplumber pass per document: (page texts, page word lists)."""
+            with pdfplumber.open(pdf_path) as pdf:
+                texts, words = [], []
+                for page in pdf.pages:
+                    texts.append((page.extract_text() or "").strip())
+                    words.append(page.extract_words() or [])
+                    # Each page caches its parsed layout; drop it once both are extracted
+                    page.close()
+                return texts, words
+
+        texts1, words1 = extract_text_and_words_per_page(job.input_paths[0])
+        texts2, words2 = extract_text_and_words_per_page(job.input_paths[1])
+        max_pages = max(len(texts1), len(texts2))
+
+        changes = []
+        for i in range(max_pages):
+            page_num = i + 1
+            t1 = texts1[i] if i < len(texts1) else ""
+            t2 = texts2[i] if i < len(texts2) else ""
+            if t1 == t2:
+                # Unchanged page (the usual case): nothing to diff
+                continue
+            lines1 = t1.splitlines() if t1 else []
+            lines2 = t2.splitlines() if t2 else []
+            matcher = difflib.SequenceMatcher(None, lines1, lines2)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag == "replace":
+                    old_blob = "\n".join(lines1[i1:i2])
+                    new_blob = "\n".join(lines2[j1:j2])
+                    if old_blob.strip():
+                        changes.append({"page": page_num, "type": "remove", "text": old_blob})
+                    if new_blob.strip():
+                        changes.append({"page": page_num, "type": "add", "text": new_blob})
+                elif tag == "delete":
+                    blob = "\n".join(lines1[i1:i2])
+                    if blob.strip():
+                        changes.append({"page": page_num, "type": "remove", "text": blob})
+                elif tag == "insert":
+                    blob = "\n".join(lines2[j1:j2])
+                    if blob.strip():
+                        changes.append({"page": page_num, "type": "add", "text": blob})
+
+        report = {
+            "changes": changes,
+            "summary": {"total": len(changes), "by_page": {}},
+        }
+        for c in changes:
+            p = str(c["page"])
+            report["summary"]["by_page"][p] = report["summary"]["by_page"].get(p, 0) + 1
+
+        # Served byte-for-byte by /compare/{job_id}/report; orjson emits UTF-8 bytes directly
+        with open(report_json_path, "wb") as f:
+            f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+
+        with open(report_txt_path, "w", encoding="utf-8") as f:
+            f.write("Compare PDF — Change report\n")
+            f.write(f"Total changes: {len(changes)}\n\n")
+            for c in changes:
+                label = "Removed" if c["type"] == "remove" else "Added"
+                f.write(f"Page {c['page']} — {label}:\n{c['text']}\n\n")
+
+        def merge_highlight_into_pdf(input_path, output_path, page_highlights):
+            """page_highlights[i] = {"red": [...], "green": [...]} of (x0, top, x1, bottom) rects for page i."""
+
+            def build_overlays(sizes):
+                # One overlay page per page that has highlights; the others are left untouched
+                buf = io.BytesIO()
+                c = canvas.Canvas(buf)
+                overlay_for_page = []
+                for i, (w, h) in enumerate(sizes):
+                    highlights = page_highlights[i] if i < len(page_highlights) else None
+                    red_rects = (highlights or {}).get("red", [])
+                    green_rects = (highlights or {}).get("green", [])
+                    if not red_rects and not green_rects:
+                        overlay_for_page.append(None)
+                        continue
+                    overlay_for_page.append(c.getPageNumber() - 1)
+                    c.setPageSize((w, h))
+                    if red_rects:
+                        c.setFillColorRGB(1, 0, 0, alpha=0.35)
+                        for (x0, top, x1, bottom) in red_rects:
+                            y = h - bottom
+                            c.rect(x0, y, max(0.5, x1 - x0), max(0.5, bottom - top), fill=1, stroke=0)
+                    if green_rects:
+                        c.setFillColorRGB(0, 0.7, 0, alpha=0.35)
+                        for (x0, top, x1, bottom) in green_rects:
+                            y = h - bottom
+                            c.rect(x0, y, max(0.5, x1 - x0), max(0.5, bottom - top), fill=1, stroke=0)
+                    c.showPage()
+                c.save()
+                return buf.getvalue(), overlay_for_page
+
+            _stamp_overlays(input_path, output_path, build_overlays)
+
+        left_highlights = [{"red": [], "green": []} for _ in range(max_pages)]
+        right_highlights = [{"red": [], "green": []} for _ in range(max_pages)]
+
+        for i in range(max_pages):
+            words_left = words1[i] if i < len(words1) else []
+            words_right = words2[i] if i < len(words2) else []
+            texts_left = [w.get("text", "") for w in words_left]
+            texts_right = [w.get("text", "") for w in words_right]
+            if texts_left == texts_right:
+                continue
+            matcher = difflib.SequenceMatcher(None, texts_left, texts_right)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag in ("delete", "replace") and i1 < i2:
+                    for k in range(i1, i2):
+                        w = words_left[k]
+                        r = (float(w["x0"]), float(w["top"]), float(w["x1"]), float(w["bottom"]))
+                        left_highlights[i]["red"].append(r)
+                if tag in ("insert", "replace") and j1 < j2:
+                    for k in range(j1, j2):
+                        w = words_right[k]
+                        r = (float(w["x0"]), float(w["top"]), float(w["x1"]), float(w["bottom"]))
+                        right_highlights[i]["green"].append(r)
+
+        merge_highlight_into_pdf(job.input_paths[0], left_pdf_path, left_highlights)
+        merge_highlight_into_pdf(job.input_paths[1], right_pdf_path, right_highlights)
+
+        zip_path = os.path.join(base_dir, "compare_result.zip")
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=_ZIP_COMPRESSLEVEL) as zipf:
+            zipf.write(report_json_path, "report.json")
+            zipf.write(report_txt_path, "report.txt")
+            # The PDFs' streams are already compressed: store them as-is
+            zipf.write(left_pdf_path, "left.pdf", compress_type=zipfile.ZIP_STORED)
+            zipf.write(right_pdf_path, "right.pdf", compress_type=zipfile.ZIP_STORED)
+
+        job.output_path = zip_path
+        if job.params is None:
+            job.params = {}
+        job.params["left_pdf"] = left_pdf_path
+        job.params["right_pdf"] = right_pdf_path
+        job.params["report_path"] = report_json_path
+
+    # ---------- SIGN PDF ----------
+    elif job.job_type == JobType.SIGN_PDF:
+        try:
+            from endesive.pdf import cms
+            from cryptography.hazmat.primitives.serialization import load_pem_private_key
+            from cryptography.hazmat.backends import default_backend
+            from cryptography.x509 import load_pem_x509_certificate
+        except ImportError:
+            raise ValueError(
+                "Sign PDF requires endesive and cryptography. Install: pip install endesive cryptography. "
+                "You need a PEM certificate and private key (or a PFX with key inside)."
+            )
+        cert_path = job.input_paths[1]
+        key_path = job.input_paths[2] if len(job.input_paths) > 2 else None
+        with open(job.input_paths[0], "rb") as f:
+            data = f.read()
+
+        key = None
+        cert = None
+        othercerts = []
+
+        if key_path:
+            with open(cert_path, "rb") as fc:
+                cert = load_pem_x509_certificate(fc.read(), default_backend())
+            with open(key_path, "rb") as fk:
+                key = load_pem_private_key(fk.read(), password=None, backend=default_backend())
+        else:
+            cert_data = open(cert_path, "rb").read()
+            try:
+                from cryptography.hazmat.primitives.serialization import pkcs12
+                p12 = pkcs12.load_key_and_certificates(
+                    cert_data, None, default_backend()
+                )
+                key, cert, othercerts = p12[0], p12[1], (p12[2] or [])
+            except Exception:
+                cert = load_pem_x509_certificate(cert_data, default_backend())
+                raise ValueError(
+                    "Private key is required. Provide a separate .pem key file, or use a PFX (.pfx) certificate that contains the key."
+                )
+
+        import datetime
+        date_str = datetime.datetime.utcnow().strftime("D:%Y%m%d%H%M%S+00'00'")
+        udct = {
+            "sigflags": 3,
+            "sigflagsft": 132,
+            "sigpage": 0,
+            "signature": "Digitally signed",
+            "contact": "",
+            "location": "",
+            "signingdate": date_str,
+            "reason": "Signed with PDF Editor",
+        }
+        # endesive returns the incremental signature block; it must be appended to the original PDF
+        signature_block = cms.sign(data, udct, key, cert, othercerts, "sha256")
+        with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
+            f.write(data)
+            f.write(signature_block)
+
+    # ---------- SANITIZE ----------
+    elif job.job_type == JobType.SANITIZE:
+        try:
+            import pikepdf
+            from pikepdf import Name
+        except ImportError:
+            pikepdf = None
+        sanitized = False
+        if pikepdf is not None:
+            try:
+                # Closed on the way out, so a failure doesn't keep QPDF's copy alive through the fallback
+                with pikepdf.open(job.input_paths[0]) as pdf:
                     params = job.params or {}
                     remove_js = params.get("remove_javascript", True)
                     remove_embedded = params.get("remove_embedded_files", True)
@@ -1164,425 +1590,598 @@ async def worker_loop():
 
                     # --- Embedded fonts (remove font file streams from descriptors) ---
                     if remove_fonts:
-                        fontfile_keys = (Name.FontFile, Name.FontFile2, Name.FontFile3)
+                        resources_key, font_key, descriptor_key = Name.Resources, Name.Font, Name.FontDescriptor
+                        # Pages often share one Resources or Font dictionary: strip each (by objgen) only once
+                        seen = set()
                         for page in pdf.pages:
-                            resources = page.get(Name.Resources)
+                            resources = page.get(resources_key)
                             if resources is None:
                                 continue
-                            fonts = resources.get(Name.Font)
+                            fonts = resources.get(font_key)
                             if fonts is None:
                                 continue
-                            for fname in list(fonts.keys()):
-                                font = fonts[fname]
-                                if Name.FontDescriptor not in font:
+                            shared = [obj.objgen for obj in (resources, fonts) if obj.is_indirect]
+                            if not seen.isdisjoint(shared):
+                                continue
+                            seen.update(shared)
+                            # Only the descriptors are modified, so the fonts dictionary can be iterated directly
+                            for font in fonts.values():
+                                if descriptor_key not in font:
                                     continue
                                 fd = font.FontDescriptor
-                                for k in fontfile_keys:
-                                    if k in fd:
-                                        del fd[k]
+                                # keys() is a set of names: one intersection instead of a test per key
+                                for k in _FONTFILE_KEYS.intersection(fd.keys()):
+                                    del fd[k]
 
                     pdf.remove_unreferenced_resources()
-                    pdf.save(job.output_path, compress_streams=True)
-                    pdf.close()
-                except Exception:
-                    reader = PdfReader(job.input_paths[0])
-                    writer = PdfWriter()
-                    for page in reader.pages:
-                        writer.add_page(page)
-                    with open(job.output_path, "wb") as f:
-                        writer.write(f)
-
-            # ---------- EDIT PDF: PREPARE (extract spans; if none, run OCR then extract) ----------
-            elif job.job_type == JobType.EDIT_PDF_PREPARE:
-                import pymupdf
-                base_dir = os.path.dirname(job.output_path)
-                extract_json_path = os.path.join(base_dir, "extract.json")
-                pdf_to_use = job.input_paths[0]
-
-                def _extract_spans_from_pdf(pdf_path: str) -> tuple[list, int]:
-                    doc = pymupdf.open(pdf_path)
-                    spans_out = []
-                    span_id = 0
-                    for page_index, page in enumerate(doc):
-                        try:
-                            blocks = page.get_text("dict", flags=pymupdf.TEXT_PRESERVE_WHITESPACE).get("blocks") or []
-                        except Exception:
-                            blocks = page.get_text("dict").get("blocks") or []
-                        for block in blocks:
-                            for line in block.get("lines") or []:
-                                for span in line.get("spans") or []:
-                                    text = span.get("text", "")
-                                    if not text.strip():
-                                        continue
-                                    bbox = list(span.get("bbox", (0, 0, 0, 0)))
-                                    font_name = span.get("font", "")
-                                    font_size = float(span.get("size", 12))
-                                    color = int(span.get("color", 0))
-                                    spans_out.append({
-                                        "id": f"p{page_index}_s{span_id}",
-                                        "page_index": page_index,
-                                        "text": text,
-                                        "bbox": bbox,
-                                        "font_name": font_name,
-                                        "font_size": round(font_size, 2),
-                                        "color": color,
-                                    })
-                                    span_id += 1
-                    page_count = len(doc)
-                    doc.close()
-                    return spans_out, page_count
+                    # Object streams pack the small dictionaries (and the xref) into Flate streams, as compress
+                    # does; recompressing existing streams at a higher level is left to the compress job
+                    pdf.save(job.output_path, compress_streams=True, object_stream_mode=pikepdf.ObjectStreamMode.generate)
+                sanitized = True
+            except (pikepdf.PasswordError, pikepdf.PdfError):
+                # Only QPDF failing to read or write the file falls back; any other error fails the job
+                pass
+        if not sanitized:
+            with _open_pdf_reader(job.input_paths[0]) as reader:
+                writer = PdfWriter()
+                for page in reader.pages:
+                    writer.add_page(page)
+                with open(job.output_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
+                    writer.write(f)
 
+    # ---------- EDIT PDF: PREPARE (extract spans; if none, run OCR then extract) ----------
+    elif job.job_type == JobType.EDIT_PDF_PREPARE:
+        import pymupdf
+        base_dir = os.path.dirname(job.output_path)
+        extract_json_path = os.path.join(base_dir, "extract.json")
+        pdf_to_use = job.input_paths[0]
+
+        def _extract_spans_from_pdf(pdf_path: str) -> tuple[list, int]:
+            doc = pymupdf.open(pdf_path)
+            spans_out = []
+            span_id = 0
+            for page_index, page in enumerate(doc):
+                try:
+                    blocks = page.get_text("dict", flags=pymupdf.TEXT_PRESERVE_WHITESPACE).get("blocks") or []
+                except Exception:
+                    blocks = page.get_text("dict").get("blocks") or []
+                for block in blocks:
+                    for line in block.get("lines") or []:
+                        for span in line.get("spans") or []:
+                            text = span.get("text", "")
+                            if not text.strip():
+                                continue
+                            bbox = list(span.get("bbox", (0, 0, 0, 0)))
+                            font_name = span.get("font", "")
+                            font_size = float(span.get("size", 12))
+                            color = int(span.get("color", 0))
+                            spans_out.append({
+                                "id": f"p{page_index}_s{span_id}",
+                                "page_index": page_index,
+                                "text": text,
+                                "bbox": bbox,
+                                "font_name": font_name,
+                                "font_size": round(font_size, 2),
+                                "color": color,
+                            })
+                            span_id += 1
+            page_count = len(doc)
+            doc.close()
+            return spans_out, page_count
+
+        spans_out, page_count = _extract_spans_from_pdf(pdf_to_use)
+        if not spans_out:
+            try:
+                from pdf2image import convert_from_path
+                import pytesseract
+                if os.name == "nt":
+                    _tesseract_cmd = (
+                        _which("tesseract")
+                        or os.environ.get("TESSERACT_CMD")
+                        or _find_tesseract_windows()
+                    )
+                    if _tesseract_cmd:
+                        pytesseract.pytesseract.tesseract_cmd = _tesseract_cmd
+                images = convert_from_path(pdf_to_use, dpi=300)
+                writer = PdfWriter()
+                for img in images:
+                    pdf_bytes = pytesseract.image_to_pdf_or_hocr(img, extension="pdf")
+                    buf = io.BytesIO(pdf_bytes)
+                    r = PdfReader(buf)
+                    for p in r.pages:
+                        writer.add_page(p)
+                ocr_pdf_path = os.path.join(base_dir, "ocr_output.pdf")
+                _ensure_dir(ocr_pdf_path)
+                with open(ocr_pdf_path, "wb", buffering=_OUTPUT_BUFFERING) as f:
+                    writer.write(f)
+                pdf_to_use = ocr_pdf_path
                 spans_out, page_count = _extract_spans_from_pdf(pdf_to_use)
-                if not spans_out:
-                    try:
-                        from pdf2image import convert_from_path
-                        import pytesseract
-                        if os.name == "nt":
-                            _tesseract_cmd = (
-                                shutil.which("tesseract")
-                                or os.environ.get("TESSERACT_CMD")
-                                or _find_tesseract_windows()
-                            )
-                            if _tesseract_cmd:
-                                pytesseract.pytesseract.tesseract_cmd = _tesseract_cmd
-                        images = convert_from_path(pdf_to_use, dpi=300)
-                        writer = PdfWriter()
-                        for img in images:
-                            pdf_bytes = pytesseract.image_to_pdf_or_hocr(img, extension="pdf")
-                            buf = io.BytesIO(pdf_bytes)
-                            r = PdfReader(buf)
-                            for p in r.pages:
-                                writer.add_page(p)
-                        ocr_pdf_path = os.path.join(base_dir, "ocr_output.pdf")
-                        _ensure_dir(ocr_pdf_path)
-                        with open(ocr_pdf_path, "wb") as f:
-                            writer.write(f)
-                        pdf_to_use = ocr_pdf_path
-                        spans_out, page_count = _extract_spans_from_pdf(pdf_to_use)
-                    except ImportError as e:
-                        raise ValueError(
-                            "PDF has no text and OCR is not available. "
-                            f"Install: pip install pdf2image pytesseract, and install Tesseract. {e}"
-                        )
-                if pdf_to_use != job.input_paths[0]:
-                    shutil.copy(pdf_to_use, job.output_path)
-                else:
-                    shutil.copy(job.input_paths[0], job.output_path)
-                _ensure_dir(extract_json_path)
-                with open(extract_json_path, "w", encoding="utf-8") as f:
-                    json.dump({"spans": spans_out, "page_count": page_count}, f, indent=2)
-
-            # ---------- EDIT PDF: EXTRACT (text spans with font/size/position) ----------
-            elif job.job_type == JobType.EDIT_PDF_EXTRACT:
-                import pymupdf
-                doc = pymupdf.open(job.input_paths[0])
-                spans_out = []
-                span_id = 0
-                for page_index, page in enumerate(doc):
-                    try:
-                        blocks = page.get_text("dict", flags=pymupdf.TEXT_PRESERVE_WHITESPACE).get("blocks") or []
-                    except Exception:
-                        blocks = page.get_text("dict").get("blocks") or []
-                    for block in blocks:
-                        for line in block.get("lines") or []:
-                            for span in line.get("spans") or []:
-                                text = span.get("text", "")
-                                if not text.strip():
-                                    continue
-                                bbox = list(span.get("bbox", (0, 0, 0, 0)))
-                                font_name = span.get("font", "")
-                                font_size = float(span.get("size", 12))
-                                color = int(span.get("color", 0))
-                                spans_out.append({
-                                    "id": f"p{page_index}_s{span_id}",
-                                    "page_index": page_index,
-                                    "text": text,
-                                    "bbox": bbox,
-                                    "font_name": font_name,
-                                    "font_size": round(font_size, 2),
-                                    "color": color,
-                                })
-                                span_id += 1
-                page_count = len(doc)
-                doc.close()
-                _ensure_dir(job.output_path)
-                with open(job.output_path, "w", encoding="utf-8") as f:
-                    json.dump({"spans": spans_out, "page_count": page_count}, f, indent=2)
-
-            # ---------- EDIT PDF: REPLACE (in-place text with same font/size) ----------
-            elif job.job_type == JobType.EDIT_PDF_REPLACE:
-                import pymupdf
-                replacements = params.get("replacements") or []
-                if not replacements:
-                    raise ValueError("replacements list is required for edit_pdf_replace")
-                doc = pymupdf.open(job.input_paths[0])
-
-                def _span_color_to_rgb(color_val) -> tuple:
-                    """Convert span 'color' to (r,g,b) 0-1. Accepts int (0xRRGGBB) or list/tuple of 3 floats."""
-                    if isinstance(color_val, (list, tuple)) and len(color_val) >= 3:
-                        r, g, b = float(color_val[0]), float(color_val[1]), float(color_val[2])
-                        if r > 1 or g > 1 or b > 1:
-                            r, g, b = r / 255.0, g / 255.0, b / 255.0
-                        return (max(0, min(1, r)), max(0, min(1, g)), max(0, min(1, b)))
-                    color_int = int(color_val) if color_val is not None else 0
-                    r = ((color_int >> 16) & 0xFF) / 255.0
-                    g = ((color_int >> 8) & 0xFF) / 255.0
-                    b = (color_int & 0xFF) / 255.0
-                    return (r, g, b)
-
-                def _map_font_name(pdf_font_name: str) -> str:
-                    # Return PyMuPDF Base 14 font names so replacement text matches original font family.
-                    name = (pdf_font_name or "").lower()
-                    if "times" in name or "cambria" in name or "georgia" in name or "palatino" in name or "serif" in name:
-                        if "bold" in name and "italic" in name:
-                            return "Times-BoldItalic"
-                        if "bold" in name:
-                            return "Times-Bold"
-                        if "italic" in name or "oblique" in name:
-                            return "Times-Italic"
-                        return "Times-Roman"
-                    if "courier" in name or any(x in name for x in (
-                        "mono", "consolas", "jetbrains", "menlo", "source code", "liberation mono",
-                        "dejavu sans mono", "droid sans mono", "fira code", "cascadia", "ubuntu mono", "inconsolata",
-                    )):
-                        if "bold" in name and "italic" in name:
-                            return "Courier-BoldOblique"
-                        if "bold" in name:
-                            return "Courier-Bold"
-                        if "italic" in name or "oblique" in name:
-                            return "Courier-Oblique"
-                        return "Courier"
-                    if "arial" in name or "helvetica" in name or "calibri" in name or "verdana" in name or "sans" in name:
-                        if "bold" in name and ("italic" in name or "oblique" in name):
-                            return "Helvetica-BoldOblique"
-                        if "bold" in name:
-                            return "Helvetica-Bold"
-                        if "italic" in name or "oblique" in name:
-                            return "Helvetica-Oblique"
-                        return "Helvetica"
-                    return "Helvetica"
-
-                def _find_span_at_rect(page, rect):
-                    try:
-                        blocks = page.get_text("dict").get("blocks") or []
-                    except Exception:
-                        return None
-                    best_span = None
-                    best_area = 0
-                    r = pymupdf.Rect(rect)
-                    for block in blocks:
-                        for line in block.get("lines") or []:
-                            for span in line.get("spans") or []:
-                                sb = span.get("bbox")
-                                if not sb:
-                                    continue
-                                sr = pymupdf.Rect(sb)
-                                inter = r & sr
-                                if inter.is_empty:
-                                    continue
-                                area = inter.get_area()
-                                if area > best_area:
-                                    best_area = area
-                                    best_span = span
-                    return best_span
-
-                def _pixel_to_rgb(p):
-                    if isinstance(p, (tuple, list)) and len(p) >= 3:
-                        return (p[0] / 255.0, p[1] / 255.0, p[2] / 255.0)
-                    if isinstance(p, int):
-                        return ((p >> 16) & 0xFF) / 255.0, ((p >> 8) & 0xFF) / 255.0, (p & 0xFF) / 255.0
+            except ImportError as e:
+                raise ValueError(
+                    "PDF has no text and OCR is not available. "
+                    f"Install: pip install pdf2image pytesseract, and install Tesseract. {e}"
+                )
+        if pdf_to_use != job.input_paths[0]:
+            shutil.copy(pdf_to_use, job.output_path)
+        else:
+            shutil.copy(job.input_paths[0], job.output_path)
+        _ensure_dir(extract_json_path)
+        with open(extract_json_path, "w", encoding="utf-8") as f:
+            json.dump({"spans": spans_out, "page_count": page_count}, f, indent=2)
+
+    # ---------- EDIT PDF: EXTRACT (text spans with font/size/position) ----------
+    elif job.job_type == JobType.EDIT_PDF_EXTRACT:
+        import pymupdf
+        doc = pymupdf.open(job.input_paths[0])
+        spans_out = []
+        span_id = 0
+        for page_index, page in enumerate(doc):
+            try:
+                blocks = page.get_text("dict", flags=pymupdf.TEXT_PRESERVE_WHITESPACE).get("blocks") or []
+            except Exception:
+                blocks = page.get_text("dict").get("blocks") or []
+            for block in blocks:
+                for line in block.get("lines") or []:
+                    for span in line.get("spans") or []:
+                        text = span.get("text", "")
+                        if not text.strip():
+                            continue
+                        bbox = list(span.get("bbox", (0, 0, 0, 0)))
+                        font_name = span.get("font", "")
+                        font_size = float(span.get("size", 12))
+                        color = int(span.get("color", 0))
+                        spans_out.append({
+                            "id": f"p{page_index}_s{span_id}",
+                            "page_index": page_index,
+                            "text": text,
+                            "bbox": bbox,
+                            "font_name": font_name,
+                            "font_size": round(font_size, 2),
+                            "color": color,
+                        })
+                        span_id += 1
+        page_count = len(doc)
+        doc.close()
+        _ensure_dir(job.output_path)
+        with open(job.output_path, "w", encoding="utf-8") as f:
+            json.dump({"spans": spans_out, "page_count": page_count}, f, indent=2)
+
+    # ---------- EDIT PDF: REPLACE (in-place text with same font/size) ----------
+    elif job.job_type == JobType.EDIT_PDF_REPLACE:
+        import pymupdf
+        replacements = params.get("replacements") or []
+        if not replacements:
+            raise ValueError("replacements list is required for edit_pdf_replace")
+        doc = pymupdf.open(job.input_paths[0])
+
+        def _span_color_to_rgb(color_val) -> tuple:
+            """Convert span 'color' to (r,g,b) 0-1. Accepts int (0xRRGGBB) or list/tuple of 3 floats."""
+            if isinstance(color_val, (list, tuple)) and len(color_val) >= 3:
+                r, g, b = float(color_val[0]), float(color_val[1]), float(color_val[2])
+                if r > 1 or g > 1 or b > 1:
+                    r, g, b = r / 255.0, g / 255.0, b / 255.0
+                return (max(0, min(1, r)), max(0, min(1, g)), max(0, min(1, b)))
+            color_int = int(color_val) if color_val is not None else 0
+            r = ((color_int >> 16) & 0xFF) / 255.0
+            g = ((color_int >> 8) & 0xFF) / 255.0
+            b = (color_int & 0xFF) / 255.0
+            return (r, g, b)
+
+        def _map_font_name(pdf_font_name: str) -> str:
+            # Return PyMuPDF Base 14 font names so replacement text matches original font family.
+            name = (pdf_font_name or "").lower()
+            if "times" in name or "cambria" in name or "georgia" in name or "palatino" in name or "serif" in name:
+                if "bold" in name and "italic" in name:
+                    return "Times-BoldItalic"
+                if "bold" in name:
+                    return "Times-Bold"
+                if "italic" in name or "oblique" in name:
+                    return "Times-Italic"
+                return "Times-Roman"
+            if "courier" in name or any(x in name for x in (
+                "mono", "consolas", "jetbrains", "menlo", "source code", "liberation mono",
+                "dejavu sans mono", "droid sans mono", "fira code", "cascadia", "ubuntu mono", "inconsolata",
+            )):
+                if "bold" in name and "italic" in name:
+                    return "Courier-BoldOblique"
+                if "bold" in name:
+                    return "Courier-Bold"
+                if "italic" in name or "oblique" in name:
+                    return "Courier-Oblique"
+                return "Courier"
+            if "arial" in name or "helvetica" in name or "calibri" in name or "verdana" in name or "sans" in name:
+                if "bold" in name and ("italic" in name or "oblique" in name):
+                    return "Helvetica-BoldOblique"
+                if "bold" in name:
+                    return "Helvetica-Bold"
+                if "italic" in name or "oblique" in name:
+                    return "Helvetica-Oblique"
+                return "Helvetica"
+            return "Helvetica"
+
+        def _find_span_at_rect(page, rect):
+            try:
+                blocks = page.get_text("dict").get("blocks") or []
+            except Exception:
+                return None
+            best_span = None
+            best_area = 0
+            r = pymupdf.Rect(rect)
+            for block in blocks:
+                for line in block.get("lines") or []:
+                    for span in line.get("spans") or []:
+                        sb = span.get("bbox")
+                        if not sb:
+                            continue
+                        sr = pymupdf.Rect(sb)
+                        inter = r & sr
+                        if inter.is_empty:
+                            continue
+                        area = inter.get_area()
+                        if area > best_area:
+                            best_area = area
+                            best_span = span
+            return best_span
+
+        def _pixel_to_rgb(p):
+            if isinstance(p, (tuple, list)) and len(p) >= 3:
+                return (p[0] / 255.0, p[1] / 255.0, p[2] / 255.0)
+            if isinstance(p, int):
+                return ((p >> 16) & 0xFF) / 255.0, ((p >> 8) & 0xFF) / 255.0, (p & 0xFF) / 255.0
+            return None
+
+        def _luminance(rgb):
+            r, g, b = rgb
+            return 0.299 * r + 0.587 * g + 0.114 * b
+
+        def _sample_page_background(page):
+            try:
+                page_rect = page.rect
+                clip = pymupdf.Rect(0, 0, min(50, page_rect.width * 0.1), min(50, page_rect.height * 0.1)) & page_rect
+                if clip.is_empty or clip.get_area() < 1:
+                    return (0.1, 0.1, 0.1)
+                pix = page.get_pixmap(clip=clip, matrix=pymupdf.Matrix(1, 1), alpha=False)
+                w, h = pix.width, pix.height
+                if w < 1 or h < 1:
+                    return (0.1, 0.1, 0.1)
+                rgb_list = []
+                for py in range(h):
+                    for px in range(w):
+                        t = _pixel_to_rgb(pix.pixel(px, py))
+                        if t:
+                            rgb_list.append(t)
+                if not rgb_list:
+                    return (0.1, 0.1, 0.1)
+                return (
+                    sum(x[0] for x in rgb_list) / len(rgb_list),
+                    sum(x[1] for x in rgb_list) / len(rgb_list),
+                    sum(x[2] for x in rgb_list) / len(rgb_list),
+                )
+            except Exception:
+                return (0.1, 0.1, 0.1)
+
+        def _sample_background_color(page, rect):
+            try:
+                r = pymupdf.Rect(rect)
+                if r.is_empty or r.get_area() < 1:
+                    return (1, 1, 1)
+                page_rect = page.rect
+                expand = 8.0
+                clip = pymupdf.Rect(
+                    max(0, r.x0 - expand), max(0, r.y0 - expand),
+                    min(page_rect.x1, r.x1 + expand), min(page_rect.y1, r.y1 + expand),
+                ) & page_rect
+                if clip.is_empty or clip.get_area() < 4:
+                    return (1, 1, 1)
+                pix = page.get_pixmap(clip=clip, matrix=pymupdf.Matrix(1, 1), alpha=False)
+                w, h = pix.width, pix.height
+                if w < 3 or h < 3:
+                    return (1, 1, 1)
+                rgb_list = []
+                for (px, py) in [
+                    (0, 0), (w - 1, 0), (0, h - 1), (w - 1, h - 1),
+                    (w // 2, 0), (w // 2, h - 1), (0, h // 2), (w - 1, h // 2),
+                ]:
+                    t = _pixel_to_rgb(pix.pixel(px, py))
+                    if t:
+                        rgb_list.append(t)
+                if not rgb_list:
+                    return (1, 1, 1)
+                fill = (
+                    sum(x[0] for x in rgb_list) / len(rgb_list),
+                    sum(x[1] for x in rgb_list) / len(rgb_list),
+                    sum(x[2] for x in rgb_list) / len(rgb_list),
+                )
+                page_bg = _sample_page_background(page)
+                page_lum = _luminance(page_bg)
+                fill_lum = _luminance(fill)
+                if page_lum < 0.4 and fill_lum > 0.6:
+                    return page_bg
+                if page_lum > 0.6 and fill_lum < 0.15:
+                    return page_bg
+                return fill
+            except Exception:
+                return (1, 1, 1)
+
+        def _sample_text_color_from_page(page, rect, background_rgb):
+            try:
+                r = pymupdf.Rect(rect)
+                if r.is_empty or r.get_area() < 1:
+                    return None
+                scale = 3
+                pix = page.get_pixmap(clip=r, matrix=pymupdf.Matrix(scale, scale), alpha=False)
+                w, h = pix.width, pix.height
+                if w < 1 or h < 1:
                     return None
+                bg_lum = _luminance(background_rgb)
+                fg_list = []
+                step = max(1, (w * h) // 200)
+                for i in range(0, w * h, step):
+                    py, px = divmod(i, w)
+                    if py >= h:
+                        break
+                    t = _pixel_to_rgb(pix.pixel(px, py))
+                    if not t:
+                        continue
+                    if abs(_luminance(t) - bg_lum) > 0.06:
+                        fg_list.append(t)
+                if not fg_list:
+                    best = None
+                    best_lum = -1
+                    for py in range(h):
+                        for px in range(w):
+                            t = _pixel_to_rgb(pix.pixel(px, py))
+                            if t and _luminance(t) > best_lum:
+                                best_lum = _luminance(t)
+                                best = t
+                    return best
+                return (
+                    sum(x[0] for x in fg_list) / len(fg_list),
+                    sum(x[1] for x in fg_list) / len(fg_list),
+                    sum(x[2] for x in fg_list) / len(fg_list),
+                )
+            except Exception:
+                return None
+
+        for page in doc:
+            for repl in replacements:
+                old_text = (repl.get("old_text") or "").strip()
+                new_text = repl.get("new_text") or ""
+                if not old_text:
+                    continue
+                rects = page.search_for(old_text, quads=False)
+                repl_page_index = repl.get("page_index")
+                repl_bbox = repl.get("bbox")
+                if repl_page_index is not None and repl_bbox is not None and len(repl_bbox) == 4:
+                    if page.number != repl_page_index:
+                        continue
+                    target = pymupdf.Rect(repl_bbox[0], repl_bbox[1], repl_bbox[2], repl_bbox[3])
+                    best_rect = None
+                    best_area = 0.0
+                    for r in rects:
+                        inter = r & target
+                        if not inter.is_empty and inter.get_area() > best_area:
+                            best_area = inter.get_area()
+                            best_rect = r
+                    rects = [best_rect] if best_rect is not None else []
+                for rect in rects:
+                    span = _find_span_at_rect(page, rect)
+                    sample_rect = rect
+                    if span:
+                        font_size = max(6.0, float(span.get("size", 11)))
+                        font_name = _map_font_name(span.get("font", ""))
+                        raw_color = span.get("color", 0)
+                        color = _span_color_to_rgb(raw_color)
+                        color_int = 0 if _luminance(color) < 0.05 else 1
+                        if span.get("bbox"):
+                            sample_rect = pymupdf.Rect(span.get("bbox"))
+                    else:
+                        font_size = 11.0
+                        font_name = "Helvetica"
+                        color = (0, 0, 0)
+                        color_int = 0
+                    fill_color = _sample_background_color(page, rect)
+                    sampled = _sample_text_color_from_page(page, sample_rect, fill_color)
+                    if color_int != 0 and _luminance(color) >= 0.05:
+                        pass
+                    elif sampled is not None:
+                        color = sampled
+                    elif _luminance(fill_color) < 0.5 and _luminance(color) < 0.4:
+                        color = (1, 1, 1)
+                    fill_lum = _luminance(fill_color)
+                    if sampled is not None and _luminance(color) < 0.15 and fill_lum < 0.7:
+                        color = sampled
+                    text_lum = _luminance(color)
+                    if abs(text_lum - fill_lum) < 0.2:
+                        color = (1, 1, 1) if fill_lum < 0.5 else (0, 0, 0)
+                    if new_text and not rect.is_empty and rect.get_area() >= 1:
+                        page.add_redact_annot(
+                            rect,
+                            text=new_text,
+                            fontname=font_name,
+                            fontsize=font_size,
+                            align=pymupdf.TEXT_ALIGN_LEFT,
+                            fill=fill_color,
+                            text_color=color,
+                            cross_out=False,
+                        )
+                    else:
+                        page.add_redact_annot(rect, fill=fill_color, cross_out=False)
+            page.apply_redactions()
+        doc.save(job.output_path)
+        doc.close()
 
-                def _luminance(rgb):
-                    r, g, b = rgb
-                    return 0.299 * r + 0.587 * g + 0.114 * b
+    else:
+        raise ValueError(f"Unsupported job type: {job.job_type}")
 
-                def _sample_page_background(page):
-                    try:
-                        page_rect = page.rect
-                        clip = pymupdf.Rect(0, 0, min(50, page_rect.width * 0.1), min(50, page_rect.height * 0.1)) & page_rect
-                        if clip.is_empty or clip.get_area() < 1:
-                            return (0.1, 0.1, 0.1)
-                        pix = page.get_pixmap(clip=clip, matrix=pymupdf.Matrix(1, 1), alpha=False)
-                        w, h = pix.width, pix.height
-                        if w < 1 or h < 1:
-                            return (0.1, 0.1, 0.1)
-                        rgb_list = []
-                        for py in range(h):
-                            for px in range(w):
-                                t = _pixel_to_rgb(pix.pixel(px, py))
-                                if t:
-                                    rgb_list.append(t)
-                        if not rgb_list:
-                            return (0.1, 0.1, 0.1)
-                        return (
-                            sum(x[0] for x in rgb_list) / len(rgb_list),
-                            sum(x[1] for x in rgb_list) / len(rgb_list),
-                            sum(x[2] for x in rgb_list) / len(rgb_list),
-                        )
-                    except Exception:
-                        return (0.1, 0.1, 0.1)
+    input_filenames = (job.params or {}).get("input_filenames")
+    job.output_filename = make_output_filename(
+        job.job_type, input_filenames, job.output_path
+    )
 
-                def _sample_background_color(page, rect):
-                    try:
-                        r = pymupdf.Rect(rect)
-                        if r.is_empty or r.get_area() < 1:
-                            return (1, 1, 1)
-                        page_rect = page.rect
-                        expand = 8.0
-                        clip = pymupdf.Rect(
-                            max(0, r.x0 - expand), max(0, r.y0 - expand),
-                            min(page_rect.x1, r.x1 + expand), min(page_rect.y1, r.y1 + expand),
-                        ) & page_rect
-                        if clip.is_empty or clip.get_area() < 4:
-                            return (1, 1, 1)
-                        pix = page.get_pixmap(clip=clip, matrix=pymupdf.Matrix(1, 1), alpha=False)
-                        w, h = pix.width, pix.height
-                        if w < 3 or h < 3:
-                            return (1, 1, 1)
-                        rgb_list = []
-                        for (px, py) in [
-                            (0, 0), (w - 1, 0), (0, h - 1), (w - 1, h - 1),
-                            (w // 2, 0), (w // 2, h - 1), (0, h // 2), (w - 1, h // 2),
-                        ]:
-                            t = _pixel_to_rgb(pix.pixel(px, py))
-                            if t:
-                                rgb_list.append(t)
-                        if not rgb_list:
-                            return (1, 1, 1)
-                        fill = (
-                            sum(x[0] for x in rgb_list) / len(rgb_list),
-                            sum(x[1] for x in rgb_list) / len(rgb_list),
-                            sum(x[2] for x in rgb_list) / len(rgb_list),
-                        )
-                        page_bg = _sample_page_background(page)
-                        page_lum = _luminance(page_bg)
-                        fill_lum = _luminance(fill)
-                        if page_lum < 0.4 and fill_lum > 0.6:
-                            return page_bg
-                        if page_lum > 0.6 and fill_lum < 0.15:
-                            return page_bg
-                        return fill
-                    except Exception:
-                        return (1, 1, 1)
 
-                def _sample_text_color_from_page(page, rect, background_rgb):
-                    try:
-                        r = pymupdf.Rect(rect)
-                        if r.is_empty or r.get_area() < 1:
-                            return None
-                        scale = 3
-                        pix = page.get_pixmap(clip=r, matrix=pymupdf.Matrix(scale, scale), alpha=False)
-                        w, h = pix.width, pix.height
-                        if w < 1 or h < 1:
-                            return None
-                        bg_lum = _luminance(background_rgb)
-                        fg_list = []
-                        step = max(1, (w * h) // 200)
-                        for i in range(0, w * h, step):
-                            py, px = divmod(i, w)
-                            if py >= h:
-                                break
-                            t = _pixel_to_rgb(pix.pixel(px, py))
-                            if not t:
-                                continue
-                            if abs(_luminance(t) - bg_lum) > 0.06:
-                                fg_list.append(t)
-                        if not fg_list:
-                            best = None
-                            best_lum = -1
-                            for py in range(h):
-                                for px in range(w):
-                                    t = _pixel_to_rgb(pix.pixel(px, py))
-                                    if t and _luminance(t) > best_lum:
-                                        best_lum = _luminance(t)
-                                        best = t
-                            return best
-                        return (
-                            sum(x[0] for x in fg_list) / len(fg_list),
-                            sum(x[1] for x in fg_list) / len(fg_list),
-                            sum(x[2] for x in fg_list) / len(fg_list),
-                        )
-                    except Exception:
-                        return None
+def _preload_pdf_libs() -> None:
+    """Process pool initializer: import the heavy PDF libraries once per worker process."""
+    # OCR runs one tesseract per page in parallel; keep each to a single OpenMP thread
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    for name in ("pikepdf", "pymupdf"):
+        try:
+            __import__(name)
+        except ImportError:
+            pass
 
-                for page in doc:
-                    for repl in replacements:
-                        old_text = (repl.get("old_text") or "").strip()
-                        new_text = repl.get("new_text") or ""
-                        if not old_text:
-                            continue
-                        rects = page.search_for(old_text, quads=False)
-                        repl_page_index = repl.get("page_index")
-                        repl_bbox = repl.get("bbox")
-                        if repl_page_index is not None and repl_bbox is not None and len(repl_bbox) == 4:
-                            if page.number != repl_page_index:
-                                continue
-                            target = pymupdf.Rect(repl_bbox[0], repl_bbox[1], repl_bbox[2], repl_bbox[3])
-                            best_rect = None
-                            best_area = 0.0
-                            for r in rects:
-                                inter = r & target
-                                if not inter.is_empty and inter.get_area() > best_area:
-                                    best_area = inter.get_area()
-                                    best_rect = r
-                            rects = [best_rect] if best_rect is not None else []
-                        for rect in rects:
-                            span = _find_span_at_rect(page, rect)
-                            sample_rect = rect
-                            if span:
-                                font_size = max(6.0, float(span.get("size", 11)))
-                                font_name = _map_font_name(span.get("font", ""))
-                                raw_color = span.get("color", 0)
-                                color = _span_color_to_rgb(raw_color)
-                                color_int = 0 if _luminance(color) < 0.05 else 1
-                                if span.get("bbox"):
-                                    sample_rect = pymupdf.Rect(span.get("bbox"))
-                            else:
-                                font_size = 11.0
-                                font_name = "Helvetica"
-                                color = (0, 0, 0)
-                                color_int = 0
-                            fill_color = _sample_background_color(page, rect)
-                            sampled = _sample_text_color_from_page(page, sample_rect, fill_color)
-                            if color_int != 0 and _luminance(color) >= 0.05:
-                                pass
-                            elif sampled is not None:
-                                color = sampled
-                            elif _luminance(fill_color) < 0.5 and _luminance(color) < 0.4:
-                                color = (1, 1, 1)
-                            fill_lum = _luminance(fill_color)
-                            if sampled is not None and _luminance(color) < 0.15 and fill_lum < 0.7:
-                                color = sampled
-                            text_lum = _luminance(color)
-                            if abs(text_lum - fill_lum) < 0.2:
-                                color = (1, 1, 1) if fill_lum < 0.5 else (0, 0, 0)
-                            if new_text and not rect.is_empty and rect.get_area() >= 1:
-                                page.add_redact_annot(
-                                    rect,
-                                    text=new_text,
-                                    fontname=font_name,
-                                    fontsize=font_size,
-                                    align=pymupdf.TEXT_ALIGN_LEFT,
-                                    fill=fill_color,
-                                    text_color=color,
-                                    cross_out=False,
-                                )
-                            else:
-                                page.add_redact_annot(rect, fill=fill_color, cross_out=False)
-                    page.apply_redactions()
-                doc.save(job.output_path)
-                doc.close()
 
-            else:
-                raise ValueError(f"Unsupported job type: {job.job_type}")
+def make_process_pool() -> Optional[ProcessPoolExecutor]:
+    """Pool for worker_loop, or None when PDF_WORKER_PROCESSES is 0."""
+    if WORKER_PROCESSES <= 0:
+        return None
+    # spawn, not fork: the server process already runs threads and an event loop
+    return ProcessPoolExecutor(
+        max_workers=WORKER_PROCESSES,
+        mp_context=get_context("spawn"),
+        initializer=_preload_pdf_libs,
+    )
+
+
+class WorkerPool:
+    """
+    Holder for the worker's process pool (executor None: jobs run in threads). A child that
+    dies (OOM kill, crash in native code) leaves a ProcessPoolExecutor broken for good, so
+    the worker swaps in a fresh pool through here instead of failing every later job.
+    """
+
+    def __init__(self, executor: Optional[ProcessPoolExecutor]):
+        self.executor = executor
+
+    def replace(self, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """Swap broken for a new pool (once, if several jobs notice it) and return the current one."""
+        if self.executor is broken:
+            self.executor = make_process_pool()
+            broken.shutdown(wait=False, cancel_futures=True)
+        return self.executor
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _process_job_in_child(job: Job) -> Job:
+    process_job(job)
+    return job
 
-            input_filenames = (job.params or {}).get("input_filenames")
-            job.output_filename = make_output_filename(
-                job.job_type, input_filenames, job.output_path
-            )
-            job.status = JobStatus.COMPLETED
 
+async def _process(job: Job, pool: WorkerPool) -> None:
+    # PDF work is blocking (CPU + file I/O); keep it off the event loop, and with a pool
+    # off this process's GIL too so request handling isn't slowed by heavy jobs
+    executor = pool.executor
+    if executor is None:
+        await asyncio.to_thread(process_job, job)
+        return
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        try:
+            done = await loop.run_in_executor(executor, _process_job_in_child, job)
+            break
+        except BrokenProcessPool as e:
+            # A dead child fails every job queued on that pool, not only the one it was running;
+            # retry once on a fresh pool, so only a job that breaks that one too is failed
+            executor = pool.replace(executor)
+            if attempt:
+                raise RuntimeError(
+                    "The worker process running this job exited unexpectedly (e.g. out of memory)."
+                ) from e
+    for field in _RESULT_FIELDS:
+        setattr(job, field, getattr(done, field))
+
+
+def _zip_batch_outputs(zip_path: str, members: list[tuple[str, str]]) -> None:
+    """Write (path, arcname) members to zip_path; PDFs are already compressed, so store them."""
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as zipf:
+        for path, arcname in members:
+            zipf.write(path, arcname=arcname)
+
+
+async def _run_batch(job: Job, pool: WorkerPool) -> None:
+    """
+    Run params["operation"] on every input as its own sub-job, at most WORKER_CONCURRENCY at a
+    time so they spread over the worker pool without flooding it, then ZIP the outputs. Per-file outcomes go to
+    params["batch_results"]; the batch fails only if every file failed.
+    """
+    params = job.params or {}
+    operation = JobType(params["operation"])
+    output_name = BATCH_OPERATIONS[operation][0]
+    input_filenames = params.get("input_filenames") or []
+    base_dir = os.path.dirname(job.output_path)
+
+    subs = []
+    for idx, input_path in enumerate(job.input_paths):
+        name = input_filenames[idx] if idx < len(input_filenames) else None
+        sub_dir = os.path.join(base_dir, f"batch_{idx}")
+        os.makedirs(sub_dir, exist_ok=True)
+        subs.append(Job(
+            job_id=f"{job.job_id}_{idx}",
+            job_type=operation,
+            status=JobStatus.PROCESSING,
+            input_paths=[input_path],
+            output_path=os.path.join(sub_dir, output_name),
+            params={**params.get("operation_params", {}), "input_filenames": [name] if name else []},
+        ))
+    slots = asyncio.Semaphore(WORKER_CONCURRENCY)
+
+    async def run_sub(sub: Job) -> None:
+        async with slots:
+            await _process(sub, pool)
+
+    outcomes = await asyncio.gather(*(run_sub(sub) for sub in subs), return_exceptions=True)
+
+    results, members, used = [], [], set()
+    for idx, (sub, outcome) in enumerate(zip(subs, outcomes)):
+        entry = {"filename": input_filenames[idx] if idx < len(input_filenames) else None}
+        if isinstance(outcome, Exception):
+            entry.update(status=JobStatus.FAILED.value, error=str(outcome))
+        else:
+            arcname = sub.output_filename or os.path.basename(sub.output_path)
+            if arcname in used:
+                arcname = f"{idx + 1}_{arcname}"
+            used.add(arcname)
+            members.append((sub.output_path, arcname))
+            entry.update(status=JobStatus.COMPLETED.value, output=arcname)
+        results.append(entry)
+    job.params = {**params, "batch_results": results}
+    if not members:
+        raise ValueError(f"Every file in the batch failed; first error: {results[0].get('error')}")
+
+    await asyncio.to_thread(_zip_batch_outputs, job.output_path, members)
+    job.output_filename = make_output_filename(job.job_type, input_filenames, job.output_path)
+
+
+async def _run_job(job_id: str, pool: WorkerPool) -> None:
+    job = JOB_STORE[job_id]
+    # Separate processes don't share PyMuPDF state, so the slot only matters for threads
+    semaphore = (pool.executor is None and _JOB_TYPE_SEMAPHORES.get(job.job_type)) or contextlib.nullcontext()
+    async with semaphore:
+        job.status = JobStatus.PROCESSING
+        try:
+            if job.job_type == JobType.BATCH:
+                await _run_batch(job, pool)
+            else:
+                await _process(job, pool)
+            job.status = JobStatus.COMPLETED
         except Exception as e:
             job.status = JobStatus.FAILED
             job.error = str(e)
+
+
+async def _worker(pool: WorkerPool) -> None:
+    while True:
+        job_id = await queue.get()
+        await _run_job(job_id, pool)
+
+
+async def worker_loop(pool: Optional[WorkerPool] = None):
+    pool = pool or WorkerPool(None)
+    # Inherited by tesseract processes that OCR jobs start when running in threads
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    # Independent consumers: a slow job holds only its own slot, so the other workers keep
+    # taking jobs instead of waiting for the whole batch to finish
+    await asyncio.gather(*(_worker(pool) for _ in range(WORKER_CONCURRENCY)))